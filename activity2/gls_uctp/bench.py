@@ -0,0 +1,395 @@
+"""Micro benchmarks of the parser, evaluator, move generator and searches, over the test instances.
+
+Run with `python -m gls_uctp.bench [instances...] --output results.json`, from the directory holding `instances/`. Results are written as JSON, one entry per instance, and can be normalized by the time the ITC2007 benchmark tool allows on the machine, so runs on different machines are comparable.
+
+With `--scale 1000,20000`, synthetic instances of those numbers of lectures are benchmarked instead, for the parse time, the memory of a solution and of its evaluation state, and the evaluation and search speeds as the instances grow.
+
+With `--compare`, the island model and independent multi-starts of the Guided Local Search are run on comp03 and comp12, or the given instances, with the same number of cores and time limit, and the best score each reached is reported at evenly spaced points of the time limit.
+"""
+
+from __future__ import annotations
+import json
+import platform
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from glob import glob
+from os import cpu_count
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter, time
+from typing import Any, Callable, Sequence
+
+from gls_uctp.calibration import benchmark_machine_secs, best_time
+from gls_uctp.local_search.islands import IslandGuidedLocalSearch, IslandSolver
+from gls_uctp.local_search.local_search import GuidedLocalSearch, LocalSearch, follow
+from gls_uctp.local_search.multistart import MultiStartSolver, StartResult
+from gls_uctp.uctp.evaluation import EvaluationState
+from gls_uctp.uctp.instance_generator import InstanceSpec, write_instance
+from gls_uctp.uctp.model import UCTP
+from gls_uctp.uctp.timetable import copy_solution
+
+INSTANCES = "instances/test/comp*.ctt"
+# Lectures of the synthetic instances of the scaling benchmark
+SCALES = (1000, 5000, 20000, 50000)
+# Cells of the largest dense solution matrix the scaling benchmark builds
+DENSE_LIMIT_CELLS = 20_000_000
+# Instances the parallel solvers are compared on
+COMPARED_INSTANCES = ("instances/test/comp03.ctt", "instances/test/comp12.ctt")
+
+
+def throughput(function: Callable[[], Any], duration: float) -> float:
+    """Returns how many times per second the function runs, calling it for about `duration` seconds."""
+
+    calls = 0
+    batch = 1
+    start = perf_counter()
+    while (elapsed := perf_counter() - start) < duration:
+        for _ in range(batch):
+            function()
+        calls += batch
+        batch *= 2
+    return calls / elapsed
+
+
+def move_delta_throughput(
+    problem: UCTP, state: EvaluationState, duration: float
+) -> float:
+    """Returns how many random moves per second are evaluated against the state, without applying them."""
+
+    moves = iter(())
+
+    def delta() -> None:
+        nonlocal moves
+        move = next(moves, None)
+        if move is None:
+            moves = iter(problem.neighborhood(state, 1000))
+            move = next(moves)
+        state.delta(move)
+
+    return throughput(delta, duration)
+
+
+def allocated(function: Callable[[], Any]) -> tuple[int, Any]:
+    """Returns the bytes still allocated by the function once it returns, and what it returned."""
+
+    tracemalloc.start()
+    try:
+        result = function()
+        allocated_bytes, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (allocated_bytes, result)
+
+
+def bench_instance(path: str, duration: float = 1.0) -> dict[str, float]:
+    """Benchmarks one instance. Each throughput is measured for about `duration` seconds."""
+
+    results = {"parse_secs": best_time(lambda: UCTP.from_file(path))}
+
+    problem = UCTP.from_file(path)
+    results["random_solution_secs"] = best_time(problem.random_solution)
+
+    solution = problem.random_solution()
+    results["evaluate_per_sec"] = throughput(
+        lambda: problem.evaluate(solution), duration
+    )
+    results["move_evaluate_per_sec"] = throughput(
+        lambda: problem.evaluate(problem.lecture_move(solution)), duration
+    )
+
+    results["move_delta_per_sec"] = move_delta_throughput(
+        problem, problem.evaluation_state(problem.random_solution()), duration
+    )
+
+    _, _, _, iterations, elapsed_time = LocalSearch(time_limit_secs=duration).search(
+        problem.random_solution(), 10**9, problem
+    )
+    results["ls_iterations_per_sec"] = iterations / elapsed_time
+
+    (_, _, _, _, elapsed_time, local_search_iterations) = GuidedLocalSearch(
+        time_limit_secs=duration
+    ).search(problem.random_solution(), 10**9, problem)
+    results["gls_iterations_per_sec"] = local_search_iterations / elapsed_time
+
+    return results
+
+
+def normalize(results: dict[str, float], reference_secs: float) -> dict[str, float]:
+    """Scales the results by the time allowed on the machine: times become fractions of it, and throughputs counts within it."""
+
+    return {
+        name: value / reference_secs
+        if name.endswith("_secs")
+        else value * reference_secs
+        for name, value in results.items()
+    }
+
+
+def report_header(duration: float, reference_secs: float | None) -> dict[str, Any]:
+    """Returns the machine and settings a report was taken with."""
+
+    return {
+        "python": sys.version,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "duration": duration,
+        "reference_secs": reference_secs,
+    }
+
+
+def run(
+    paths: Sequence[str],
+    duration: float = 1.0,
+    reference_secs: float | None = None,
+) -> dict[str, Any]:
+    """Benchmarks every instance. Returns the report, with the normalized results when a reference time is given."""
+
+    report: dict[str, Any] = {
+        **report_header(duration, reference_secs),
+        "instances": {},
+    }
+    for path in paths:
+        results = bench_instance(path, duration)
+        if reference_secs is not None:
+            results = {**results, "normalized": normalize(results, reference_secs)}
+        report["instances"][Path(path).stem] = results
+    return report
+
+
+def bench_scale(
+    lectures: int,
+    directory: str | Path,
+    duration: float = 1.0,
+    seed: int = 0,
+    dense_limit_cells: int = DENSE_LIMIT_CELLS,
+) -> dict[str, Any]:
+    """Benchmarks a synthetic instance of about `lectures` lectures, written to the directory. Dense solutions of more than `dense_limit_cells` cells are not built, their bytes are None."""
+
+    path = Path(directory) / f"synthetic-{lectures}-{seed}.ctt"
+    with open(path, "w", encoding="utf8") as file:
+        write_instance(InstanceSpec.for_lectures(lectures), file, seed)
+
+    problem = UCTP.from_file(str(path))
+    slots = len(problem.rooms) * problem.days * problem.periods_per_day
+    results: dict[str, Any] = {
+        "lectures": sum(course.lectures for course in problem.courses),
+        "courses": len(problem.courses),
+        "rooms": len(problem.rooms),
+        "solution_cells": slots * len(problem.courses),
+        "parse_secs": best_time(lambda: UCTP.from_file(str(path)), repeat=3),
+    }
+
+    results["compact_solution_bytes"], solution = allocated(
+        lambda: problem.random_solution(compact=True)
+    )
+    if results["solution_cells"] <= dense_limit_cells:
+        matrix = problem.to_graph()
+        # The rows hold cached small integers, so the lists are all of its memory, and tracing each row would take longer than building them
+        results["dense_solution_bytes"] = sys.getsizeof(matrix) + sum(
+            sys.getsizeof(row) for row in matrix
+        )
+        del matrix
+    else:
+        results["dense_solution_bytes"] = None
+    results["evaluation_state_bytes"], state = allocated(
+        lambda: problem.evaluation_state(copy_solution(solution))
+    )
+
+    results["evaluate_secs"] = best_time(lambda: problem.evaluate(solution), repeat=3)
+    results["evaluation_state_secs"] = best_time(
+        lambda: problem.evaluation_state(copy_solution(solution)), repeat=3
+    )
+    results["move_delta_per_sec"] = move_delta_throughput(problem, state, duration)
+    # Searched from the built state, so building it is not counted in the iterations per second
+    _, _, progress = follow(
+        LocalSearch(time_limit_secs=duration).iterate(
+            solution, 10**9, problem, state=state
+        )
+    )
+    results["ls_iterations_per_sec"] = progress.iteration / progress.elapsed_time
+    return results
+
+
+def run_scaling(
+    scales: Sequence[int], duration: float = 1.0, seed: int = 0
+) -> dict[str, Any]:
+    """Benchmarks synthetic instances of each number of lectures, written to a temporary directory. Returns the report."""
+
+    report: dict[str, Any] = {**report_header(duration, None), "scaling": {}}
+    with TemporaryDirectory() as directory:
+        for lectures in scales:
+            report["scaling"][str(lectures)] = bench_scale(
+                lectures, directory, duration, seed
+            )
+    return report
+
+
+def best_over_time(
+    results: Sequence[StartResult], start: float, time_limit_secs: float, points: int
+) -> list[dict[str, Any]]:
+    """Returns the best value and validity the results reached by each of `points` evenly spaced times of the time limit, merging the improvements of every start. Values are None before the first improvement."""
+
+    improvements = sorted(
+        improvement for result in results for improvement in result.improvements
+    )
+    rows = []
+    best: tuple[bool, int] | None = None
+    index = 0
+    for point in range(1, points + 1):
+        secs = time_limit_secs * point / points
+        while index < len(improvements) and improvements[index][0] - start <= secs:
+            _, value, is_valid = improvements[index]
+            if best is None or (not is_valid, value) < best:
+                best = (not is_valid, value)
+            index += 1
+        rows.append(
+            {
+                "secs": secs,
+                "value": None if best is None else best[1],
+                "is_valid": None if best is None else not best[0],
+            }
+        )
+    return rows
+
+
+def compare_parallel(
+    path: str,
+    cores: int,
+    time_limit_secs: float,
+    points: int = 10,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Runs the island model and independent multi-starts of the Guided Local Search on an instance, each on `cores` processes for the same time limit. Returns the best score of each solver over time."""
+
+    problem = UCTP.from_file(path)
+    solvers = {
+        "islands": IslandSolver(
+            IslandGuidedLocalSearch(time_limit_secs=time_limit_secs),
+            islands=cores,
+            time_limit_secs=time_limit_secs,
+            seed=seed,
+        ),
+        "multistart": MultiStartSolver(
+            GuidedLocalSearch(time_limit_secs=time_limit_secs),
+            starts=cores,
+            workers=cores,
+            time_limit_secs=time_limit_secs,
+            seed=seed,
+        ),
+    }
+
+    results: dict[str, Any] = {}
+    for name, solver in solvers.items():
+        start = time()
+        best, starts = solver.solve(problem, 10**9)
+        results[name] = {
+            "value": best.value,
+            "is_valid": best.is_valid,
+            "wall_secs": time() - start,
+            "best_over_time": best_over_time(starts, start, time_limit_secs, points),
+        }
+    return results
+
+
+def run_comparison(
+    paths: Sequence[str],
+    cores: int,
+    time_limit_secs: float,
+    points: int = 10,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Compares the parallel solvers on every instance. Returns the report."""
+
+    report: dict[str, Any] = {
+        **report_header(time_limit_secs, None),
+        "cores": cores,
+        "parallel": {},
+    }
+    for path in paths:
+        report["parallel"][Path(path).stem] = compare_parallel(
+            path, cores, time_limit_secs, points, seed
+        )
+    return report
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Runs the benchmarks from the command line."""
+
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("instances", nargs="*", help=f"Defaults to {INSTANCES}")
+    parser.add_argument("--output", "-o", help="JSON file, printed if not given")
+    parser.add_argument(
+        "--duration", type=float, default=1.0, help="Seconds of each throughput"
+    )
+    parser.add_argument(
+        "--normalize",
+        action="store_true",
+        help="Normalize by the time the ITC2007 benchmark tool allows",
+    )
+    parser.add_argument(
+        "--scale",
+        nargs="?",
+        const=",".join(str(lectures) for lectures in SCALES),
+        help=f"Benchmark synthetic instances of these comma separated numbers of lectures instead, {','.join(str(lectures) for lectures in SCALES)} if none are given",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of the synthetic instances, and of the compared solvers",
+    )
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help=f"Compare the island model with independent multi-starts instead, on {' and '.join(Path(path).stem for path in COMPARED_INSTANCES)} if no instances are given",
+    )
+    parser.add_argument(
+        "--cores",
+        type=int,
+        help="Processes of each compared solver, one per CPU by default",
+    )
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        default=60.0,
+        help="Seconds each compared solver runs",
+    )
+    parser.add_argument(
+        "--points",
+        type=int,
+        default=10,
+        help="Times of the time limit the best scores are reported at",
+    )
+    arguments = parser.parse_args(argv)
+
+    if arguments.compare:
+        report = run_comparison(
+            arguments.instances or COMPARED_INSTANCES,
+            arguments.cores or cpu_count() or 1,
+            arguments.time_limit,
+            arguments.points,
+            arguments.seed,
+        )
+    elif arguments.scale:
+        report = run_scaling(
+            [int(lectures) for lectures in arguments.scale.split(",")],
+            arguments.duration,
+            arguments.seed,
+        )
+    else:
+        report = run(
+            arguments.instances or sorted(glob(INSTANCES)),
+            arguments.duration,
+            benchmark_machine_secs() if arguments.normalize else None,
+        )
+
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf8") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Time limits calibrated to the machine, as the ITC2007 rules allow: the benchmark tool of the competition measures the machine and tells how long an algorithm may run on it.
+
+The tool takes about 20 seconds, so its result is cached per host, with the method it was measured by. Where it cannot run, a short in-process workload is timed instead and scaled by the ratio of the tool to the workload on reference machines. That ratio differs by about 10% between the reference machines, and on a shared host the best time of the workload varied from 0.27 to 0.43 seconds between runs, so fallback time limits are only expected within about 20% of the tool's on an idle machine, and can be off by a third or more on a busy one. Summaries of searches on a calibrated time limit record the method, so runs on the fallback can be told apart.
+"""
+
+from __future__ import annotations
+import json
+import platform
+import re
+import subprocess
+from math import prod
+from os import getpid, replace
+from pathlib import Path
+from random import Random
+from time import perf_counter, time
+from typing import Any, Callable
+
+from gls_uctp.uctp.compiled import cache_directory
+
+BENCHMARK_MACHINE = "instances/benchmark_machine/benchmark_my_linux_machine"
+# Value of `time_limit_secs` asking for the calibrated time limit
+ITC2007 = "itc2007"
+# Seconds the tool allowed and best seconds of the workload, measured together on two machines. Their ratios differ by 10%, and the tool itself varied from 216 to 228 seconds between runs on the second.
+REFERENCES = ((222.0, 0.255), (222.0, 0.280))
+
+
+def best_time(function: Callable[[], Any], repeat: int = 5) -> float:
+    """Returns the fastest of `repeat` runs of the function, in seconds."""
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def benchmark_machine_secs(path: str = BENCHMARK_MACHINE) -> float:
+    """Runs the ITC2007 benchmark tool. Returns the seconds it allows an algorithm to run on this machine."""
+
+    tool = Path(path).resolve()
+    # The tool reads its input from the working directory and asks for confirmation
+    completed = subprocess.run(
+        [str(tool)],
+        cwd=tool.parent,
+        input="y\n\n",
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    match = re.search(r"run your algorithm for (\d+) seconds", completed.stdout)
+    if match is None:
+        raise ValueError(f"Unexpected output of the benchmark tool: {completed.stdout}")
+    return float(match.group(1))
+
+
+def cpu_workload(size: int = 300_000) -> int:
+    """Sorts, counts and hashes seeded random integers, a fixed amount of interpreter work. Returns the hash."""
+
+    generator = Random(2007)
+    values = [generator.getrandbits(32) for _ in range(size)]
+    values.sort()
+    counts: dict[int, int] = {}
+    for value in values:
+        counts[value & 1023] = counts.get(value & 1023, 0) + 1
+    total = len(counts)
+    for value in values:
+        total = (total * 31 + value) & 0xFFFFFFFF
+    return total
+
+
+def cpu_benchmark_secs() -> float:
+    """Times the in-process workload. Returns the seconds the ITC2007 tool would allow, scaled by the geometric mean of the ratios of the reference machines."""
+
+    ratio = prod(tool / workload for tool, workload in REFERENCES) ** (
+        1 / len(REFERENCES)
+    )
+    # The best of many runs, the timing of a single run varies widely on shared hosts
+    return ratio * best_time(cpu_workload, repeat=10)
+
+
+def host() -> str:
+    """Returns the key of this host in the calibration cache."""
+
+    return f"{platform.node()}/{platform.machine()}/{platform.python_implementation()}"
+
+
+def calibration_path() -> Path:
+    """Returns the file the calibrations of every host are cached in."""
+
+    return cache_directory() / "calibration.json"
+
+
+def calibrate(tool: str | Path = BENCHMARK_MACHINE) -> dict[str, Any]:
+    """Measures the time limit of this host with the ITC2007 tool, or with the in-process workload if the tool cannot run."""
+
+    try:
+        secs = benchmark_machine_secs(str(tool))
+        method = "itc2007"
+    except (OSError, subprocess.SubprocessError, ValueError):
+        secs = cpu_benchmark_secs()
+        method = "cpu"
+    return {"time_limit_secs": secs, "method": method, "measured_at": time()}
+
+
+def read_calibrations(path: Path) -> dict[str, Any]:
+    """Returns the cached calibrations of every host, none if the cache is missing or unreadable."""
+
+    try:
+        with open(path, encoding="utf8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def host_calibration(
+    tool: str | Path = BENCHMARK_MACHINE,
+    path: str | Path | None = None,
+    refresh: bool = False,
+) -> dict[str, Any]:
+    """Returns the calibration of this host, its time limit in seconds and the method it was measured by, calibrating it the first time or when refreshed."""
+
+    path = Path(path) if path is not None else calibration_path()
+    calibrations = read_calibrations(path)
+    if not refresh and host() in calibrations:
+        return calibrations[host()]
+
+    calibrations[host()] = calibrate(tool)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Replaced at once, so concurrent runs never read a partial file
+    temporary = Path(f"{path}.{getpid()}.tmp")
+    with open(temporary, "w", encoding="utf8") as file:
+        json.dump(calibrations, file, indent=2)
+    replace(temporary, path)
+    return calibrations[host()]
+
+
+def time_limit(
+    tool: str | Path = BENCHMARK_MACHINE,
+    path: str | Path | None = None,
+    refresh: bool = False,
+) -> float:
+    """Returns the calibrated time limit of this host in seconds, calibrating it the first time or when refreshed."""
+
+    return host_calibration(tool, path, refresh)["time_limit_secs"]
+
+
+def resolve(time_limit_secs: float | str) -> float:
+    """Returns a time limit in seconds, calibrated to the machine when `itc2007` is asked for."""
+
+    if isinstance(time_limit_secs, str):
+        if time_limit_secs != ITC2007:
+            raise ValueError(
+                f"Unknown time limit {time_limit_secs!r}, expected seconds or {ITC2007!r}."
+            )
+        return time_limit()
+    return time_limit_secs
@@ -0,0 +1,255 @@
+"""The `gls-uctp` command, solving, benchmarking, validating, compiling and generating instances.
+
+Run `gls-uctp solve instances/test/comp01.ctt --algorithm gls --time-limit itc2007 --output comp01.sol` to write the best timetable in the ITC2007 solution format and a JSON summary of the run. The `bench` and `validate` subcommands take the arguments of `python -m gls_uctp.bench` and `python -m gls_uctp.validate`. Only the modules of the chosen subcommand are imported, so `gls-uctp --help` starts without loading the solver.
+"""
+
+from __future__ import annotations
+import json
+import sys
+from argparse import ArgumentParser, Namespace
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Sequence
+
+ALGORITHMS = ("ls", "gls")
+# Subcommands parsed by their own modules, so their help stays in one place
+FORWARDED = {
+    "bench": ("gls_uctp.bench", "Benchmark the parser, evaluator and searches"),
+    "validate": ("gls_uctp.validate", "Score solution files against their instances"),
+}
+# Fields of `InstanceSpec` the generate subcommand sets, listed here so parsing imports nothing
+GENERATOR_FIELDS = (
+    ("courses", int),
+    ("rooms", int),
+    ("days", int),
+    ("periods_per_day", int),
+    ("curricula", int),
+    ("lectures_per_course", int),
+    ("courses_per_curriculum", int),
+    ("courses_per_teacher", float),
+    ("constraint_density", float),
+)
+
+
+def time_limit(text: str) -> float | str:
+    """Returns the seconds of a time limit, or the name of a calibrated one as is."""
+
+    try:
+        return float(text)
+    except ValueError:
+        # Imported when asked for, only to check the name
+        from gls_uctp.calibration import ITC2007
+
+        if text != ITC2007:
+            raise
+        return text
+
+
+def solve(arguments: Namespace) -> dict[str, Any]:
+    """Solves an instance, writing its best timetable. Returns the summary of the run."""
+
+    from time import time
+
+    from gls_uctp.calibration import ITC2007, host_calibration, resolve
+    from gls_uctp.local_search.local_search import GuidedLocalSearch, LocalSearch
+    from gls_uctp.local_search.multistart import MultiStartSolver, run_start
+    from gls_uctp.uctp.model import UCTP
+    from gls_uctp.uctp.random_source import RandomSource
+    from gls_uctp.uctp.solution_io import write_solution_file
+
+    problem = UCTP.from_file(arguments.instance)
+    time_limit_secs = resolve(arguments.time_limit)
+    random = RandomSource(arguments.seed, generator=arguments.generator)
+    algorithm = (GuidedLocalSearch if arguments.algorithm == "gls" else LocalSearch)(
+        neighborhood_size=arguments.neighborhood_size,
+        time_limit_secs=time_limit_secs,
+        random=random,
+    )
+
+    if arguments.workers > 1:
+        best, results = MultiStartSolver(
+            algorithm,
+            workers=arguments.workers,
+            time_limit_secs=time_limit_secs,
+            seed=arguments.seed,
+        ).solve(problem, arguments.max_iterations)
+    else:
+        best = run_start(
+            problem,
+            algorithm,
+            random.entropy,
+            arguments.max_iterations,
+            time() + time_limit_secs,
+            True,
+        )
+        results = [best]
+
+    output = arguments.output or f"{Path(arguments.instance).stem}.sol"
+    write_solution_file(problem, best.solution, output)
+    _, properties = problem.evaluate(best.solution)
+    return {
+        "instance": problem.name,
+        "algorithm": arguments.algorithm,
+        "time_limit_secs": time_limit_secs,
+        # How the time limit was measured, "itc2007" for the competition tool and "cpu" for the less accurate fallback
+        "time_limit_method": (
+            host_calibration().get("method")
+            if arguments.time_limit == ITC2007
+            else "seconds"
+        ),
+        "workers": arguments.workers,
+        "seed": best.seed,
+        "generator": arguments.generator,
+        "value": best.value,
+        "is_valid": best.is_valid,
+        "properties": properties,
+        "iterations": best.iterations,
+        "elapsed_time": best.elapsed_time,
+        "starts": [
+            {
+                "seed": result.seed,
+                "value": result.value,
+                "is_valid": result.is_valid,
+                "iterations": result.iterations,
+            }
+            for result in results
+        ],
+        "solution": str(output),
+    }
+
+
+def compile_instances(arguments: Namespace) -> None:
+    """Compiles each instance next to its definition file, or to `--output`."""
+
+    from gls_uctp.uctp.model import UCTP
+
+    if arguments.output and len(arguments.instances) > 1:
+        raise SystemExit("--output is only allowed with a single instance.")
+    for path in arguments.instances:
+        UCTP.from_file(path).compile(
+            arguments.output or Path(path).with_suffix(".uctpc")
+        )
+
+
+def generate(arguments: Namespace) -> None:
+    """Writes a synthetic instance definition."""
+
+    from gls_uctp.uctp.instance_generator import InstanceSpec, write_instance
+
+    spec = (
+        InstanceSpec.for_lectures(arguments.lectures)
+        if arguments.lectures
+        else InstanceSpec()
+    )
+    spec = spec._replace(
+        **{
+            name: getattr(arguments, name)
+            for name, _ in GENERATOR_FIELDS
+            if getattr(arguments, name) is not None
+        }
+    )
+    with open(arguments.output, "w", encoding="utf8") as file:
+        write_instance(spec, file, arguments.seed)
+
+
+def parser() -> ArgumentParser:
+    """Returns the parser of the command line and its subcommands."""
+
+    root = ArgumentParser(prog="gls-uctp", description=__doc__.splitlines()[0])
+    commands = root.add_subparsers(dest="command", required=True)
+
+    solving = commands.add_parser("solve", help="Solve an instance")
+    solving.add_argument("instance", help="Instance definition file, .ctt")
+    solving.add_argument("--algorithm", choices=ALGORITHMS, default="gls")
+    solving.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Independent starts run in parallel, one search in this process by default",
+    )
+    solving.add_argument(
+        "--time-limit",
+        type=time_limit,
+        default=72.0,
+        help="Seconds, or itc2007 for the calibrated time of the competition",
+    )
+    solving.add_argument(
+        "--seed", type=int, help="Drawn from the system and reported by default"
+    )
+    solving.add_argument(
+        "--generator",
+        choices=("random", "numpy"),
+        default="random",
+        help="Random number generator, NumPy's PCG64 requires NumPy",
+    )
+    solving.add_argument("--neighborhood-size", type=int, default=10)
+    solving.add_argument(
+        "--max-iterations",
+        type=int,
+        default=10**9,
+        help="Bound on the iterations, the time limit stops the search by default",
+    )
+    solving.add_argument(
+        "--output", "-o", help="Best timetable, <instance>.sol by default"
+    )
+    solving.add_argument(
+        "--summary", help="JSON summary of the run, printed if not given"
+    )
+
+    # Listed for the help only, `main` hands their arguments over before parsing
+    for name, (_, help_text) in FORWARDED.items():
+        commands.add_parser(name, help=help_text, add_help=False)
+
+    compiling = commands.add_parser(
+        "compile", help="Compile instances to their binary form"
+    )
+    compiling.add_argument("instances", nargs="+", help="Instance definition files")
+    compiling.add_argument(
+        "--output",
+        "-o",
+        help="Compiled file of a single instance, <instance>.uctpc by default",
+    )
+
+    generating = commands.add_parser(
+        "generate", help="Write a synthetic instance definition"
+    )
+    generating.add_argument("--output", "-o", required=True, help="Instance file, .ctt")
+    generating.add_argument(
+        "--lectures",
+        type=int,
+        help="About this many lectures, with rooms, courses and curricula in proportion",
+    )
+    for name, kind in GENERATOR_FIELDS:
+        generating.add_argument(
+            f"--{name.replace('_', '-')}", type=kind, help="See InstanceSpec"
+        )
+    generating.add_argument("--seed", type=int, default=0)
+    return root
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Runs a subcommand from the command line."""
+
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] in FORWARDED:
+        module = import_module(FORWARDED[argv[0]][0])
+        module.main(argv[1:])
+        return
+
+    arguments = parser().parse_args(argv)
+    if arguments.command == "solve":
+        summary = solve(arguments)
+        if arguments.summary:
+            with open(arguments.summary, "w", encoding="utf8") as file:
+                json.dump(summary, file, indent=2)
+        else:
+            json.dump(summary, sys.stdout, indent=2)
+            sys.stdout.write("\n")
+    elif arguments.command == "compile":
+        compile_instances(arguments)
+    elif arguments.command == "generate":
+        generate(arguments)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Checkpoints of a Guided Local Search, to resume long runs after they are stopped.
+
+A checkpoint is written in the binary layout of compiled instances, with its own magic bytes: a JSON header with the counters, then flat integer tables with the lectures of the current and best solutions as cell ids, the penalties and the state of the random generator. Writes replace the file at once, so a run stopped while writing keeps its previous checkpoint.
+"""
+
+from __future__ import annotations
+from array import array
+from pathlib import Path
+from typing import NamedTuple
+
+from gls_uctp.uctp import compiled
+from gls_uctp.uctp.evaluation import PROPERTIES
+from gls_uctp.uctp.model import UCTP, Solution
+from gls_uctp.uctp.timetable import Timetable
+
+MAGIC = b"GLSCKPT1"
+# Format of the items of each table, in file order
+TABLES = {
+    # Cell id of each lecture, room_day_period * courses + course
+    "current_solution": "q",
+    "best_solution": "q",
+    "feature_penalties": "i",
+    # Penalty of each property, in `PROPERTIES` order
+    "penalties": "q",
+    # Internal state of the Mersenne Twister, empty for NumPy generators, and the drawn numbers not used yet
+    "random_state": "Q",
+    "random_block": "Q",
+}
+
+
+class Checkpoint(NamedTuple):
+    """The state of a Guided Local Search between two of its local searches."""
+
+    iteration: int
+    local_search_iterations: int
+    elapsed_time: float
+    current_solution: Solution
+    best_solution: Solution
+    best_value: int
+    best_is_valid: bool
+    feature_penalties: array
+    penalties: dict[str, int]
+    # As returned by `RandomSource.getstate`
+    random_state: tuple[tuple | dict, array]
+
+
+def solution_cells(solution: Solution) -> array:
+    """Returns the cell id of each lecture of the solution."""
+
+    if isinstance(solution, Timetable):
+        return array("q", solution.lectures)
+
+    cells = array("q")
+    for row, values in enumerate(solution):
+        for column, value in enumerate(values):
+            if value > 0:
+                cells.extend([row * len(values) + column] * value)
+    return cells
+
+
+def cells_solution(problem: UCTP, cells: memoryview, compact: bool) -> Solution:
+    """Returns the solution with a lecture at each cell id."""
+
+    courses = len(problem.courses)
+    if compact:
+        return Timetable(
+            len(problem.rooms) * problem.days * problem.periods_per_day, courses, cells
+        )
+
+    solution = problem.to_graph()
+    for cell in cells:
+        solution[cell // courses][cell % courses] += 1
+    return solution
+
+
+def write_checkpoint(path: str | Path, problem: UCTP, checkpoint: Checkpoint) -> None:
+    """Writes the checkpoint of a search of the problem, replacing the file at once."""
+
+    random_state, block = checkpoint.random_state
+    if isinstance(random_state, dict):
+        # NumPy bit generators have a small state, kept in the header
+        numpy_state, (version, internal, gauss) = random_state, (None, (), None)
+    else:
+        numpy_state, (version, internal, gauss) = None, random_state
+    header = {
+        "instance": problem.name,
+        "source_hash": problem.source_hash,
+        "compact": isinstance(checkpoint.current_solution, Timetable),
+        "iteration": checkpoint.iteration,
+        "local_search_iterations": checkpoint.local_search_iterations,
+        "elapsed_time": checkpoint.elapsed_time,
+        "best_value": checkpoint.best_value,
+        "best_is_valid": checkpoint.best_is_valid,
+        "random_version": version,
+        "random_gauss": gauss,
+        "random_numpy_state": numpy_state,
+    }
+    tables = {
+        "current_solution": solution_cells(checkpoint.current_solution),
+        "best_solution": solution_cells(checkpoint.best_solution),
+        "feature_penalties": checkpoint.feature_penalties,
+        "penalties": array(
+            "q", [checkpoint.penalties.get(prop, 0) for prop in PROPERTIES]
+        ),
+        "random_state": array("Q", internal),
+        "random_block": block,
+    }
+    compiled.write(path, header, tables, MAGIC, TABLES)
+
+
+def read_checkpoint(path: str | Path, problem: UCTP) -> Checkpoint:
+    """Reads the checkpoint of a search of the problem, raising ValueError if it was written for another instance."""
+
+    header, tables = compiled.read(
+        path, MAGIC, TABLES, "Guided Local Search checkpoint"
+    )
+    if header["instance"] != problem.name or (
+        header["source_hash"] is not None
+        and problem.source_hash is not None
+        and header["source_hash"] != problem.source_hash
+    ):
+        raise ValueError(
+            f"{path} is a checkpoint of another instance, {header['instance']}."
+        )
+
+    return Checkpoint(
+        header["iteration"],
+        header["local_search_iterations"],
+        header["elapsed_time"],
+        cells_solution(problem, tables["current_solution"], header["compact"]),
+        cells_solution(problem, tables["best_solution"], header["compact"]),
+        header["best_value"],
+        header["best_is_valid"],
+        array("i", tables["feature_penalties"]),
+        {
+            prop: penalty
+            for prop, penalty in zip(PROPERTIES, tables["penalties"])
+            if penalty
+        },
+        (
+            header.get("random_numpy_state")
+            or (
+                header["random_version"],
+                tuple(tables["random_state"]),
+                header["random_gauss"],
+            ),
+            array("Q", tables["random_block"]),
+        ),
+    )
@@ -0,0 +1,105 @@
+"""Opt-in timers and counters for the phases of the local searches."""
+
+from __future__ import annotations
+from time import perf_counter
+from types import MethodType
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from gls_uctp.local_search.local_search import LocalSearch
+
+# Phase of each method of the searches that is timed
+PHASES = {
+    "neighbors": "neighbors",
+    "candidates": "evaluation",
+    "select": "selection",
+    "accept": "acceptance",
+    "stopping_criterion": "stopping",
+    "update_penalties": "penalties",
+}
+COUNTERS = ("evaluations", "accepted", "rejected", "restarts")
+
+
+class Timed:
+    """Calls a method of a search, adding the time it took and its counts to the instrumentation."""
+
+    def __init__(self, instrumentation: Instrumentation, name: str, method: Any):
+        self.instrumentation = instrumentation
+        self.phase = PHASES[name]
+        self.name = name
+        self.method = method
+
+    def __call__(self, *args, **kwargs):
+        instrumentation = self.instrumentation
+        start = perf_counter()
+        result = self.method(*args, **kwargs)
+        end = perf_counter()
+
+        instrumentation.times[self.phase] += end - start
+        if instrumentation.started is None:
+            instrumentation.started = start
+        instrumentation.finished = end
+
+        counts = instrumentation.counts
+        if self.name == "candidates":
+            counts["evaluations"] += len(result[0])
+        elif self.name == "accept":
+            counts["accepted" if result else "rejected"] += 1
+        elif self.name == "update_penalties":
+            # Penalties are updated once after each local search of the guided search
+            counts["restarts"] += 1
+        return result
+
+
+class Instrumentation:
+    """Times the phases of a search and counts its evaluations, accepted and rejected moves and local search restarts.
+
+    Attaching it replaces the phase methods of the search instance with timed ones, and detaching it removes them, so searches without instrumentation run their methods untouched.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Clears the times and counts."""
+
+        self.times = dict.fromkeys(PHASES.values(), 0.0)
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.started: float | None = None
+        self.finished: float | None = None
+
+    def attach(self, search: LocalSearch) -> Instrumentation:
+        """Times the phase methods of the search instance."""
+
+        for name in PHASES:
+            method = getattr(type(search), name, None)
+            if method is not None:
+                setattr(search, name, Timed(self, name, MethodType(method, search)))
+        return self
+
+    def detach(self, search: LocalSearch) -> None:
+        """Restores the phase methods of the search instance."""
+
+        for name in PHASES:
+            search.__dict__.pop(name, None)
+
+    def summary(self) -> dict[str, Any]:
+        """Returns the time of each phase and its share of the instrumented time, the counts and the evaluations per second."""
+
+        elapsed = (
+            self.finished - self.started
+            if self.started is not None and self.finished is not None
+            else 0.0
+        )
+        return {
+            "elapsed_secs": elapsed,
+            "times": dict(self.times),
+            "shares": {
+                phase: time / elapsed if elapsed else 0.0
+                for phase, time in self.times.items()
+            },
+            "counts": dict(self.counts),
+            "evaluations_per_sec": (
+                self.counts["evaluations"] / elapsed if elapsed else 0.0
+            ),
+        }
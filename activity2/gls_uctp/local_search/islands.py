@@ -0,0 +1,237 @@
+"""Island model of the Guided Local Search, one island per process exchanging elite solutions."""
+
+from __future__ import annotations
+from array import array
+from enum import Enum
+from multiprocessing import Pipe, Process, Queue
+from os import cpu_count
+from queue import Empty
+from time import time
+from typing import NamedTuple
+
+from gls_uctp.calibration import resolve
+from gls_uctp.local_search.local_search import GuidedLocalSearch
+from gls_uctp.local_search.multistart import StartResult, run_start
+from gls_uctp.uctp.model import UCTP, Solution
+from gls_uctp.uctp.random_source import RandomSource
+
+
+class Migrant(NamedTuple):
+    """A local optimum sent from one island to another."""
+
+    value: int
+    is_valid: bool
+    solution: Solution
+
+
+class Migration(NamedTuple):
+    """The elite solutions an island sends, and its penalties if they are shared, per feature or per property."""
+
+    migrants: list[Migrant]
+    penalties: array | dict[str, int] | None = None
+
+
+class IslandGuidedLocalSearch(GuidedLocalSearch):
+    """A Guided Local Search that exchanges its elite local optima with other islands.
+
+    Every `migration_interval` local searches the island sends its `migrants` best local optima to its outboxes, then reads whatever arrived in its inbox without waiting. Incoming migrants replace the worst of its elite, and the next local search starts from the best elite solution when it beats the current one. Shared penalties are merged by keeping the highest penalty of each feature, or of each property.
+    """
+
+    def __init__(
+        self,
+        llambda=0.3,
+        alpha=1 / 4,
+        neighborhood_size: int = 10,
+        time_limit_secs: int | str = 72,
+        batch: bool = False,
+        features: bool | None = None,
+        migration_interval: int = 5,
+        migrants: int = 1,
+        share_penalties: bool = False,
+        instrument: bool = False,
+        random: RandomSource | None = None,
+    ):
+        super().__init__(
+            llambda=llambda,
+            alpha=alpha,
+            neighborhood_size=neighborhood_size,
+            time_limit_secs=time_limit_secs,
+            batch=batch,
+            instrument=instrument,
+            features=features,
+            random=random,
+        )
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.share_penalties = share_penalties
+
+        # Channels to the other islands, connected by the solver
+        self.inbox: Queue | None = None
+        self.outboxes: list[Queue] = []
+
+        # Best local optima of the island, best first
+        self.elite: list[Migrant] = []
+
+    def remember(self, migrant: Migrant) -> None:
+        """Keeps the migrant in the elite if it beats the worst elite solution."""
+
+        self.elite.append(migrant)
+        self.elite.sort(key=lambda elite: (not elite.is_valid, elite.value))
+        del self.elite[self.migrants :]
+
+    def exchange(
+        self,
+        iteration: int,
+        solution: Solution,
+        value: int,
+        is_valid: bool,
+    ) -> tuple[Solution, int, bool]:
+        """Sends and receives migrants every `migration_interval` local searches."""
+
+        self.remember(Migrant(value, is_valid, solution))
+        if iteration % self.migration_interval != 0:
+            return (solution, value, is_valid)
+
+        penalties = None
+        if self.share_penalties:
+            penalties = (
+                array("i", self.feature_penalties)
+                if self.features
+                else dict(self.penalties)
+            )
+        migration = Migration(list(self.elite), penalties)
+        for outbox in self.outboxes:
+            outbox.put(migration)
+
+        while self.inbox is not None:
+            try:
+                incoming = self.inbox.get_nowait()
+            except Empty:
+                break
+            for migrant in incoming.migrants:
+                self.remember(migrant)
+            if isinstance(incoming.penalties, array):
+                # Merged in place, the evaluation state holds the same array
+                penalties = self.feature_penalties
+                for feature, penalty in enumerate(incoming.penalties):
+                    if penalty > penalties[feature]:
+                        penalties[feature] = penalty
+            elif incoming.penalties:
+                for prop, penalty in incoming.penalties.items():
+                    self.penalties[prop] = max(self.penalties[prop], penalty)
+
+        best = self.elite[0]
+        if (not best.is_valid, best.value) < (not is_valid, value):
+            return (best.solution, best.value, best.is_valid)
+        return (solution, value, is_valid)
+
+
+class Topology(Enum):
+    """How the islands are connected."""
+
+    # Each island sends to the next one
+    RING = "ring"
+    # Each island sends to every other one
+    BROADCAST = "broadcast"
+
+
+def _island(
+    problem: UCTP,
+    algorithm: IslandGuidedLocalSearch,
+    seed: int,
+    max_iterations: int,
+    deadline: float,
+    compact: bool,
+    inbox: Queue,
+    outboxes: list[Queue],
+    results,
+) -> None:
+    """Runs an island in its process, sending back its best result."""
+
+    algorithm.inbox = inbox
+    algorithm.outboxes = outboxes
+    # Islands that finish first must not wait for the others to read their migrants
+    for outbox in outboxes:
+        outbox.cancel_join_thread()
+
+    results.send(run_start(problem, algorithm, seed, max_iterations, deadline, compact))
+    results.close()
+
+
+class IslandSolver:
+    """Runs one Guided Local Search island per process, migrating elite solutions between them, until a shared wall-clock deadline."""
+
+    def __init__(
+        self,
+        algorithm: IslandGuidedLocalSearch,
+        islands: int | None = None,
+        topology: Topology = Topology.RING,
+        time_limit_secs: float | str = 72,
+        seed: int | None = None,
+        compact: bool = True,
+    ):
+        time_limit_secs = resolve(time_limit_secs)
+        self.algorithm = algorithm
+        self.islands = islands or cpu_count() or 1
+        self.topology = topology
+        self.time_limit_secs = time_limit_secs
+        self.seed = seed
+        # Timetables are cheaper to migrate than dense matrices
+        self.compact = compact
+
+    def seeds(self) -> list[int]:
+        """Returns the seed of each island, the streams spawned from `seed`."""
+
+        return [
+            source.entropy for source in RandomSource(self.seed).spawn(self.islands)
+        ]
+
+    def outboxes(self, island: int, inboxes: list[Queue]) -> list[Queue]:
+        """Returns the inboxes an island sends its migrants to."""
+
+        if self.islands == 1:
+            return []
+        if self.topology == Topology.RING:
+            return [inboxes[(island + 1) % self.islands]]
+        return [inbox for index, inbox in enumerate(inboxes) if index != island]
+
+    def solve(
+        self, problem: UCTP, max_iterations: int
+    ) -> tuple[StartResult, list[StartResult]]:
+        """Runs the islands until they stop or the deadline is reached. Returns the best result, valid ones first, and the results of every island."""
+
+        deadline = time() + self.time_limit_secs
+        inboxes = [Queue() for _ in range(self.islands)]
+
+        processes = []
+        connections = []
+        for island, seed in enumerate(self.seeds()):
+            receiver, sender = Pipe(duplex=False)
+            process = Process(
+                target=_island,
+                args=(
+                    problem,
+                    self.algorithm,
+                    seed,
+                    max_iterations,
+                    deadline,
+                    self.compact,
+                    inboxes[island],
+                    self.outboxes(island, inboxes),
+                    sender,
+                ),
+            )
+            process.start()
+            sender.close()
+            processes.append(process)
+            connections.append(receiver)
+
+        results = [receiver.recv() for receiver in connections]
+        for process in processes:
+            process.join()
+        for inbox in inboxes:
+            inbox.close()
+            inbox.cancel_join_thread()
+
+        best = min(results, key=lambda result: (not result.is_valid, result.value))
+        return (best, results)
@@ -3,11 +3,63 @@
 from __future__ import annotations
 from collections import defaultdict
 from pprint import pprint
+from array import array
 from time import time
-from typing import Any, Callable
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Sequence
 from enum import Enum
-
+from pathlib import Path
+
+from gls_uctp.calibration import resolve
+from gls_uctp.local_search.checkpoint import (
+    Checkpoint,
+    read_checkpoint,
+    write_checkpoint,
+)
+from gls_uctp.local_search.instrumentation import Instrumentation
+from gls_uctp.local_search.trajectory import (
+    ImprovementTrajectory,
+    RingBuffer,
+    Trajectory,
+)
+from gls_uctp.uctp.evaluation import PROPERTIES, EvaluationState
 from gls_uctp.uctp.model import UCTP, Solution
+from gls_uctp.uctp.moves import Swap
+from gls_uctp.uctp.random_source import RandomSource
+from gls_uctp.uctp.timetable import copy_solution
+
+
+class Progress(NamedTuple):
+    """A progress event of a search, yielded once before the first iteration and after each iteration."""
+
+    iteration: int
+    elapsed_time: float
+    # Augmented by the penalties for the guided local search, so not always integers
+    current_value: float
+    current_is_valid: bool
+    best_value: float
+    best_is_valid: bool
+    # Only set when the best solution improved, to a copy the search will not modify
+    best_solution: Solution | None = None
+    # Iterations of the inner local searches, for the guided local search
+    local_search_iterations: int = 0
+
+
+def follow(
+    events: Iterable[Progress], trajectory: Trajectory | None = None
+) -> tuple[Solution, list[int], Progress]:
+    """Runs a search to its end. Returns the best solution, the best values recorded by the trajectory, by default the first one and each improvement, and the last event."""
+
+    trajectory = trajectory or ImprovementTrajectory()
+    best_solution = None
+    last_progress: Progress | None = None
+    for last_progress in events:
+        if last_progress.best_solution is not None:
+            best_solution = last_progress.best_solution
+        trajectory.record(last_progress.iteration, last_progress.best_value)
+    if last_progress is None:
+        raise ValueError("The search yielded no progress.")
+
+    return (best_solution, trajectory.values(), last_progress)
 
 
 class LocalSearch:
@@ -23,19 +75,29 @@ class LocalSearch:
         self,
         n_opt=NOpt.TWO_OPT,
         neighborhood_size: int = 10,
-        # Time benchmarked for my machine at home
-        time_limit_secs: int = 72,
+        # Time benchmarked for my machine at home, or "itc2007" for the time the ITC2007 benchmark tool allows on this one
+        time_limit_secs: int | str = 72,
+        # Evaluate the whole neighborhood in one vectorized call. Requires NumPy.
+        batch: bool = False,
+        # Time the phases of the search, see `instrumentation.summary()`
+        instrument: bool = False,
+        # Source of the random solutions and moves, the problem's own otherwise
+        random: RandomSource | None = None,
     ):
+        time_limit_secs = resolve(time_limit_secs)
         self.neighborhood_size = neighborhood_size
         self.n_opt = n_opt
         self.time_limit_secs = time_limit_secs
+        self.batch = batch
+        self.instrumentation = Instrumentation().attach(self) if instrument else None
+        self.random = random
 
     def stopping_criterion(
         self,
         iteration: int,
         max_iterations: int,
         start_time: float,
-        _last_solutions: list[int | float],
+        _last_solutions: Sequence[int | float],
     ) -> bool:
         """Returns whether the local search should stop or not. True means stop, False means continue."""
 
@@ -61,74 +123,201 @@ class LocalSearch:
             if offences > 0
         )
 
-    # TODO make it yield instead of returning a list
     def search(
         self,
         initial_solution: Solution,
         max_iterations: int,
         problem: UCTP,
         stopping_criterion: Any = None,
+        trajectory: Trajectory | None = None,
     ) -> tuple[Solution, list[int], bool, int, float]:
-        """Runs the local search algorithm for the problem. Returns the best solution, the score of the solution, the number of iterations and time elapsed."""
+        """Runs the local search algorithm for the problem. Returns the best solution, the scores recorded by the trajectory, the number of iterations and time elapsed."""
 
-        stopping_criterion = stopping_criterion or self.stopping_criterion
+        best_solution, best_solution_value_list, progress = follow(
+            self.iterate(initial_solution, max_iterations, problem, stopping_criterion),
+            trajectory,
+        )
+
+        # Return the best solution.
+        return (
+            best_solution,
+            best_solution_value_list,
+            progress.best_is_valid,
+            progress.iteration,
+            progress.elapsed_time,
+        )
 
-        # Start the timer
-        start_time = time()
-
-        # Initialize the solution.
-        current_solution = initial_solution
-        current_solution_value, constraints = problem.evaluate(current_solution)
-        current_solution_is_valid = self.is_solution_valid(constraints)
-
-        # Initialize the best solution.
-        best_solution = current_solution
-        best_solution_value = current_solution_value
-        best_solution_value_list = [best_solution_value]
-        best_solution_is_valid = current_solution_is_valid
-
-        # Initialize the iteration.
-        iteration = 0
-
-        # While the stopping criterion is not met.
-        while not stopping_criterion(
-            iteration, max_iterations, start_time, best_solution_value_list[-5:]
-        ):
-            # Increment the iteration counter.
-            iteration += 1
-            # Get the best neighbor of the current solution.
-
-            neighbors = problem.neighbors(current_solution, self.neighborhood_size)
-            neighbors = [
-                (neighbor, problem.evaluate(neighbor)) for neighbor in neighbors
-            ]
-            best_neighbor, (best_neighbor_value, constraints) = min(
-                neighbors, key=lambda neighbor: neighbor[1][0]
+    def iterate(
+        self,
+        initial_solution: Solution,
+        max_iterations: int,
+        problem: UCTP,
+        stopping_criterion: Any = None,
+        state: EvaluationState | None = None,
+    ) -> Iterator[Progress]:
+        """Runs the local search algorithm for the problem, yielding its progress after each iteration. The search can be abandoned at any event, keeping the last best solution yielded.
+
+        Given the evaluation state of the initial solution, the search moves its solution in place instead of a copy.
+        """
+
+        stopping_criterion = stopping_criterion or self.stopping_criterion
+        with problem.drawing_from(self.random):
+            # Start the timer
+            start_time = time()
+
+            # Initialize the solution. Moves are applied to it through its evaluation state.
+            if state is None:
+                current_solution = copy_solution(initial_solution)
+                state = problem.evaluation_state(current_solution)
+            else:
+                current_solution = state.solution
+            current_solution_value = self.state_value(state)
+            current_solution_is_valid = self.is_solution_valid(state.properties)
+
+            # Initialize the best solution.
+            best_solution = copy_solution(current_solution)
+            best_solution_value = current_solution_value
+            best_solution_is_valid = current_solution_is_valid
+            # Only the last values are needed by the stopping criteria
+            last_solution_values = RingBuffer(5)
+            last_solution_values.record(0, best_solution_value)
+
+            # Initialize the iteration.
+            iteration = 0
+
+            yield Progress(
+                iteration,
+                time() - start_time,
+                current_solution_value,
+                current_solution_is_valid,
+                best_solution_value,
+                best_solution_is_valid,
+                best_solution,
             )
-            best_neighbor_is_valid = self.is_solution_valid(constraints)
 
-            # If the best neighbor is better than the current solution.
-            if best_neighbor_value < current_solution_value:
-                if not current_solution_is_valid or best_neighbor_is_valid:
-                    # Update the solution.
-                    current_solution = best_neighbor
+            # While the stopping criterion is not met.
+            while not stopping_criterion(
+                iteration, max_iterations, start_time, last_solution_values
+            ):
+                # Increment the iteration counter.
+                iteration += 1
+                improved = None
+                # Get the best neighboring move of the current solution.
+
+                moves = self.neighbors(problem, state)
+                best_move, best_neighbor_value, constraints = self.select(
+                    moves, *self.candidates(problem, state, moves)
+                )
+                best_neighbor_is_valid = self.is_solution_valid(constraints)
+
+                # If the best neighbor is better than the current solution.
+                if self.accept(
+                    state,
+                    best_move,
+                    best_neighbor_value,
+                    best_neighbor_is_valid,
+                    current_solution_value,
+                    current_solution_is_valid,
+                ):
                     current_solution_value = best_neighbor_value
                     current_solution_is_valid = best_neighbor_is_valid
 
-                # If the new current solution is better than the previous best solution.
-                if current_solution_value < best_solution_value:
-                    if not best_solution_is_valid or current_solution_is_valid:
-                        # Update the best solution.
-                        best_solution = current_solution
-                        best_solution_value = current_solution_value
-                        best_solution_is_valid = current_solution_is_valid
+                    # If the new current solution is better than the previous best solution.
+                    if current_solution_value < best_solution_value:
+                        if not best_solution_is_valid or current_solution_is_valid:
+                            # Update the best solution.
+                            best_solution = copy_solution(current_solution)
+                            best_solution_value = current_solution_value
+                            best_solution_is_valid = current_solution_is_valid
+                            improved = best_solution
+
+                last_solution_values.record(iteration, best_solution_value)
+
+                yield Progress(
+                    iteration,
+                    time() - start_time,
+                    current_solution_value,
+                    current_solution_is_valid,
+                    best_solution_value,
+                    best_solution_is_valid,
+                    improved,
+                )
+
+    def objective(self, score: int, properties: dict[str, int]) -> float:
+        """Returns the value minimized by the search for a solution with the given score and properties."""
+
+        return score
+
+    def state_value(self, state: EvaluationState) -> float:
+        """Returns the value minimized by the search for the current solution of the state."""
+
+        return self.objective(state.score, state.properties)
+
+    def candidate_values(self, scores, properties):
+        """Returns the objective value of each candidate of a batch, from the arrays of their scores and property counts."""
+
+        return scores
+
+    def neighbors(self, problem: UCTP, state: EvaluationState) -> list[Swap]:
+        """Returns the moves of the neighborhood of the current solution."""
+
+        return list(problem.neighborhood(state, self.neighborhood_size))
+
+    def candidates(
+        self, problem: UCTP, state: EvaluationState, moves: list[Swap]
+    ) -> tuple[Any, Any]:
+        """Evaluates the moves against the state of the current solution. Returns the objective value of each move and the properties of the solution it leads to."""
+
+        if self.batch:
+            scores, properties = problem.evaluate_moves(state, moves)
+            return (self.candidate_values(scores, properties), properties)
+
+        current_score = state.score
+        current_properties = state.properties
+
+        values = []
+        candidate_properties = []
+        for move in moves:
+            delta, delta_properties = move.delta(state)
+            properties = current_properties.copy()
+            for prop, count in delta_properties.items():
+                properties[prop] += count
+            values.append(self.objective(current_score + delta, properties))
+            candidate_properties.append(properties)
+
+        return (values, candidate_properties)
+
+    def select(
+        self, moves: list[Swap], values: Any, properties: Any
+    ) -> tuple[Swap, int, dict[str, int]]:
+        """Returns the move of lowest value, the first one on ties, its value and the properties of the solution it leads to."""
+
+        if self.batch:
+            best = int(values.argmin())
+            return (
+                moves[best],
+                int(values[best]),
+                dict(zip(PROPERTIES, properties[best].tolist())),
+            )
 
-            best_solution_value_list.append(best_solution_value)
-        # Finish the timer
-        elapsed_time = time() - start_time
+        best = min(range(len(moves)), key=values.__getitem__)
+        return (moves[best], values[best], properties[best])
 
-        # Return the best solution.
-        return (best_solution, best_solution_value_list, best_solution_is_valid, iteration, elapsed_time)
+    def accept(
+        self,
+        state: EvaluationState,
+        move: Swap,
+        value: int,
+        is_valid: bool,
+        current_value: int,
+        current_is_valid: bool,
+    ) -> bool:
+        """Applies the move to the current solution if it improves it, without losing its validity. Returns whether it was applied."""
+
+        if value < current_value and (not current_is_valid or is_valid):
+            state.apply(move)
+            return True
+        return False
 
 
 class GuidedLocalSearch(LocalSearch):
@@ -139,14 +328,35 @@ class GuidedLocalSearch(LocalSearch):
         llambda=0.3,
         alpha=1 / 4,
         neighborhood_size: int = 10,
-        time_limit_secs: int = 72,
+        time_limit_secs: int | str = 72,
+        batch: bool = False,
+        instrument: bool = False,
+        # Penalize the violations of each component instead of each property, by default unless batched. Batches only support properties.
+        features: bool | None = None,
+        # File the state of the search is saved to every `checkpoint_interval_secs`, see `resume`
+        checkpoint_path: str | Path | None = None,
+        checkpoint_interval_secs: float = 5,
+        random: RandomSource | None = None,
     ):
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval_secs = checkpoint_interval_secs
         self.penalties: dict[str, int] = defaultdict(int)
+        # Penalty of each feature of the evaluation state, sized by the first search
+        self.feature_penalties = array("i")
+        if features and batch:
+            raise ValueError(
+                "Feature penalties are not supported by batches, pass features=False."
+            )
+        self.features = not batch if features is None else features
         self.llambda = llambda
         self.alpha = alpha
 
         super().__init__(
-            neighborhood_size=neighborhood_size, time_limit_secs=time_limit_secs
+            neighborhood_size=neighborhood_size,
+            time_limit_secs=time_limit_secs,
+            batch=batch,
+            instrument=instrument,
+            random=random,
         )
 
     def stopping_criterion(
@@ -154,7 +364,7 @@ class GuidedLocalSearch(LocalSearch):
         iteration: int,
         max_iterations: int,
         start_time: float,
-        last_solutions: list[int | float],
+        last_solutions: Sequence[int | float],
     ) -> bool:
         """Returns whether the local search should stop or not. True means stop, False means continue."""
 
@@ -164,7 +374,12 @@ class GuidedLocalSearch(LocalSearch):
 
         # If the last 3 solutions only include the same 2 or less solutions.
         if len(last_solutions) >= 3:
-            if len(set(last_solutions[-3:])) <= 2:
+            last, previous, before = (
+                last_solutions[-1],
+                last_solutions[-2],
+                last_solutions[-3],
+            )
+            if last == previous or previous == before or last == before:
                 # print(
                 #     f"Stopped because of same solutions found in the last 4 iterations: {set(last_solutions[-3:])}"
                 # )
@@ -204,6 +419,97 @@ class GuidedLocalSearch(LocalSearch):
 
         return int(augmentation)
 
+    def objective(self, score: int, properties: dict[str, int]) -> float:
+        """Augments the score with the heuristic information"""
+
+        return score + self.augmentation_factor(properties)
+
+    def state_value(self, state: EvaluationState) -> float:
+        """Augments the score of the state with the penalties of its violated features, or of its properties"""
+
+        if self.features:
+            return state.score + self.llambda * self.alpha * state.penalty
+        return super().state_value(state)
+
+    def candidates(
+        self, problem: UCTP, state: EvaluationState, moves: list[Swap]
+    ) -> tuple[Any, Any]:
+        """Evaluates the moves against the state of the current solution, augmenting their scores with the penalties of the features they leave violated"""
+
+        if not self.features:
+            return super().candidates(problem, state, moves)
+
+        factor = self.llambda * self.alpha
+        current_score = state.score
+        current_penalty = state.penalty
+        current_properties = state.properties
+
+        values = []
+        candidate_properties = []
+        for move in moves:
+            delta, delta_properties, penalty = state.augmented_delta(move)
+            properties = current_properties.copy()
+            for prop, count in delta_properties.items():
+                properties[prop] += count
+            values.append(current_score + delta + factor * (current_penalty + penalty))
+            candidate_properties.append(properties)
+
+        return (values, candidate_properties)
+
+    def candidate_values(self, scores, properties):
+        """Augments the values of a batch of candidates with the heuristic information"""
+
+        penalties = [self.penalties[prop] for prop in PROPERTIES]
+        augmentation = self.llambda * self.alpha * ((properties > 0) @ penalties)
+
+        return scores + augmentation.astype(int)
+
+    def track(self, state: EvaluationState) -> EvaluationState:
+        """Tracks the features of the state against the penalties of the search."""
+
+        if self.features:
+            if len(self.feature_penalties) != state.features:
+                self.feature_penalties = array("i", bytes(4 * state.features))
+            state.track_features(self.feature_penalties)
+        return state
+
+    def update_penalties(
+        self, state: EvaluationState, properties: dict[str, int]
+    ) -> None:
+        """Penalizes the features of the local optimum of maximum utility, its cost over one plus its penalty, or every property it violates."""
+
+        if not self.features:
+            for prop in [prop for prop, val in properties.items() if val > 0]:
+                self.penalties[prop] += 1
+            return
+
+        costs = state.feature_costs
+        penalties = self.feature_penalties
+        utilities = {
+            feature: costs[feature] / (1 + penalties[feature])
+            for feature in state.violated
+        }
+        if utilities:
+            maximum = max(utilities.values())
+            state.penalize(
+                [
+                    feature
+                    for feature, utility in utilities.items()
+                    if utility == maximum
+                ]
+            )
+
+    def exchange(
+        self,
+        iteration: int,
+        solution: Solution,
+        value: int,
+        is_valid: bool,
+    ) -> tuple[Solution, int, bool]:
+        """Called after each local search with its local optimum. Returns the solution the next local search starts from, its value and validity."""
+
+        return (solution, value, is_valid)
+
     def augmented_objective_function(
         self,
         solution: Solution,
@@ -223,67 +529,210 @@ class GuidedLocalSearch(LocalSearch):
         initial_solution: Solution,
         max_iterations: int,
         problem: UCTP,
+        trajectory: Trajectory | None = None,
     ) -> tuple[Solution, list[int], bool, int, float, int]:
-        """Runs the local search algorithm for the problem. Returns the best solution, the score of the solution, the number of iterations, the number of local search iterations and time elapsed."""
+        """Runs the local search algorithm for the problem. Returns the best solution, the scores recorded by the trajectory, the number of iterations, the number of local search iterations and time elapsed."""
 
-        # Start the timer
-        start_time = time()
+        best_solution, best_solution_value_list, progress = follow(
+            self.iterate(initial_solution, max_iterations, problem), trajectory
+        )
 
-        original_objective_function = problem.evaluate
-        problem.evaluate = lambda solution: self.augmented_objective_function(
-            solution, original_objective_function
+        return (
+            best_solution,
+            best_solution_value_list,
+            progress.best_is_valid,
+            progress.iteration,
+            progress.elapsed_time,
+            progress.local_search_iterations,
         )
-        # print(problem.evaluate)
-        # print(original_objective_function)
 
-        iteration = 0
-        local_search_iterations = 0
+    def resume(
+        self,
+        path: str | Path,
+        problem: UCTP,
+        max_iterations: int,
+    ) -> tuple[Solution, list[int], bool, int, float, int]:
+        """Continues the search saved in a checkpoint file, counting the iterations and time before it. Returns as `search`."""
+
+        checkpoint = read_checkpoint(path, problem)
+        best_solution, best_solution_value_list, progress = follow(
+            self.iterate(
+                checkpoint.best_solution,
+                max_iterations,
+                problem,
+                resume_from=checkpoint,
+            )
+        )
 
-        current_solution = initial_solution
+        return (
+            best_solution,
+            best_solution_value_list,
+            progress.best_is_valid,
+            progress.iteration,
+            progress.elapsed_time,
+            progress.local_search_iterations,
+        )
 
-        best_solution = initial_solution
-        best_solution_value, constraints = original_objective_function(best_solution)
-        best_solution_value_list = [best_solution_value]
-        best_solution_is_valid = self.is_solution_valid(constraints)
+    def save_checkpoint(
+        self,
+        problem: UCTP,
+        state: EvaluationState,
+        progress: Progress,
+        best_solution: Solution,
+    ) -> None:
+        """Writes the state of the search after the progress event to the checkpoint file."""
+
+        write_checkpoint(
+            self.checkpoint_path,
+            problem,
+            Checkpoint(
+                progress.iteration,
+                progress.local_search_iterations,
+                progress.elapsed_time,
+                state.solution,
+                best_solution,
+                progress.best_value,
+                progress.best_is_valid,
+                self.feature_penalties,
+                self.penalties,
+                problem.sampler.getstate(),
+            ),
+        )
 
-        while not super().stopping_criterion(iteration, max_iterations, start_time, []):
-            iteration += 1
+    def iterate(
+        self,
+        initial_solution: Solution,
+        max_iterations: int,
+        problem: UCTP,
+        stopping_criterion: Any = None,
+        resume_from: Checkpoint | None = None,
+    ) -> Iterator[Progress]:
+        """Runs the guided local search algorithm for the problem, yielding its progress after each local search. The search can be abandoned at any event, keeping the last best solution yielded.
+
+        Given a checkpoint, the search continues from its current solution, penalties and random state instead of the initial solution.
+        """
+
+        with problem.drawing_from(self.random):
+            # Start the timer
+            start_time = time()
+
+            iteration = 0
+            local_search_iterations = 0
+            best_solution = initial_solution
+
+            if resume_from is not None:
+                start_time -= resume_from.elapsed_time
+                iteration = resume_from.iteration
+                local_search_iterations = resume_from.local_search_iterations
+                best_solution = resume_from.best_solution
+                self.penalties = defaultdict(int, resume_from.penalties)
+                self.feature_penalties = resume_from.feature_penalties
+                problem.sampler.setstate(resume_from.random_state)
+                initial_solution = resume_from.current_solution
+
+            # The local searches minimize the augmented objective through `state_value` and `candidates`, and all move the solution of the same state
+            state = self.track(
+                problem.evaluation_state(copy_solution(initial_solution))
+            )
 
-            (
-                current_solution,
-                _current_solution_value_list,
+            current_solution_value, constraints = state.evaluation()
+            current_solution_is_valid = self.is_solution_valid(constraints)
+            if resume_from is None:
+                best_solution_value = current_solution_value
+                best_solution_is_valid = current_solution_is_valid
+            else:
+                best_solution_value = resume_from.best_value
+                best_solution_is_valid = resume_from.best_is_valid
+
+            checkpointed = time()
+
+            yield Progress(
+                iteration,
+                time() - start_time,
+                current_solution_value,
                 current_solution_is_valid,
-                additional_local_search_iterations,
-                _time_elapsed,
-            ) = super().search(
-                current_solution, max_iterations, problem, self.stopping_criterion
-            )
-            current_solution_value, properties = original_objective_function(
-                current_solution
+                best_solution_value,
+                best_solution_is_valid,
+                best_solution,
+                local_search_iterations,
             )
-            for prop in [prop for prop, val in properties.items() if val > 0]:
-                self.penalties[prop] += 1
-
-
-            local_search_iterations += additional_local_search_iterations
 
-            # Updating the best solution
-            if current_solution_value < best_solution_value:
-                if not best_solution_is_valid or current_solution_is_valid:
-                    best_solution = current_solution
-                    best_solution_value = current_solution_value
-                    best_solution_is_valid = current_solution_is_valid
-
-            best_solution_value_list.append(best_solution_value)
-
-        # Finish the timer
-        elapsed_time = time() - start_time
-
-        return (
-            best_solution,
-            best_solution_value_list,
-            best_solution_is_valid,
-            iteration,
-            elapsed_time,
-            local_search_iterations,
-        )
+            while not super().stopping_criterion(
+                iteration, max_iterations, start_time, ()
+            ):
+                iteration += 1
+                improved = None
+
+                # The local optimum is the last best solution, a copy the state does not modify
+                local_optimum: Solution | None = None
+                last_progress: Progress | None = None
+                for last_progress in super().iterate(
+                    state.solution,
+                    max_iterations,
+                    problem,
+                    stopping_criterion or self.stopping_criterion,
+                    state,
+                ):
+                    if last_progress.best_solution is not None:
+                        local_optimum = last_progress.best_solution
+                if local_optimum is None or last_progress is None:
+                    raise RuntimeError("The local search yielded no best solution.")
+                if last_progress.current_value != last_progress.best_value:
+                    # The state moved past the local optimum, it is penalized and evaluated at the optimum
+                    state = self.track(
+                        problem.evaluation_state(copy_solution(local_optimum))
+                    )
+                current_solution = local_optimum
+                current_solution_is_valid = last_progress.best_is_valid
+                additional_local_search_iterations = last_progress.iteration
+
+                current_solution_value, properties = state.evaluation()
+                self.update_penalties(state, properties)
+
+                local_search_iterations += additional_local_search_iterations
+
+                (
+                    current_solution,
+                    current_solution_value,
+                    current_solution_is_valid,
+                ) = self.exchange(
+                    iteration,
+                    current_solution,
+                    current_solution_value,
+                    current_solution_is_valid,
+                )
+                if current_solution is not local_optimum:
+                    # The next local search starts from another solution
+                    state = self.track(
+                        problem.evaluation_state(copy_solution(current_solution))
+                    )
+                elif self.features:
+                    # Penalties may have been changed by the exchange
+                    state.refresh_penalty()
+
+                # Updating the best solution
+                if current_solution_value < best_solution_value:
+                    if not best_solution_is_valid or current_solution_is_valid:
+                        best_solution = current_solution
+                        best_solution_value = current_solution_value
+                        best_solution_is_valid = current_solution_is_valid
+                        improved = best_solution
+
+                progress = Progress(
+                    iteration,
+                    time() - start_time,
+                    current_solution_value,
+                    current_solution_is_valid,
+                    best_solution_value,
+                    best_solution_is_valid,
+                    improved,
+                    local_search_iterations,
+                )
+                if (
+                    self.checkpoint_path is not None
+                    and time() - checkpointed >= self.checkpoint_interval_secs
+                ):
+                    self.save_checkpoint(problem, state, progress, best_solution)
+                    checkpointed = time()
+
+                yield progress
@@ -0,0 +1,156 @@
+"""Independent local searches from many random starts, run in parallel over a process pool."""
+
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+from time import time
+from typing import NamedTuple, Sequence
+
+from gls_uctp.calibration import resolve
+from gls_uctp.local_search.local_search import LocalSearch, Progress
+from gls_uctp.uctp.model import UCTP, Solution
+from gls_uctp.uctp.random_source import RandomSource
+
+# The problem of a worker process, sent once by the pool initializer instead of with every task
+_problem: UCTP | None = None
+
+
+def _initialize(problem: UCTP) -> None:
+    """Stores the problem in the worker process."""
+
+    global _problem
+    _problem = problem
+
+
+class StartResult(NamedTuple):
+    """The outcome of the search from one random start."""
+
+    seed: int
+    solution: Solution
+    value: int
+    is_valid: bool
+    iterations: int
+    elapsed_time: float
+    # Wall-clock time, from `time.time`, value and validity of each new best solution, comparable across processes
+    improvements: tuple[tuple[float, int, bool], ...] = ()
+
+
+def _start(
+    algorithm: LocalSearch,
+    seed: int,
+    max_iterations: int,
+    deadline: float,
+    compact: bool,
+) -> StartResult:
+    """Runs a start in a worker process, on the problem of the process."""
+
+    return run_start(_problem, algorithm, seed, max_iterations, deadline, compact)
+
+
+def run_start(
+    problem: UCTP,
+    algorithm: LocalSearch,
+    seed: int,
+    max_iterations: int,
+    deadline: float,
+    compact: bool,
+) -> StartResult:
+    """Runs the search from a random start seeded by `seed`, until it stops or the deadline is reached. The source of the algorithm, or else of the problem, is seeded and keeps its generator. The problem draws from its own source again once the start ends."""
+
+    (algorithm.random or problem.random).seed(seed)
+    with problem.drawing_from(algorithm.random):
+        initial_solution = problem.random_solution(compact)
+
+    def stopping_criterion(
+        iteration: int,
+        max_iterations: int,
+        start_time: float,
+        last_solutions: Sequence[int | float],
+    ) -> bool:
+        return time() >= deadline or algorithm.stopping_criterion(
+            iteration, max_iterations, start_time, last_solutions
+        )
+
+    best_solution = initial_solution
+    improvements = []
+    last_progress: Progress | None = None
+    for last_progress in algorithm.iterate(
+        initial_solution, max_iterations, problem, stopping_criterion
+    ):
+        if last_progress.best_solution is not None:
+            best_solution = last_progress.best_solution
+            improvements.append(
+                (time(), last_progress.best_value, last_progress.best_is_valid)
+            )
+        if time() >= deadline:
+            break
+    if last_progress is None:
+        raise ValueError("The search yielded no progress.")
+
+    return StartResult(
+        seed,
+        best_solution,
+        last_progress.best_value,
+        last_progress.best_is_valid,
+        last_progress.iteration,
+        last_progress.elapsed_time,
+        tuple(improvements),
+    )
+
+
+class MultiStartSolver:
+    """Runs independent searches from random starts across processes, sharing a wall-clock deadline.
+
+    The problem is sent to each worker once, when the pool starts, and workers only send back the best solution of each start and its summary. The seeds of the starts are drawn from `seed`, so a solver with the same seed and iteration bound repeats its results.
+    """
+
+    def __init__(
+        self,
+        algorithm: LocalSearch,
+        starts: int | None = None,
+        workers: int | None = None,
+        time_limit_secs: float | str = 72,
+        seed: int | None = None,
+        compact: bool = True,
+    ):
+        time_limit_secs = resolve(time_limit_secs)
+        self.algorithm = algorithm
+        self.workers = workers or cpu_count() or 1
+        self.starts = starts or self.workers
+        self.time_limit_secs = time_limit_secs
+        self.seed = seed
+        # Searches on timetables are cheaper to send back than dense matrices
+        self.compact = compact
+
+    def seeds(self) -> list[int]:
+        """Returns the seed of each start, the streams spawned from `seed`."""
+
+        return [source.entropy for source in RandomSource(self.seed).spawn(self.starts)]
+
+    def solve(
+        self, problem: UCTP, max_iterations: int
+    ) -> tuple[StartResult, list[StartResult]]:
+        """Runs the starts until they stop or the deadline is reached. Returns the best result, valid ones first, and the results of every start."""
+
+        deadline = time() + self.time_limit_secs
+
+        with ProcessPoolExecutor(
+            max_workers=min(self.workers, self.starts),
+            initializer=_initialize,
+            initargs=(problem,),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _start,
+                    self.algorithm,
+                    seed,
+                    max_iterations,
+                    deadline,
+                    self.compact,
+                )
+                for seed in self.seeds()
+            ]
+            results = [future.result() for future in futures]
+
+        best = min(results, key=lambda result: (not result.is_valid, result.value))
+        return (best, results)
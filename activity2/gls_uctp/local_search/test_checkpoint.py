@@ -0,0 +1,92 @@
+"""Tests for the checkpoints of the Guided Local Search."""
+
+import pytest
+
+from gls_uctp.local_search.checkpoint import read_checkpoint
+from gls_uctp.local_search.local_search import GuidedLocalSearch
+from gls_uctp.uctp.model import UCTP
+from gls_uctp.uctp.random_source import RandomSource
+
+paths = [f"instances/test/comp{instance:02}.ctt" for instance in range(1, 22)]
+
+
+def test_checkpoint_round_trip(tmp_path):
+    """A checkpoint holds the solutions, penalties, counters and random state of the search"""
+
+    path = tmp_path / "search.ckpt"
+    for compact in (False, True):
+        problem = UCTP.from_file(paths[0])
+        problem.sampler.seed(7)
+        search = GuidedLocalSearch(checkpoint_path=path, checkpoint_interval_secs=0)
+        events = search.iterate(problem.random_solution(compact), 10**9, problem)
+        for progress in events:
+            if progress.iteration == 3:
+                break
+        events.close()
+
+        checkpoint = read_checkpoint(path, problem)
+        assert checkpoint.iteration == 3
+        assert checkpoint.local_search_iterations == progress.local_search_iterations
+        assert checkpoint.best_value == progress.best_value
+        assert problem.evaluate(checkpoint.best_solution)[0] == progress.best_value
+        assert checkpoint.feature_penalties == search.feature_penalties
+        assert type(checkpoint.current_solution) is type(checkpoint.best_solution)
+        # The random state is the one after the last local search
+        expected = [problem.sampler.below(1 << 40) for _ in range(5)]
+        problem.sampler.setstate(checkpoint.random_state)
+        assert [problem.sampler.below(1 << 40) for _ in range(5)] == expected
+        assert list(tmp_path.iterdir()) == [path]
+
+
+def test_resume(tmp_path):
+    """A resumed search continues the counters, penalties and time of the checkpoint"""
+
+    path = tmp_path / "search.ckpt"
+    problem = UCTP.from_file(paths[0])
+    search = GuidedLocalSearch(checkpoint_path=path, checkpoint_interval_secs=0)
+    search.search(problem.random_solution(), 4, problem)
+    checkpoint = read_checkpoint(path, problem)
+
+    problem = UCTP.from_file(paths[0])
+    resumed = GuidedLocalSearch(time_limit_secs=60)
+    (
+        solution,
+        values,
+        _valid,
+        iterations,
+        elapsed_time,
+        ls_iterations,
+    ) = resumed.resume(path, problem, 8)
+
+    assert iterations == 8
+    assert ls_iterations > checkpoint.local_search_iterations
+    assert elapsed_time >= checkpoint.elapsed_time
+    assert values[0] == checkpoint.best_value
+    assert values[-1] <= checkpoint.best_value
+    assert problem.evaluate(solution)[0] == values[-1]
+    assert sum(resumed.feature_penalties) > sum(checkpoint.feature_penalties)
+
+    with pytest.raises(ValueError, match="another instance"):
+        read_checkpoint(path, UCTP.from_file(paths[1]))
+
+
+def test_checkpoint_numpy_random_state(tmp_path):
+    """Checkpoints of searches drawing from NumPy keep the state of its generator"""
+
+    pytest.importorskip("numpy")
+
+    path = tmp_path / "search.ckpt"
+    problem = UCTP.from_file(paths[0])
+    search = GuidedLocalSearch(
+        checkpoint_path=path,
+        checkpoint_interval_secs=0,
+        random=RandomSource(7, generator="numpy"),
+    )
+    search.search(problem.random_solution(), 3, problem)
+
+    checkpoint = read_checkpoint(path, problem)
+    expected = [search.random.below(1 << 40) for _ in range(5)]
+    restored = RandomSource(7)
+    restored.setstate(checkpoint.random_state)
+    assert restored.generator == "numpy"
+    assert [restored.below(1 << 40) for _ in range(5)] == expected
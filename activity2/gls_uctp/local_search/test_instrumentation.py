@@ -0,0 +1,55 @@
+"""Tests for the instrumentation of the local searches."""
+
+import pickle
+
+from gls_uctp.local_search.local_search import LocalSearch, GuidedLocalSearch
+from gls_uctp.uctp.model import UCTP
+
+paths = [f"instances/test/comp{instance:02}.ctt" for instance in range(1, 22)]
+
+
+def test_local_search_instrumentation():
+    """Every iteration evaluates the neighborhood and accepts or rejects its best move"""
+
+    problem = UCTP.from_file(paths[0])
+    search = LocalSearch(neighborhood_size=20, instrument=True)
+
+    (_, _, _, iterations, elapsed_time) = search.search(
+        problem.random_solution(), 100, problem
+    )
+    summary = search.instrumentation.summary()
+
+    assert iterations == 100
+    assert summary["counts"]["evaluations"] == 100 * 20
+    assert summary["counts"]["accepted"] + summary["counts"]["rejected"] == 100
+    assert summary["counts"]["restarts"] == 0
+    assert 0 < summary["elapsed_secs"] <= elapsed_time
+    assert summary["evaluations_per_sec"] > 0
+    for phase in ("neighbors", "evaluation", "selection", "acceptance", "stopping"):
+        assert summary["times"][phase] > 0
+    assert sum(summary["shares"].values()) <= 1
+
+    # Instrumented searches can still be sent to other processes
+    assert pickle.loads(pickle.dumps(search)).search(
+        problem.random_solution(), 5, problem
+    )
+
+    search.instrumentation.detach(search)
+    assert "candidates" not in vars(search)
+    assert "candidates" not in vars(LocalSearch())
+
+
+def test_guided_local_search_instrumentation():
+    """Each local search of the guided search is a restart updating the penalties"""
+
+    problem = UCTP.from_file(paths[0])
+    search = GuidedLocalSearch(neighborhood_size=10, instrument=True)
+
+    (_, _, _, iterations, _, local_search_iterations) = search.search(
+        problem.random_solution(), 5, problem
+    )
+    summary = search.instrumentation.summary()
+
+    assert summary["counts"]["restarts"] == iterations
+    assert summary["counts"]["evaluations"] == local_search_iterations * 10
+    assert summary["times"]["penalties"] > 0
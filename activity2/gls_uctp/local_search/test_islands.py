@@ -0,0 +1,80 @@
+"""Tests for the island model of the Guided Local Search."""
+
+from queue import Queue
+
+from gls_uctp.local_search.islands import (
+    IslandGuidedLocalSearch,
+    IslandSolver,
+    Migrant,
+    Topology,
+)
+from gls_uctp.uctp.model import UCTP
+
+paths = [f"instances/test/comp{instance:02}.ctt" for instance in range(1, 22)]
+
+
+def test_exchange_adopts_better_migrant():
+    """An island starts its next local search from a better incoming migrant"""
+
+    problem = UCTP.from_file(paths[0])
+    sender = IslandGuidedLocalSearch(migrants=2, share_penalties=True, features=False)
+    receiver = IslandGuidedLocalSearch(migrants=2, features=False)
+    sender.inbox, receiver.inbox = Queue(), Queue()
+    sender.outboxes = [receiver.inbox]
+
+    good, bad = problem.random_solution(), problem.random_solution()
+    sender.penalties["S1"] = 3
+    sender.exchange(5, good, 10, True)
+
+    assert receiver.exchange(5, bad, 20, True) == (good, 10, True)
+    assert receiver.penalties["S1"] == 3
+    assert receiver.elite == [Migrant(10, True, good), Migrant(20, True, bad)]
+
+    # Valid solutions are preferred to lower invalid ones
+    sender.exchange(10, bad, 1, False)
+    assert receiver.exchange(10, bad, 30, True) == (good, 10, True)
+
+    # Only every `migration_interval` local searches
+    sender.exchange(11, good, 0, True)
+    assert receiver.inbox.empty()
+
+
+def test_exchange_merges_feature_penalties():
+    """Shared feature penalties are merged in place by keeping the highest of each feature"""
+
+    problem = UCTP.from_file(paths[0])
+    sender = IslandGuidedLocalSearch(share_penalties=True)
+    receiver = IslandGuidedLocalSearch()
+    receiver.inbox = Queue()
+    sender.outboxes = [receiver.inbox]
+    sender.track(problem.evaluation_state(problem.random_solution()))
+    state = receiver.track(problem.evaluation_state(problem.random_solution()))
+    penalties = receiver.feature_penalties
+
+    sender.feature_penalties[0] = 3
+    sender.feature_penalties[1] = 1
+    receiver.feature_penalties[1] = 2
+    sender.exchange(5, problem.random_solution(), 10, True)
+    receiver.exchange(5, problem.random_solution(), 20, True)
+
+    assert receiver.feature_penalties is penalties is state.feature_penalties
+    assert penalties[:3].tolist() == [3, 2, 0]
+
+
+def test_island_solver():
+    """Islands connected in ring and broadcast return their best results by the deadline"""
+
+    problem = UCTP.from_file(paths[0])
+    algorithm = IslandGuidedLocalSearch(neighborhood_size=10, migration_interval=1)
+
+    for topology in Topology:
+        solver = IslandSolver(
+            algorithm, islands=3, topology=topology, time_limit_secs=1, seed=5
+        )
+        best, results = solver.solve(problem, 10**9)
+
+        assert len(results) == 3
+        assert problem.evaluate(best.solution)[0] == best.value
+        assert best.value == min(
+            result.value for result in results if result.is_valid == best.is_valid
+        )
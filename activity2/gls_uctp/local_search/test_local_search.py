@@ -2,6 +2,8 @@
 
 from typing import Sequence
 
+import pytest
+
 from gls_uctp.local_search.local_search import LocalSearch, GuidedLocalSearch
 from gls_uctp.uctp.model import UCTP
 
@@ -75,3 +77,121 @@ def test_guided_local_search(path: str):
             assert solution_value is not None
         finally:
             file.close()
+
+
+def test_batch_local_search():
+    """The batched local searches return a best solution scoring its reported value"""
+
+    pytest.importorskip("numpy")
+
+    for path in paths[:5]:
+        problem = UCTP.from_file(path)
+        initial_solution = problem.random_solution()
+        initial_solution_value, _ = problem.evaluate(initial_solution)
+
+        (solution, solution_values, _valid, _niter, _time_elapsed) = LocalSearch(
+            neighborhood_size=100, batch=True
+        ).search(initial_solution, 50, problem)
+
+        assert solution_values[0] == initial_solution_value
+        assert solution_values[-1] <= initial_solution_value
+        assert problem.evaluate(solution)[0] == solution_values[-1]
+
+        (
+            solution,
+            solution_values,
+            _valid,
+            _niter,
+            _time_elapsed,
+            _ls_iter,
+        ) = GuidedLocalSearch(neighborhood_size=100, batch=True).search(
+            problem.random_solution(), 10, problem
+        )
+
+        assert solution_values[-1] <= solution_values[0]
+
+
+def test_local_search_keeps_initial_solution():
+    """The local search works on its own copy, and returns a best solution scoring its reported value"""
+
+    problem = UCTP.from_file(paths[0])
+    initial_solution = problem.random_solution()
+    initial_copy = [values[:] for values in initial_solution]
+
+    (solution, solution_values, _valid, _niter, _time_elapsed) = LocalSearch(
+        neighborhood_size=20
+    ).search(initial_solution, 200, problem)
+
+    assert initial_solution == initial_copy
+    assert solution is not initial_solution
+    assert solution_values[-1] <= solution_values[0]
+    assert problem.evaluate(solution)[0] == solution_values[-1]
+
+
+def test_iterate_local_search():
+    """The iterator form yields the progress of every iteration and can be stopped at any event"""
+
+    problem = UCTP.from_file(paths[0])
+    initial_solution = problem.random_solution()
+    initial_solution_value, _ = problem.evaluate(initial_solution)
+
+    events = list(
+        LocalSearch(neighborhood_size=20).iterate(initial_solution, 50, problem)
+    )
+
+    assert [event.iteration for event in events] == list(range(51))
+    assert events[0].best_value == initial_solution_value
+    assert events[0].best_solution == initial_solution
+    best_solution = None
+    for previous, event in zip(events, events[1:]):
+        assert event.best_value <= previous.best_value
+        assert event.elapsed_time >= previous.elapsed_time
+        if event.best_solution is not None:
+            best_solution = event.best_solution
+            assert event.best_value < previous.best_value
+    if best_solution is not None:
+        assert problem.evaluate(best_solution)[0] == events[-1].best_value
+
+    # Stopping early keeps the best solution yielded so far
+    search = GuidedLocalSearch(neighborhood_size=20).iterate(
+        initial_solution, 10, problem
+    )
+    first = next(search)
+    second = next(search)
+    search.close()
+
+    assert first.best_solution == initial_solution
+    assert second.iteration == 1
+    assert second.local_search_iterations > 0
+    assert second.best_value <= first.best_value
+
+
+def test_feature_guided_local_search():
+    """The guided local search penalizes features and returns a best solution scoring its reported value"""
+
+    problem = UCTP.from_file(paths[0])
+    initial_solution = problem.random_solution()
+    initial_copy = [values[:] for values in initial_solution]
+
+    search = GuidedLocalSearch(neighborhood_size=20, time_limit_secs=5)
+    events = list(search.iterate(initial_solution, 10, problem))
+
+    assert initial_solution == initial_copy
+    assert sum(search.feature_penalties) > 0
+    assert not search.penalties
+    best_solution = None
+    for event in events:
+        if event.best_solution is not None:
+            best_solution = event.best_solution
+        assert problem.evaluate(best_solution)[0] == event.best_value
+    assert events[-1].best_value <= events[0].best_value
+
+    properties_search = GuidedLocalSearch(neighborhood_size=20, features=False)
+    list(properties_search.iterate(initial_solution, 5, problem))
+    assert not properties_search.feature_penalties
+    assert sum(properties_search.penalties.values()) > 0
+
+    # Batches penalize properties, and refuse feature penalties
+    assert not GuidedLocalSearch(batch=True).features
+    with pytest.raises(ValueError, match="batches"):
+        GuidedLocalSearch(batch=True, features=True)
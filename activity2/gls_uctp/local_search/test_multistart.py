@@ -0,0 +1,51 @@
+"""Tests for the parallel multi-start solver."""
+
+from time import time
+
+from gls_uctp.local_search.local_search import LocalSearch, GuidedLocalSearch
+from gls_uctp.local_search.multistart import MultiStartSolver
+from gls_uctp.uctp.model import UCTP
+
+paths = [f"instances/test/comp{instance:02}.ctt" for instance in range(1, 22)]
+
+
+def test_multistart_returns_global_best():
+    """The best result is the lowest value of every start, and scores as reported"""
+
+    problem = UCTP.from_file(paths[0])
+    solver = MultiStartSolver(
+        LocalSearch(neighborhood_size=20), starts=4, workers=2, seed=7
+    )
+
+    best, results = solver.solve(problem, 50)
+
+    assert [result.seed for result in results] == solver.seeds()
+    assert best.value == min(
+        result.value for result in results if result.is_valid == best.is_valid
+    )
+    assert problem.evaluate(best.solution)[0] == best.value
+    assert all(result.iterations == 50 for result in results)
+
+    # The same seed repeats the results
+    _, repeated = solver.solve(problem, 50)
+    assert [result.value for result in repeated] == [result.value for result in results]
+
+
+def test_multistart_meets_deadline():
+    """The searches stop at the shared deadline"""
+
+    problem = UCTP.from_file(paths[0])
+    solver = MultiStartSolver(
+        GuidedLocalSearch(neighborhood_size=10),
+        starts=2,
+        workers=2,
+        time_limit_secs=1,
+        seed=1,
+    )
+
+    start_time = time()
+    best, results = solver.solve(problem, 10**9)
+
+    assert len(results) == 2
+    assert time() - start_time < 10
+    assert problem.evaluate(best.solution)[0] == best.value
@@ -0,0 +1,90 @@
+"""Tests for the recorders of the values of a search."""
+
+import pytest
+
+from gls_uctp.local_search.local_search import GuidedLocalSearch, LocalSearch
+from gls_uctp.local_search.trajectory import (
+    FullTrajectory,
+    ImprovementTrajectory,
+    RingBuffer,
+    Trajectory,
+)
+from gls_uctp.uctp.model import UCTP
+
+paths = [f"instances/test/comp{instance:02}.ctt" for instance in range(1, 22)]
+
+
+def test_recorders():
+    """Each recorder keeps its share of the values, oldest first"""
+
+    values = [9, 9, 7, 7, 7, 4, 4, 1]
+    full, improvements, ring = FullTrajectory(), ImprovementTrajectory(), RingBuffer(3)
+    for iteration, value in enumerate(values):
+        for trajectory in (full, improvements, ring):
+            trajectory.record(iteration, value)
+
+    assert full.values() == values
+    # Integer values stay integers
+    assert all(
+        isinstance(value, int) for value in full.values() + improvements.values()
+    )
+    assert improvements.values() == [9, 7, 4, 1]
+    assert improvements.iterations.tolist() == [0, 2, 5, 7]
+    assert ring.values() == [4, 4, 1]
+    assert len(ring) == 3
+    assert (ring[-1], ring[-3], ring[0], ring[2]) == (1, 4, 4, 1)
+    with pytest.raises(IndexError):
+        _ = ring[-4]
+    with pytest.raises(IndexError):
+        _ = ring[3]
+
+    short = RingBuffer(5)
+    short.record(0, 2.5)
+    assert (len(short), short[-1], short.values()) == (1, 2.5, [2.5])
+
+    # Augmented values are not integers, and turn the recorded values to doubles
+    for trajectory in (FullTrajectory(), ImprovementTrajectory()):
+        trajectory.record(0, 2)
+        trajectory.record(1, 1.5)
+        trajectory.record(2, 1.25)
+        assert trajectory.values() == [2.0, 1.5, 1.25]
+
+    with pytest.raises(TypeError):
+        Trajectory()
+
+
+def test_search_trajectories():
+    """Searches record their improvements by default, and every value on request"""
+
+    problem = UCTP.from_file(paths[0])
+    initial_solution = problem.random_solution()
+
+    (solution, values, _valid, iterations, _time_elapsed) = LocalSearch(
+        neighborhood_size=20
+    ).search(initial_solution, 100, problem)
+    assert values == sorted(set(values), reverse=True)
+    assert all(isinstance(value, int) for value in values)
+    assert problem.evaluate(solution)[0] == values[-1]
+
+    (_solution, full_values, _valid, iterations, _time_elapsed) = LocalSearch(
+        neighborhood_size=20
+    ).search(initial_solution, 100, problem, trajectory=FullTrajectory())
+    assert len(full_values) == iterations + 1
+
+    (_solution, values, _valid, iterations, *_) = GuidedLocalSearch(
+        neighborhood_size=20
+    ).search(initial_solution, 5, problem, FullTrajectory())
+    assert len(values) == iterations + 1
+
+
+def test_stopping_criterion_reads_ring_buffer():
+    """The guided search stops its local searches on the last values of the ring buffer"""
+
+    search = GuidedLocalSearch(time_limit_secs=60)
+    ring = RingBuffer(5)
+    for iteration, value in enumerate([100, 90, 80]):
+        ring.record(iteration, value)
+    assert not search.stopping_criterion(2, 10**9, float("inf"), ring)
+
+    ring.record(3, 80)
+    assert search.stopping_criterion(3, 10**9, float("inf"), ring)
@@ -0,0 +1,93 @@
+"""Recorders of the best values of a search along its iterations, in bounded memory.
+
+A search yields one event per iteration, so keeping every value grows with the iterations. `FullTrajectory` keeps them all in a compact array, `ImprovementTrajectory` only the ones that improved, and `RingBuffer` the last few, which is all the stopping criteria read.
+"""
+
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from array import array
+
+
+class Trajectory(ABC):
+    """Records the best value of a search after each of its events."""
+
+    @abstractmethod
+    def record(self, iteration: int, value: int | float) -> None:
+        """Records the best value after the iteration."""
+
+    @abstractmethod
+    def values(self) -> list[int | float]:
+        """Returns the recorded values, oldest first."""
+
+
+def widened(history: array) -> array:
+    """Returns the values of an integer array as doubles, once a value that is not an integer is recorded. Integers up to 2^53 stay exact."""
+
+    return array("d", history)
+
+
+class FullTrajectory(Trajectory):
+    """Records every value, in an array of integers, or of doubles once an augmented value is recorded."""
+
+    def __init__(self) -> None:
+        self.history = array("q")
+
+    def record(self, iteration: int, value: int | float) -> None:
+        try:
+            self.history.append(value)
+        except TypeError:
+            self.history = widened(self.history)
+            self.history.append(value)
+
+    def values(self) -> list[int | float]:
+        return self.history.tolist()
+
+
+class ImprovementTrajectory(Trajectory):
+    """Records the first value and every value that differs from the previous one, with the iteration it was reached at."""
+
+    def __init__(self) -> None:
+        self.iterations = array("q")
+        # Integers, or doubles once an augmented value is recorded
+        self.history = array("q")
+
+    def record(self, iteration: int, value: int | float) -> None:
+        if not self.history or self.history[-1] != value:
+            try:
+                self.history.append(value)
+            except TypeError:
+                self.history = widened(self.history)
+                self.history.append(value)
+            self.iterations.append(iteration)
+
+    def values(self) -> list[int | float]:
+        return self.history.tolist()
+
+
+class RingBuffer(Trajectory):
+    """Records the last `size` values, overwriting the oldest one. Values are indexed like a list of them, without copying."""
+
+    def __init__(self, size: int = 5) -> None:
+        self.size = size
+        # Doubles, as augmented values may not be integers
+        self.buffer = array("d", bytes(8 * size))
+        # Number of values recorded so far
+        self.count = 0
+
+    def record(self, iteration: int, value: int | float) -> None:
+        self.buffer[self.count % self.size] = value
+        self.count += 1
+
+    def __len__(self) -> int:
+        return min(self.count, self.size)
+
+    def __getitem__(self, index: int) -> float:
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("ring buffer index out of range")
+        return self.buffer[(self.count - length + index) % self.size]
+
+    def values(self) -> list[int | float]:
+        return [self[index] for index in range(len(self))]
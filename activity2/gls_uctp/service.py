@@ -0,0 +1,597 @@
+"""Long-running local solver service: a localhost HTTP API over a fixed pool of worker processes that keep parsed instances warm.
+
+Run with `python -m gls_uctp.service --port 8765 --workers 2`. Jobs are posted as JSON objects with the fields of `JobRequest`, the instance given either as a path or as its contents. Workers load instances through the compiled cache of `UCTP.from_cache`, keyed by the hash of their contents, so every worker maps the same compiled file and an instance is only parsed once across the pool and across restarts. On top of it, each worker keeps the last instances it loaded, keyed by contents or by path and modification time, so repeated jobs on an instance skip loading too.
+
+- `POST /jobs` submits a job and returns its id.
+- `GET /jobs/<id>` returns its status, last progress and result.
+- `GET /jobs/<id>/events` streams its snapshots as JSON lines until it ends.
+- `GET /jobs/<id>/solution` returns its best timetable, in the ITC2007 solution format.
+- `DELETE /jobs/<id>` cancels it, keeping the best timetable found so far.
+"""
+
+from __future__ import annotations
+import json
+from argparse import ArgumentParser
+from collections import OrderedDict
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from multiprocessing import Process, Queue
+from os import cpu_count, stat
+from queue import Empty
+from threading import Condition, Thread
+from time import time
+from typing import Any, Callable, Iterator, NamedTuple, Sequence
+from urllib.request import Request, urlopen
+
+from gls_uctp.local_search.local_search import GuidedLocalSearch, LocalSearch
+from gls_uctp.uctp.model import UCTP
+from gls_uctp.uctp.solution_io import format_solution
+
+ALGORITHMS = {"ls": LocalSearch, "gls": GuidedLocalSearch}
+FINISHED = ("done", "cancelled", "failed")
+# Seconds between two progress reports of a job, improvements are always reported
+PROGRESS_INTERVAL = 0.25
+# Seconds between two checks of the cancellations sent to a worker
+CANCEL_INTERVAL = 0.05
+# Loaded instances each worker keeps in memory, on top of the shared compiled cache
+INSTANCE_CACHE_SIZE = 16
+# Seconds between two checks that the workers are alive
+SUPERVISE_INTERVAL = 0.5
+
+
+class JobRequest(NamedTuple):
+    """What a job solves, and how."""
+
+    # Path of the instance definition, or its contents
+    instance: str | None = None
+    content: str | None = None
+    algorithm: str = "gls"
+    time_limit_secs: float = 72
+    seed: int | None = None
+    max_iterations: int = 10**9
+    neighborhood_size: int = 10
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> JobRequest:
+        """Returns the request of a JSON object, checking its fields."""
+
+        unknown = set(data) - set(cls._fields)
+        if unknown:
+            raise ValueError(f"Unknown job fields: {', '.join(sorted(unknown))}.")
+        request = cls(**data)
+        if (request.instance is None) == (request.content is None):
+            raise ValueError("A job needs either an instance path or its content.")
+        if request.algorithm not in ALGORITHMS:
+            raise ValueError(
+                f"Unknown algorithm {request.algorithm!r}, expected one of {', '.join(ALGORITHMS)}."
+            )
+        return request
+
+    def instance_key(self) -> tuple:
+        """Returns the key of the instance in the caches of the workers, which changes with its contents or its file."""
+
+        if self.content is not None:
+            return ("content", sha256(self.content.encode("utf8")).hexdigest())
+        status = stat(self.instance)
+        return ("path", self.instance, status.st_mtime_ns, status.st_size)
+
+
+def run_job(
+    problem: UCTP,
+    request: JobRequest,
+    cancelled: Callable[[], bool],
+    report: Callable[[dict[str, Any]], None],
+) -> dict[str, Any]:
+    """Solves the problem as requested, reporting progress on improvements and every `PROGRESS_INTERVAL` seconds, until the search stops or is cancelled. Returns the result."""
+
+    if request.seed is not None:
+        problem.sampler.seed(request.seed)
+    algorithm = ALGORITHMS[request.algorithm](
+        neighborhood_size=request.neighborhood_size,
+        time_limit_secs=request.time_limit_secs,
+    )
+
+    def stopping_criterion(
+        iteration: int,
+        max_iterations: int,
+        start_time: float,
+        last_solutions: Sequence[int | float],
+    ) -> bool:
+        return cancelled() or algorithm.stopping_criterion(
+            iteration, max_iterations, start_time, last_solutions
+        )
+
+    best_solution = None
+    last_progress = None
+    reported = 0.0
+    for progress in algorithm.iterate(
+        problem.random_solution(), request.max_iterations, problem, stopping_criterion
+    ):
+        last_progress = progress
+        if progress.best_solution is not None:
+            best_solution = progress.best_solution
+        if progress.best_solution is not None or time() - reported >= PROGRESS_INTERVAL:
+            report(
+                {
+                    name: value
+                    for name, value in progress._asdict().items()
+                    if name != "best_solution"
+                }
+            )
+            reported = time()
+        if cancelled():
+            break
+
+    if last_progress is None:
+        raise RuntimeError("The search stopped before its first iteration.")
+    return {
+        "status": "cancelled" if cancelled() else "done",
+        "value": last_progress.best_value,
+        "is_valid": last_progress.best_is_valid,
+        "iterations": last_progress.iteration,
+        "elapsed_time": last_progress.elapsed_time,
+        "solution": format_solution(problem, best_solution),
+    }
+
+
+def _worker(
+    worker: int, jobs: Queue, control: Queue, events: Queue, cache: str | None
+) -> None:
+    """Runs jobs in a worker process until it receives None, reporting their events. Instances are loaded from the compiled cache in `cache`, the default cache directory if None, and the last ones loaded are kept in memory."""
+
+    problems: OrderedDict[tuple, UCTP] = OrderedDict()
+    cancellations: set[int] = set()
+
+    while (job := jobs.get()) is not None:
+        job_id, request, key = job
+
+        # Cancellations are only sent once the job started, earlier ones are stale
+        while True:
+            try:
+                control.get_nowait()
+            except Empty:
+                break
+        cancellations.clear()
+        events.put(("started", job_id, worker))
+
+        checked = 0.0
+
+        def cancelled() -> bool:
+            nonlocal checked
+            if job_id not in cancellations and time() - checked >= CANCEL_INTERVAL:
+                checked = time()
+                while True:
+                    try:
+                        cancellations.add(control.get_nowait())
+                    except Empty:
+                        break
+            return job_id in cancellations
+
+        try:
+            cached = key in problems
+            if cached:
+                problems.move_to_end(key)
+            else:
+                problems[key] = (
+                    UCTP.from_cached_content(request.content, cache)
+                    if request.content is not None
+                    else UCTP.from_cache(request.instance, cache)
+                )
+                if len(problems) > INSTANCE_CACHE_SIZE:
+                    problems.popitem(last=False)
+
+            result = run_job(
+                problems[key],
+                request,
+                cancelled,
+                lambda progress: events.put(("progress", job_id, progress)),
+            )
+            result["cached"] = cached
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            # Reported to the client instead of stopping the worker
+            result = {"status": "failed", "error": f"{type(error).__name__}: {error}"}
+        events.put(("finished", job_id, result))
+
+
+class Job:
+    """A job of the service, and what its worker reported of it."""
+
+    def __init__(self, job_id: int, request: JobRequest) -> None:
+        self.id = job_id
+        self.request = request
+        self.status = "queued"
+        self.worker: int | None = None
+        self.progress: dict[str, Any] | None = None
+        self.result: dict[str, Any] | None = None
+        self.cancel_requested = False
+        # Incremented on every change, for the waiting streams
+        self.version = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        """Returns the status, last progress and result of the job, without its solution."""
+
+        return {
+            "id": self.id,
+            "status": self.status,
+            "progress": self.progress,
+            "result": (
+                None
+                if self.result is None
+                else {
+                    name: value
+                    for name, value in self.result.items()
+                    if name != "solution"
+                }
+            ),
+        }
+
+
+class SolverService:
+    """Runs the submitted jobs on a fixed pool of worker processes, in submission order, and keeps their status."""
+
+    def __init__(self, workers: int | None = None, cache: str | None = None):
+        self.workers = workers or cpu_count() or 1
+        # Directory of the compiled instances the workers share, the default cache directory if None
+        self.cache = cache
+        self.jobs: dict[int, Job] = {}
+        self.ids = count(1)
+        self.condition = Condition()
+        # Workers found dead by the listener, and whether the service is closing
+        self.dead: set[int] = set()
+        self.closing = False
+
+        self.queue: Queue = Queue()
+        self.events: Queue = Queue()
+        self.controls = [Queue() for _ in range(self.workers)]
+        # Started before any thread of the service, as forking copies only the calling thread
+        self.processes = [
+            Process(
+                target=_worker,
+                args=(worker, self.queue, self.controls[worker], self.events, cache),
+                daemon=True,
+            )
+            for worker in range(self.workers)
+        ]
+        for process in self.processes:
+            process.start()
+        self.listener = Thread(target=self._listen, daemon=True)
+        self.listener.start()
+
+    def submit(self, request: JobRequest) -> int:
+        """Queues a job. Returns its id."""
+
+        key = request.instance_key()
+        with self.condition:
+            job = Job(next(self.ids), request)
+            self.jobs[job.id] = job
+        self.queue.put((job.id, request, key))
+        return job.id
+
+    def job(self, job_id: int) -> Job:
+        """Returns a job by id, raising KeyError if there is none."""
+
+        with self.condition:
+            return self.jobs[job_id]
+
+    def cancel(self, job_id: int) -> dict[str, Any]:
+        """Asks the worker of a job to stop it, once it starts if it is queued. Returns its snapshot."""
+
+        with self.condition:
+            job = self.jobs[job_id]
+            if job.status not in FINISHED and not job.cancel_requested:
+                job.cancel_requested = True
+                if job.status == "running":
+                    self.controls[job.worker].put(job_id)
+            return job.snapshot()
+
+    def wait(
+        self, job_id: int, version: int = -1, timeout: float | None = None
+    ) -> tuple[dict[str, Any], int]:
+        """Waits until the job changes from the given version, or the timeout. Returns its snapshot and version."""
+
+        with self.condition:
+            job = self.jobs[job_id]
+            self.condition.wait_for(lambda: job.version != version, timeout)
+            return (job.snapshot(), job.version)
+
+    def close(self) -> None:
+        """Stops the workers once their current jobs end, and the listener."""
+
+        self.closing = True
+        for _ in self.processes:
+            self.queue.put(None)
+        for process in self.processes:
+            process.join()
+        self.listener.join()
+
+    def _listen(self) -> None:
+        """Applies the events of the workers to their jobs until the service closes, checking every `SUPERVISE_INTERVAL` seconds that the workers are alive."""
+
+        supervised = time()
+        while True:
+            # No sentinel is sent, a worker killed while sending an event may keep the queue from taking more. Workers flush their events before they exit, so once they all have, an empty queue is drained.
+            stopped = self.closing and not any(
+                process.is_alive() for process in self.processes
+            )
+            try:
+                event = self.events.get(timeout=SUPERVISE_INTERVAL)
+            except Empty:
+                if stopped:
+                    break
+                event = ()
+            if event:
+                self._apply(event)
+            if time() - supervised >= SUPERVISE_INTERVAL:
+                self._supervise()
+                supervised = time()
+
+    def _apply(self, event: tuple[str, int, Any]) -> None:
+        """Applies an event of a worker to its job. Events of ended jobs are ignored, as a job whose worker died has failed already."""
+
+        kind, job_id, data = event
+        with self.condition:
+            job = self.jobs[job_id]
+            if job.status in FINISHED:
+                return
+            if kind == "started":
+                job.status = "running"
+                job.worker = data
+                if job.cancel_requested:
+                    self.controls[data].put(job_id)
+            elif kind == "progress":
+                job.progress = data
+            else:
+                job.status = data["status"]
+                job.result = data
+            job.version += 1
+            self.condition.notify_all()
+
+    def _supervise(self) -> None:
+        """Fails the running jobs of the workers that died, and every unfinished job once no worker is left."""
+
+        if self.closing:
+            return
+        dead = {
+            worker
+            for worker, process in enumerate(self.processes)
+            if not process.is_alive()
+        } - self.dead
+        if not dead:
+            return
+        # Events sent before the workers died are applied first, so finished jobs keep their results
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except Empty:
+                break
+            self._apply(event)
+
+        self.dead |= dead
+        with self.condition:
+            for job in self.jobs.values():
+                if job.status in FINISHED:
+                    continue
+                if job.status == "running" and job.worker in dead:
+                    error = f"Worker {job.worker} exited with code {self.processes[job.worker].exitcode}."
+                elif len(self.dead) == len(self.processes):
+                    error = "No worker is left to run the job."
+                else:
+                    continue
+                job.status = "failed"
+                job.result = {"status": "failed", "error": error}
+                job.version += 1
+            self.condition.notify_all()
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """Serves the HTTP API of the service of its server."""
+
+    server: ServiceServer
+
+    def log_message(  # pylint: disable=redefined-builtin
+        self, format: str, *args: Any
+    ) -> None:
+        """Requests are not logged."""
+
+    def send_json(self, status: int, body: Any) -> None:
+        """Sends a JSON response."""
+
+        encoded = json.dumps(body).encode("utf8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def route(self) -> tuple[int | None, str]:
+        """Returns the job id and the action of the path, `/jobs/<id>/<action>`."""
+
+        parts = self.path.strip("/").split("/")
+        if parts[0] != "jobs" or len(parts) > 3:
+            raise KeyError(self.path)
+        job_id = int(parts[1]) if len(parts) > 1 else None
+        return (job_id, parts[2] if len(parts) > 2 else "")
+
+    def handle_errors(self, handler: Callable[[], None]) -> None:
+        """Runs the handler, answering bad requests and unknown jobs or paths."""
+
+        try:
+            handler()
+        except ValueError as error:
+            self.send_json(400, {"error": str(error)})
+        except (KeyError, FileNotFoundError) as error:
+            self.send_json(404, {"error": f"Not found: {error}"})
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """Submits a job."""
+
+        def handler() -> None:
+            if self.route() != (None, ""):
+                raise KeyError(self.path)
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                data = json.loads(self.rfile.read(length))
+            except json.JSONDecodeError as error:
+                raise ValueError(f"Invalid JSON: {error}") from error
+            if not isinstance(data, dict):
+                raise ValueError("A job is a JSON object.")
+            job_id = self.server.service.submit(JobRequest.from_json(data))
+            self.send_json(201, {"id": job_id})
+
+        self.handle_errors(handler)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Returns the status, events or solution of a job."""
+
+        def handler() -> None:
+            service = self.server.service
+            job_id, action = self.route()
+            job = service.job(job_id)
+            if action == "":
+                self.send_json(200, job.snapshot())
+            elif action == "solution":
+                if job.result is None or "solution" not in job.result:
+                    self.send_json(409, {"error": "The job has no solution yet."})
+                    return
+                encoded = job.result["solution"].encode("utf8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+            elif action == "events":
+                # No length, the stream ends with the connection
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                version = -1
+                while True:
+                    snapshot, version = service.wait(job_id, version)
+                    self.wfile.write(json.dumps(snapshot).encode("utf8") + b"\n")
+                    self.wfile.flush()
+                    if snapshot["status"] in FINISHED:
+                        break
+            else:
+                raise KeyError(self.path)
+
+        self.handle_errors(handler)
+
+    def do_DELETE(self) -> None:  # pylint: disable=invalid-name
+        """Cancels a job."""
+
+        def handler() -> None:
+            job_id, action = self.route()
+            if job_id is None or action:
+                raise KeyError(self.path)
+            self.send_json(200, self.server.service.cancel(job_id))
+
+        self.handle_errors(handler)
+
+
+class ServiceServer(ThreadingHTTPServer):
+    """The HTTP server of a solver service, one thread per request."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], service: SolverService):
+        super().__init__(address, ServiceHandler)
+        self.service = service
+
+    @property
+    def url(self) -> str:
+        """The base URL of the API."""
+
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class ServiceClient:
+    """A minimal client of the service API."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+
+    def request(self, method: str, path: str, body: Any = None) -> Any:
+        """Sends a request. Returns the decoded JSON response, raising `urllib.error.HTTPError` on errors."""
+
+        data = None if body is None else json.dumps(body).encode("utf8")
+        request = Request(
+            self.url + path,
+            data=data,
+            method=method,
+            headers={"Content-Type": "application/json"},
+        )
+        with urlopen(request) as response:
+            return json.load(response)
+
+    def submit(self, **fields: Any) -> int:
+        """Submits a job with the fields of `JobRequest`. Returns its id."""
+
+        return self.request("POST", "/jobs", fields)["id"]
+
+    def status(self, job_id: int) -> dict[str, Any]:
+        """Returns the snapshot of a job."""
+
+        return self.request("GET", f"/jobs/{job_id}")
+
+    def cancel(self, job_id: int) -> dict[str, Any]:
+        """Cancels a job. Returns its snapshot."""
+
+        return self.request("DELETE", f"/jobs/{job_id}")
+
+    def events(self, job_id: int) -> Iterator[dict[str, Any]]:
+        """Yields the snapshots of a job as it changes, until it ends."""
+
+        with urlopen(f"{self.url}/jobs/{job_id}/events") as response:
+            for line in response:
+                yield json.loads(line)
+
+    def wait(self, job_id: int) -> dict[str, Any]:
+        """Waits for a job to end. Returns its last snapshot, raising ConnectionError if the stream ended without any."""
+
+        last = None
+        for snapshot in self.events(job_id):
+            last = snapshot
+        if last is None:
+            raise ConnectionError(
+                f"The events of job {job_id} ended without a snapshot."
+            )
+        return last
+
+    def solution(self, job_id: int) -> str:
+        """Returns the best timetable of an ended job, in the ITC2007 solution format."""
+
+        with urlopen(f"{self.url}/jobs/{job_id}/solution") as response:
+            return response.read().decode("utf8")
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Runs the service from the command line, until interrupted."""
+
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--workers", type=int, help="Worker processes, one per CPU by default"
+    )
+    parser.add_argument(
+        "--cache",
+        help="Directory of the compiled instances shared by the workers, the user cache by default",
+    )
+    arguments = parser.parse_args(argv)
+
+    service = SolverService(arguments.workers, arguments.cache)
+    server = ServiceServer((arguments.host, arguments.port), service)
+    print(f"Serving on {server.url} with {service.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
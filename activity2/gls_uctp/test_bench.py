@@ -0,0 +1,102 @@
+"""Tests for the micro benchmarks. Set GLS_UCTP_BENCH to a JSON path to run the whole suite."""
+
+import json
+import os
+from glob import glob
+
+import pytest
+
+from gls_uctp import bench
+
+
+def test_bench_report(tmp_path):
+    """The report holds every measure of each instance, normalized on request"""
+
+    output = tmp_path / "bench.json"
+    bench.main(
+        ["instances/test/comp01.ctt", "--duration", "0.05", "--output", str(output)]
+    )
+    with open(output, encoding="utf8") as file:
+        report = json.load(file)
+
+    results = report["instances"]["comp01"]
+    assert set(results) == {
+        "parse_secs",
+        "random_solution_secs",
+        "evaluate_per_sec",
+        "move_evaluate_per_sec",
+        "move_delta_per_sec",
+        "ls_iterations_per_sec",
+        "gls_iterations_per_sec",
+    }
+    assert all(value > 0 for value in results.values())
+
+    normalized = bench.normalize(results, 2)
+    assert normalized["parse_secs"] == results["parse_secs"] / 2
+    assert normalized["evaluate_per_sec"] == results["evaluate_per_sec"] * 2
+
+
+def test_scaling_report(tmp_path):
+    """The scaling report holds the sizes and measures of each synthetic instance, without dense solutions above the limit"""
+
+    output = tmp_path / "scaling.json"
+    bench.main(["--scale", "300,600", "--duration", "0.05", "--output", str(output)])
+    with open(output, encoding="utf8") as file:
+        report = json.load(file)
+
+    small, large = report["scaling"]["300"], report["scaling"]["600"]
+    assert small["lectures"] < large["lectures"]
+    assert small["dense_solution_bytes"] < large["dense_solution_bytes"]
+    assert all(value > 0 for value in large.values())
+
+    results = bench.bench_scale(1000, tmp_path, duration=0.05, dense_limit_cells=1000)
+    assert results["dense_solution_bytes"] is None
+
+
+def test_parallel_comparison(tmp_path):
+    """Both parallel solvers run with the same cores and time limit, and their best scores only improve over time"""
+
+    output = tmp_path / "parallel.json"
+    bench.main(
+        [
+            "instances/test/comp01.ctt",
+            "--compare",
+            "--cores",
+            "2",
+            "--time-limit",
+            "1",
+            "--points",
+            "4",
+            "--output",
+            str(output),
+        ]
+    )
+    with open(output, encoding="utf8") as file:
+        report = json.load(file)
+
+    assert report["cores"] == 2
+    results = report["parallel"]["comp01"]
+    assert set(results) == {"islands", "multistart"}
+    for solver in results.values():
+        points = solver["best_over_time"]
+        assert [point["secs"] for point in points] == [0.25, 0.5, 0.75, 1.0]
+        scores = [
+            (not point["is_valid"], point["value"])
+            for point in points
+            if point["value"] is not None
+        ]
+        assert scores == sorted(scores, reverse=True)
+        assert points[-1]["value"] is not None
+
+
+@pytest.mark.skipif(
+    "GLS_UCTP_BENCH" not in os.environ, reason="GLS_UCTP_BENCH is not set"
+)
+def test_bench_suite():
+    """Benchmarks every instance, writing the report to GLS_UCTP_BENCH"""
+
+    report = bench.run(sorted(glob(bench.INSTANCES)))
+    with open(os.environ["GLS_UCTP_BENCH"], "w", encoding="utf8") as file:
+        json.dump(report, file, indent=2)
+
+    assert len(report["instances"]) == 21
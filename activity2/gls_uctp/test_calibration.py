@@ -0,0 +1,54 @@
+"""Tests for the time limits calibrated to the machine."""
+
+import json
+
+import pytest
+
+from gls_uctp import calibration
+from gls_uctp.local_search.local_search import GuidedLocalSearch, LocalSearch
+
+
+def test_fallback_without_tool():
+    """The in-process workload is used when the benchmark tool cannot run"""
+
+    result = calibration.calibrate("instances/benchmark_machine/missing_tool")
+
+    assert result["method"] == "cpu"
+    assert result["time_limit_secs"] > 0
+    assert calibration.cpu_workload() == calibration.cpu_workload()
+
+
+def test_time_limit_is_cached_per_host(tmp_path):
+    """The time limit is measured once per host, then read back from the cache"""
+
+    path = tmp_path / "calibration.json"
+    first = calibration.time_limit("missing_tool", path)
+    with open(path, encoding="utf8") as file:
+        cached = json.load(file)
+    assert cached[calibration.host()]["time_limit_secs"] == first
+
+    cached[calibration.host()]["time_limit_secs"] = 123.0
+    cached["other-host"] = {"time_limit_secs": 1.0, "method": "cpu"}
+    with open(path, "w", encoding="utf8") as file:
+        json.dump(cached, file)
+
+    assert calibration.time_limit("missing_tool", path) == 123.0
+    assert calibration.time_limit("missing_tool", path, refresh=True) != 123.0
+    with open(path, encoding="utf8") as file:
+        assert json.load(file)["other-host"]["time_limit_secs"] == 1.0
+
+
+def test_searches_take_calibrated_time_limit(tmp_path, monkeypatch):
+    """Searches asked for the itc2007 time limit run for the cached time of the host"""
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    path = calibration.calibration_path()
+    path.parent.mkdir(parents=True)
+    with open(path, "w", encoding="utf8") as file:
+        json.dump({calibration.host(): {"time_limit_secs": 42.5}}, file)
+
+    assert LocalSearch(time_limit_secs="itc2007").time_limit_secs == 42.5
+    assert GuidedLocalSearch(time_limit_secs="itc2007").time_limit_secs == 42.5
+    assert LocalSearch(time_limit_secs=3).time_limit_secs == 3
+    with pytest.raises(ValueError, match="itc2007"):
+        LocalSearch(time_limit_secs="fast")
@@ -0,0 +1,123 @@
+"""Tests for the `gls-uctp` command."""
+
+import json
+import subprocess
+import sys
+
+from gls_uctp import calibration
+from gls_uctp.cli import main
+from gls_uctp.uctp.model import UCTP
+from gls_uctp.uctp.solution_io import read_solution_file
+
+path = "instances/test/comp01.ctt"
+
+
+def test_help_does_not_import_the_solver():
+    """The command line is parsed without loading the solver modules"""
+
+    imported = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys; from gls_uctp.cli import parser; parser().format_help(); print(sorted(sys.modules))",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    assert "gls_uctp.uctp.model" not in imported
+    assert "gls_uctp.local_search.local_search" not in imported
+
+
+def test_solve_writes_timetable_and_summary(tmp_path):
+    """The best timetable is written in the ITC2007 format, and the summary matches its score"""
+
+    problem = UCTP.from_file(path)
+    for workers in (1, 2):
+        solution_path = tmp_path / f"comp01_{workers}.sol"
+        summary_path = tmp_path / f"comp01_{workers}.json"
+        main(
+            [
+                "solve",
+                path,
+                "--algorithm",
+                "ls",
+                "--workers",
+                str(workers),
+                "--time-limit",
+                "0.5",
+                "--seed",
+                "7",
+                "--output",
+                str(solution_path),
+                "--summary",
+                str(summary_path),
+            ]
+        )
+
+        with open(summary_path, encoding="utf8") as file:
+            summary = json.load(file)
+        assert len(summary["starts"]) == workers
+        score, properties = problem.evaluate(read_solution_file(problem, solution_path))
+        assert summary["value"] == score
+        assert summary["properties"] == properties
+
+
+def test_summary_records_calibration_method(tmp_path, monkeypatch):
+    """Runs on the calibrated time limit tell how it was measured"""
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    calibration_path = calibration.calibration_path()
+    calibration_path.parent.mkdir(parents=True)
+    with open(calibration_path, "w", encoding="utf8") as file:
+        json.dump({calibration.host(): {"time_limit_secs": 0.2, "method": "cpu"}}, file)
+
+    summary_path = tmp_path / "comp01.json"
+    main(
+        [
+            "solve",
+            path,
+            "--time-limit",
+            "itc2007",
+            "--output",
+            str(tmp_path / "comp01.sol"),
+            "--summary",
+            str(summary_path),
+        ]
+    )
+    with open(summary_path, encoding="utf8") as file:
+        summary = json.load(file)
+    assert summary["time_limit_secs"] == 0.2
+    assert summary["time_limit_method"] == "cpu"
+
+
+def test_compile(tmp_path):
+    """Compiled instances load back as the same instance"""
+
+    compiled_path = tmp_path / "comp01.uctpc"
+    main(["compile", path, "--output", str(compiled_path)])
+    problem = UCTP.load_compiled(compiled_path)
+    assert problem.name == UCTP.from_file(path).name
+
+
+def test_generate(tmp_path):
+    """Generated instances have the requested sizes"""
+
+    instance_path = tmp_path / "synthetic.ctt"
+    main(
+        [
+            "generate",
+            "--lectures",
+            "1000",
+            "--rooms",
+            "60",
+            "--days",
+            "6",
+            "--output",
+            str(instance_path),
+        ]
+    )
+    problem = UCTP.from_file(str(instance_path))
+    assert len(problem.rooms) == 60
+    assert problem.days == 6
+    assert len(problem.courses) == 250
@@ -0,0 +1,125 @@
+"""Tests for the local solver service, through its HTTP API."""
+
+from threading import Thread
+from urllib.error import HTTPError
+
+import pytest
+
+from gls_uctp.service import (
+    FINISHED,
+    JobRequest,
+    ServiceClient,
+    ServiceServer,
+    SolverService,
+)
+from gls_uctp.uctp.compiled import file_hash
+from gls_uctp.uctp.model import UCTP
+
+paths = [f"instances/test/comp{instance:02}.ctt" for instance in range(1, 22)]
+
+
+@pytest.fixture(name="client")
+def fixture_client(tmp_path):
+    """A client of a service with one worker, on a free port, caching compiled instances in a temporary directory."""
+
+    service = SolverService(workers=1, cache=str(tmp_path))
+    server = ServiceServer(("127.0.0.1", 0), service)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield ServiceClient(server.url)
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def test_jobs_return_solutions(client: ServiceClient, tmp_path):
+    """Jobs return their best timetable in ITC2007 format, and repeated instances are not parsed again"""
+
+    problem = UCTP.from_file(paths[0])
+    first = client.submit(instance=paths[0], algorithm="ls", time_limit_secs=0.5)
+    with open(paths[0], encoding="utf8") as file:
+        second = client.submit(
+            content=file.read(), algorithm="gls", time_limit_secs=0.5, seed=3
+        )
+    third = client.submit(instance=paths[0], time_limit_secs=0.5, max_iterations=2)
+
+    events = list(client.events(first))
+    assert events[-1]["status"] == "done"
+    assert any(event["progress"] is not None for event in events)
+
+    results = [client.wait(job)["result"] for job in (first, second, third)]
+    assert [result["cached"] for result in results] == [False, False, True]
+    # The path and the contents of the instance share one compiled file
+    assert [path.name for path in tmp_path.iterdir()] == [
+        f"{file_hash(paths[0])}.uctpc"
+    ]
+
+    lines = client.solution(first).splitlines()
+    assert len(lines) == sum(course.lectures for course in problem.courses)
+    course, room, day, period = lines[0].split()
+    assert course in {course.name for course in problem.courses}
+    assert room in problem.room_names
+    assert 0 <= int(day) < problem.days
+    assert 0 <= int(period) < problem.periods_per_day
+
+
+def test_cancel_job(client: ServiceClient):
+    """Cancelled jobs stop early and keep their best timetable"""
+
+    running = client.submit(instance=paths[0], algorithm="ls", time_limit_secs=60)
+    queued = client.submit(instance=paths[0], time_limit_secs=60)
+    for snapshot in client.events(running):
+        if snapshot["progress"] is not None:
+            break
+
+    client.cancel(queued)
+    client.cancel(running)
+
+    assert client.wait(running)["status"] == "cancelled"
+    assert client.solution(running)
+    snapshot = client.wait(queued)
+    assert snapshot["status"] == "cancelled"
+    assert snapshot["result"]["elapsed_time"] < 60
+
+
+def test_bad_requests(client: ServiceClient):
+    """Invalid jobs and unknown jobs are refused"""
+
+    for fields in (
+        {},
+        {"instance": paths[0], "algorithm": "tabu"},
+        {"instance": paths[0], "budget": 1},
+    ):
+        with pytest.raises(HTTPError) as error:
+            client.submit(**fields)
+        assert error.value.code == 400
+
+    with pytest.raises(HTTPError) as error:
+        client.status(404)
+    assert error.value.code == 404
+    with pytest.raises(HTTPError) as error:
+        client.submit(instance="instances/test/missing.ctt")
+    assert error.value.code == 404
+
+
+def test_dead_workers_fail_their_jobs(tmp_path):
+    """Jobs of a worker that died fail instead of waiting forever, and so do queued jobs once no worker is left"""
+
+    service = SolverService(workers=1, cache=str(tmp_path))
+    try:
+        running = service.submit(JobRequest(instance=paths[0], time_limit_secs=60))
+        queued = service.submit(JobRequest(instance=paths[0], time_limit_secs=60))
+        snapshot, version = service.wait(running)
+        while snapshot["status"] != "running":
+            snapshot, version = service.wait(running, version)
+        service.processes[0].kill()
+
+        for job in (running, queued):
+            snapshot, version = service.wait(job)
+            while snapshot["status"] not in FINISHED:
+                snapshot, version = service.wait(job, version)
+            assert snapshot["status"] == "failed"
+        assert "exited" in service.wait(running)[0]["result"]["error"]
+        assert "No worker" in service.wait(queued)[0]["result"]["error"]
+    finally:
+        service.close()
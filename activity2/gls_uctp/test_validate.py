@@ -0,0 +1,87 @@
+"""Tests for the batch validator of solution files."""
+
+import csv
+import json
+from pathlib import Path
+
+from gls_uctp import validate
+from gls_uctp.uctp.model import UCTP
+from gls_uctp.uctp.solution_io import write_solution_file
+
+paths = [f"instances/test/comp{instance:02}.ctt" for instance in range(1, 22)]
+
+
+def test_validate_files(tmp_path):
+    """Each solution file gets a row with its score and constraint counts, or its error"""
+
+    expected = {}
+    for path in paths[:2]:
+        problem = UCTP.from_file(path)
+        for run in range(2):
+            solution = problem.random_solution()
+            name = tmp_path / f"{Path(path).stem}_run{run}.sol"
+            write_solution_file(problem, solution, name)
+            expected[str(name)] = problem.evaluate(solution)
+    (tmp_path / "comp01_broken.sol").write_text("nope rA 0 0\n", encoding="utf8")
+    (tmp_path / "other.sol").write_text("", encoding="utf8")
+
+    output = tmp_path / "scores.csv"
+    validate.main([str(tmp_path / "*.sol"), "--output", str(output), "--workers", "1"])
+    with open(output, encoding="utf8") as file:
+        rows = {row["file"]: row for row in csv.DictReader(file)}
+
+    assert len(rows) == 6
+    for name, (score, properties) in expected.items():
+        assert int(rows[name]["score"]) == score
+        assert rows[name]["instance"] in ("comp01", "comp02")
+        for prop in validate.PROPERTIES:
+            assert int(rows[name][prop]) == properties.get(prop, 0)
+    assert "unknown course" in rows[str(tmp_path / "comp01_broken.sol")]["error"]
+    assert rows[str(tmp_path / "other.sol")]["error"]
+
+    # Rescored under other weights, as JSON lines
+    output = tmp_path / "scores.jsonl"
+    name = next(iter(expected))
+    validate.main(
+        [
+            name,
+            "--instance",
+            paths[0],
+            "--weights",
+            "1,1,1,1,0,0,0,0",
+            "--output",
+            str(output),
+            "--workers",
+            "1",
+        ]
+    )
+    with open(output, encoding="utf8") as file:
+        (row,) = [json.loads(line) for line in file]
+    # Each hard violation weighs at least one, and soft ones nothing
+    assert row["score"] >= sum(row[prop] for prop in validate.HARD)
+    assert row["is_valid"] == (row["score"] == 0)
+
+
+def test_malformed_instance(tmp_path):
+    """A malformed instance fails the rows of its solutions instead of the batch"""
+
+    with open(paths[0], encoding="utf8") as file:
+        text = file.read()
+    instance = tmp_path / "comp01.ctt"
+    # A constraint on an unknown course raises KeyError while parsing
+    instance.write_text(
+        text.replace(
+            "UNAVAILABILITY_CONSTRAINTS:\n",
+            "UNAVAILABILITY_CONSTRAINTS:\nmissing 0 0\n",
+            1,
+        ),
+        encoding="utf8",
+    )
+    solution = tmp_path / "comp01_run0.sol"
+    write_solution_file(
+        UCTP.from_file(paths[0]), UCTP.from_file(paths[0]).random_solution(), solution
+    )
+
+    (row,) = validate.validate([(str(solution), str(instance))], workers=1)
+    assert row["score"] is None
+    assert row["error"].startswith("KeyError")
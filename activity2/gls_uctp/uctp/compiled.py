@@ -0,0 +1,152 @@
+"""Compact binary form of a UCTP instance and its derived tables, read back through a memory map.
+
+The file is the magic bytes, the size of a JSON header, the header with the names and scalars of the instance, then each integer table at an 8 bytes aligned offset, in native byte order. Tables are read back as `memoryview`s of a read-only `mmap`, so every process loading the same file shares its pages.
+"""
+
+from __future__ import annotations
+from array import array
+from hashlib import sha256
+from json import dumps, loads
+from mmap import ACCESS_READ, mmap
+from os import environ, getpid, replace
+from pathlib import Path
+from sys import byteorder
+from typing import Any, Iterator, Sequence
+
+MAGIC = b"UCTPBIN2"
+# Format of the items of each table, in file order
+TABLES = {
+    "course_teacher": "i",
+    "course_lectures": "i",
+    "course_min_working_days": "i",
+    "course_students": "i",
+    "room_capacities": "i",
+    # Courses of each curriculum, as offsets into the ids
+    "curriculum_offsets": "i",
+    "curriculum_ids": "i",
+    # Curricula of each course, as offsets into the ids
+    "course_curricula_offsets": "i",
+    "course_curricula_ids": "i",
+    # Conflicting courses of each course, as offsets into the ids
+    "conflict_offsets": "i",
+    "conflict_ids": "i",
+    # (course, day, period) of each constraint
+    "constraints": "i",
+    # 1 where course * day_periods + day_period is unavailable
+    "unavailability": "B",
+    # Available day-periods of each course, as offsets into the day-periods
+    "available_offsets": "i",
+    "available_day_periods": "i",
+    # Start of the range of each course in the flat space of available cells of `CellSampler`, and the total size as last element
+    "cell_offsets": "q",
+}
+
+
+def file_hash(path: str | Path) -> str:
+    """Returns the SHA-256 hex digest of the contents of a file."""
+
+    digest = sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_directory() -> Path:
+    """Returns the directory compiled instances are cached in."""
+
+    return Path(environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "gls_uctp"
+
+
+def flatten(rows: Sequence[Sequence[int]]) -> tuple[array, array]:
+    """Returns the offsets and the concatenated ids of a list of id rows."""
+
+    offsets = array("i", [0])
+    ids = array("i")
+    for row in rows:
+        ids.extend(row)
+        offsets.append(len(ids))
+    return offsets, ids
+
+
+class Rows:
+    """Rows of ids in compressed sparse rows, row `r` being `ids[offsets[r] : offsets[r + 1]]`. Rows of memoryviews are slices of the same memory, not copies."""
+
+    __slots__ = ("offsets", "ids")
+
+    def __init__(self, offsets: Sequence[int], ids: memoryview) -> None:
+        self.offsets = offsets
+        self.ids = ids
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> memoryview:
+        return self.ids[self.offsets[row] : self.offsets[row + 1]]
+
+    def __iter__(self) -> Iterator[memoryview]:
+        ids = self.ids
+        offsets = self.offsets
+        return (ids[offsets[row] : offsets[row + 1]] for row in range(len(self)))
+
+
+def write(
+    path: str | Path,
+    header: dict[str, Any],
+    tables: dict[str, Any],
+    magic: bytes = MAGIC,
+    formats: dict[str, str] | None = None,
+) -> None:
+    """Writes the header and tables, replacing the file at once so readers never see a partial file. Other kinds of files are written with their own magic bytes and table formats, those of compiled instances by default."""
+
+    formats = TABLES if formats is None else formats
+
+    blobs = [bytes(memoryview(tables[name]).cast("B")) for name in formats]
+
+    header = {**header, "byteorder": byteorder, "tables": {}}
+    # The table offsets are relative to the end of the header, so they do not depend on its size
+    offset = 0
+    for name, blob in zip(formats, blobs):
+        header["tables"][name] = [offset, len(blob)]
+        offset += len(blob) + (-len(blob) % 8)
+    encoded = dumps(header).encode("utf8")
+    encoded += b" " * (-(len(magic) + 4 + len(encoded)) % 8)
+
+    temporary = Path(f"{path}.{getpid()}.tmp")
+    with open(temporary, "wb") as file:
+        file.write(magic)
+        file.write(len(encoded).to_bytes(4, "little"))
+        file.write(encoded)
+        for blob in blobs:
+            file.write(blob)
+            file.write(b"\0" * (-len(blob) % 8))
+    replace(temporary, path)
+
+
+def read(
+    path: str | Path,
+    magic: bytes = MAGIC,
+    formats: dict[str, str] | None = None,
+    kind: str = "compiled UCTP instance",
+) -> tuple[dict[str, Any], dict[str, memoryview]]:
+    """Maps a compiled file, with the table formats of compiled instances by default. Returns its header and a view of each of its tables."""
+
+    formats = TABLES if formats is None else formats
+
+    with open(path, "rb") as file:
+        mapped = mmap(file.fileno(), 0, access=ACCESS_READ)
+
+    if mapped[: len(magic)] != magic:
+        raise ValueError(f"{path} is not a {kind}.")
+    size = int.from_bytes(mapped[len(magic) : len(magic) + 4], "little")
+    start = len(magic) + 4 + size
+    header = loads(mapped[len(magic) + 4 : start])
+    if header["byteorder"] != byteorder:
+        raise ValueError(f"{path} was compiled on a {header['byteorder']} endian host.")
+
+    view = memoryview(mapped)
+    tables = {
+        name: view[start + offset : start + offset + length].cast(formats[name])
+        for name, (offset, length) in header["tables"].items()
+    }
+    return header, tables
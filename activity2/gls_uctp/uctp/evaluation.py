@@ -0,0 +1,632 @@
+"""Incremental (delta) evaluation of moves for the University Course Timetabling Problem."""
+
+from __future__ import annotations
+from array import array
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+from gls_uctp.uctp.hashing import splitmix64
+from gls_uctp.uctp.timetable import assigned_cells, swap_cells
+
+if TYPE_CHECKING:
+    from gls_uctp.uctp.model import UCTP, Move, Solution
+
+
+# Order of the properties in the counting vectors
+PROPERTIES = ("H1", "H2", "H3", "H4", "S1", "S2", "S3", "S4")
+H1, H2, H3, H4, S1, S2, S3, S4 = range(len(PROPERTIES))
+
+# A change of a single assigned cell: (room_day_period, course, +1 or -1)
+type Change = tuple[int, int, int]
+
+
+def zeros(size: int) -> array:
+    """Returns a flat integer buffer filled with zeros."""
+
+    return array("i", [0]) * size
+
+
+class EvaluationState:
+    """Aggregated counters of a solution, kept up to date as moves are applied.
+
+    The counters are the same ones `UCTP.evaluate` rebuilds from scratch, grouped by the component they belong to (course, teacher, curriculum, curriculum-day and day-period). A move only touches the components of the two cells it swaps, so its score change is computed by evaluating those components before and after the move.
+
+    Once `track_features` is called, the state also keeps the cost of each Guided Local Search feature, the violation of one property by one component, and the sum of the penalties of the violated features, updated the same way.
+    """
+
+    def __init__(self, problem: UCTP, solution: Solution) -> None:
+        self.solution = solution
+
+        self.days = problem.days
+        self.periods_per_day = problem.periods_per_day
+        self.day_periods = problem.days * problem.periods_per_day
+        self.rooms = len(problem.rooms)
+        courses = len(problem.courses)
+        self.courses = courses
+
+        # Weights are read once, changing `problem.weights` requires a new state
+        (self.h1, self.h2, self.h3, self.h4), (
+            self.s1,
+            self.s2,
+            self.s3,
+            self.s4,
+        ) = problem.weights
+
+        teachers = problem.teachers
+        self.course_lectures = [course.lectures for course in problem.courses]
+        self.course_min_working_days = [
+            course.min_working_days for course in problem.courses
+        ]
+        self.course_teacher = problem.course_teacher
+        self.course_curricula = problem.course_curricula
+        # 1 where course * day_periods + day_period is unavailable
+        self.unavailability = problem.unavailability
+        # S1 cost of placing a lecture of a course in a room, indexed by course * rooms + room
+        self.overflow = array(
+            "i",
+            [
+                max(course.students - capacity, 0)
+                for course in problem.courses
+                for capacity in problem.room_capacities
+            ],
+        )
+
+        # Course counters
+        self.course_count = zeros(courses)
+        self.course_day_period = zeros(courses * self.day_periods)
+        self.course_distinct_day_periods = zeros(courses)
+        self.course_unavailable_day_periods = zeros(courses)
+        self.course_day = zeros(courses * self.days)
+        self.course_distinct_days = zeros(courses)
+        self.course_room = zeros(courses * self.rooms)
+        self.course_distinct_rooms = zeros(courses)
+        # Teacher and curriculum counters, excess is the amount of repeated day-periods
+        self.teacher_day_period = zeros(len(teachers) * self.day_periods)
+        self.teacher_excess = zeros(len(teachers))
+        self.curriculum_day_period = zeros(len(problem.curricula) * self.day_periods)
+        self.curriculum_excess = zeros(len(problem.curricula))
+        # Room occupancy counters
+        self.slot_count = zeros(self.rooms * self.day_periods)
+        self.day_period_excess = zeros(self.day_periods)
+
+        # Feature ids: a course feature per property, then one per teacher and curriculum (H3), curriculum-day (S3) and day-period (H2)
+        self.teacher_features = courses * len(PROPERTIES)
+        self.curriculum_features = self.teacher_features + len(teachers)
+        self.curriculum_day_features = self.curriculum_features + len(problem.curricula)
+        self.day_period_features = (
+            self.curriculum_day_features + len(problem.curricula) * self.days
+        )
+        self.features = self.day_period_features + self.day_periods
+        # Penalty of each feature, shared with the search, None while features are not tracked
+        self.feature_penalties: array | None = None
+        # Weights of the feature costs, the weights of the score except that zero weights one
+        self.feature_weights = [
+            weight or 1
+            for weight in (self.h1, self.h2, self.h3, self.h4)
+            + (self.s1, self.s2, self.s3, self.s4)
+        ]
+        self.feature_costs = array("i")
+        self.violated: set[int] = set()
+        # Sum of the penalties of the violated features
+        self.penalty = 0
+
+        self.scores = [0] * len(PROPERTIES)
+        self.counts = [0] * len(PROPERTIES)
+        # Assigned cells, and the position of each one in that list, to draw random lectures from
+        self.assigned: list[tuple[int, int]] = []
+        self.positions: dict[tuple[int, int], int] = {}
+        # Assigned cells where the course is unavailable, which the moves may still pick to move away
+        self.misplaced: list[tuple[int, int]] = []
+        self.misplaced_positions: dict[tuple[int, int], int] = {}
+        # Zobrist hash of the solution, see `UCTP.solution_hash`
+        self.hash = 0
+
+        for slot, course in assigned_cells(solution):
+            self.hash ^= splitmix64(slot * courses + course)
+            self.positions[(slot, course)] = len(self.assigned)
+            self.assigned.append((slot, course))
+            self._misplace(slot, course)
+            self._update(slot, course, 1)
+            self._overflow(
+                slot, course, slot // self.day_periods, 1, self.scores, self.counts
+            )
+
+        # Every component, to evaluate the whole solution
+        self.all_components = (
+            range(courses),
+            range(len(teachers)),
+            range(len(problem.curricula)),
+            [
+                (curriculum, day)
+                for curriculum in range(len(problem.curricula))
+                for day in range(self.days)
+            ],
+            range(self.day_periods),
+        )
+        self._components(*self.all_components, self.scores, self.counts)
+
+    @property
+    def score(self) -> int:
+        """The score of the solution, as `UCTP.evaluate` would return it."""
+
+        return sum(self.scores)
+
+    @property
+    def properties(self) -> dict[str, int]:
+        """The violated properties of the solution, as `UCTP.evaluate` would return them."""
+
+        properties: dict[str, int] = defaultdict(int)
+        for name, count in zip(PROPERTIES, self.counts):
+            if count:
+                properties[name] = count
+        return properties
+
+    def evaluation(self) -> tuple[int, dict[str, int]]:
+        """Returns the score and properties of the solution."""
+
+        return (self.score, self.properties)
+
+    def track_features(self, penalties: array) -> None:
+        """Starts keeping the cost of each feature and the sum of the penalties of the violated ones.
+
+        A feature costs the weighted violation of its property by its component, as in the score, except that properties weighted zero, like the hard constraints by default, weigh one so their violations can still be penalized.
+        """
+
+        self.feature_penalties = penalties
+        self.feature_costs = zeros(self.features)
+        self.violated = set()
+
+        penalty = [0]
+        scores = [0] * len(PROPERTIES)
+        counts = [0] * len(PROPERTIES)
+        self._components(*self.all_components, scores, counts, 1, penalty, True)
+        self._overflow_features(
+            [(slot, course, 1) for slot, course in self.assigned], penalty, True
+        )
+        self.penalty = penalty[0]
+
+    def penalize(self, features: list[int]) -> None:
+        """Increments the penalty of violated features."""
+
+        for feature in features:
+            self.feature_penalties[feature] += 1
+        self.penalty += len(features)
+
+    def refresh_penalty(self) -> None:
+        """Sums the penalties of the violated features again, after they were changed by other means than `penalize`."""
+
+        self.penalty = sum(self.feature_penalties[feature] for feature in self.violated)
+
+    def changes(self, move: Move) -> list[Change]:
+        """Returns the assigned cells removed and added by swapping the two cells of the move."""
+
+        (row1, column1), (row2, column2) = move
+        assigned1 = (row1, column1) in self.positions
+        assigned2 = (row2, column2) in self.positions
+
+        # Swapping two assigned or two empty cells leaves the assignment untouched
+        if assigned1 == assigned2:
+            return []
+        if assigned1:
+            return [(row1, column1, -1), (row2, column2, 1)]
+        return [(row2, column2, -1), (row1, column1, 1)]
+
+    def move_hash(self, move: Move) -> int:
+        """Returns the hash of the solution if the move was applied, without applying it."""
+
+        key = self.hash
+        for slot, course, _ in self.changes(move):
+            key ^= splitmix64(slot * self.courses + course)
+        return key
+
+    def delta(self, move: Move) -> tuple[int, dict[str, int]]:
+        """Returns the change of score and of each property if the move was applied, without applying it."""
+
+        changes = self.changes(move)
+        if not changes:
+            return (0, {})
+
+        scores, counts, _ = self._delta(changes)
+        return (
+            sum(scores),
+            {name: count for name, count in zip(PROPERTIES, counts) if count},
+        )
+
+    def augmented_delta(self, move: Move) -> tuple[int, dict[str, int], int]:
+        """Returns the change of score, of each property and of the sum of penalties of the violated features if the move was applied, without applying it."""
+
+        changes = self.changes(move)
+        if not changes:
+            return (0, {}, 0)
+
+        scores, counts, penalty = self._delta(changes)
+        return (
+            sum(scores),
+            {name: count for name, count in zip(PROPERTIES, counts) if count},
+            penalty,
+        )
+
+    def apply(self, move: Move) -> tuple[int, dict[str, int]]:
+        """Applies the move to the solution and to the counters. Returns the change of score and of each property."""
+
+        changes = self.changes(move)
+        swap_cells(self.solution, *move)
+
+        if not changes:
+            return (0, {})
+
+        (removed_slot, removed_course, _), (added_slot, added_course, _) = changes
+        self.hash ^= splitmix64(removed_slot * self.courses + removed_course)
+        self.hash ^= splitmix64(added_slot * self.courses + added_course)
+        position = self.positions.pop((removed_slot, removed_course))
+        self.assigned[position] = (added_slot, added_course)
+        self.positions[(added_slot, added_course)] = position
+        if self.misplaced:
+            self._place(removed_slot, removed_course)
+        self._misplace(added_slot, added_course)
+
+        scores, counts, penalty = self._delta(changes, commit=True)
+        self.penalty += penalty
+        for index in range(len(PROPERTIES)):
+            self.scores[index] += scores[index]
+            self.counts[index] += counts[index]
+        return (
+            sum(scores),
+            {name: count for name, count in zip(PROPERTIES, counts) if count},
+        )
+
+    def undo(self, move: Move) -> tuple[int, dict[str, int]]:
+        """Reverts a move applied to the solution and to the counters. Returns the change of score and of each property."""
+
+        # Swapping is its own inverse
+        return self.apply(move)
+
+    def _misplace(self, slot: int, course: int) -> None:
+        """Tracks an assigned cell if the course is unavailable on it."""
+
+        if self.unavailability[course * self.day_periods + slot % self.day_periods]:
+            self.misplaced_positions[(slot, course)] = len(self.misplaced)
+            self.misplaced.append((slot, course))
+
+    def _place(self, slot: int, course: int) -> None:
+        """Stops tracking an assigned cell as misplaced, if it was."""
+
+        position = self.misplaced_positions.pop((slot, course), None)
+        if position is None:
+            return
+        # Fill the hole with the last misplaced cell
+        last = self.misplaced.pop()
+        if position < len(self.misplaced):
+            self.misplaced[position] = last
+            self.misplaced_positions[last] = position
+
+    def _delta(
+        self, changes: list[Change], commit: bool = False
+    ) -> tuple[list[int], list[int], int]:
+        """Evaluates the components touched by the changes before and after applying them. Also returns the change of the sum of penalties, zero while features are not tracked."""
+
+        courses = set()
+        teachers = set()
+        curricula = set()
+        curriculum_days = set()
+        day_periods = set()
+        for slot, course, _ in changes:
+            day_period = slot % self.day_periods
+            courses.add(course)
+            teachers.add(self.course_teacher[course])
+            for curriculum in self.course_curricula[course]:
+                curricula.add(curriculum)
+                curriculum_days.add((curriculum, day_period // self.periods_per_day))
+            day_periods.add(day_period)
+
+        scores = [0] * len(PROPERTIES)
+        counts = [0] * len(PROPERTIES)
+        components = (courses, teachers, curricula, curriculum_days, day_periods)
+
+        penalty = None if self.feature_penalties is None else [0]
+
+        self._components(*components, scores, counts, -1, penalty, commit)
+        for slot, course, sign in changes:
+            self._update(slot, course, sign)
+            self._overflow(slot, course, slot // self.day_periods, sign, scores, counts)
+        self._components(*components, scores, counts, 1, penalty, commit)
+
+        if not commit:
+            for slot, course, sign in reversed(changes):
+                self._update(slot, course, -sign)
+
+        if penalty is None:
+            return (scores, counts, 0)
+
+        self._overflow_features(changes, penalty, commit)
+        return (scores, counts, penalty[0])
+
+    def _feature(
+        self, feature: int, cost: int, sign: int, penalty: list[int], commit: bool
+    ) -> None:
+        """Accounts a violated feature of a component evaluated before (sign = -1) or after (sign = 1) a change."""
+
+        penalty[0] += sign * self.feature_penalties[feature]
+        if commit:
+            cost = self.feature_costs[feature] + sign * cost
+            self.feature_costs[feature] = cost
+            if cost > 0:
+                self.violated.add(feature)
+            else:
+                self.violated.discard(feature)
+
+    def _overflow_features(
+        self, changes: list[Change], penalty: list[int], commit: bool
+    ) -> None:
+        """Accounts the change of the S1 feature of each course, which sums the S1 cost of all of its lectures."""
+
+        weight = self.feature_weights[S1]
+        course_changes: dict[int, int] = {}
+        for slot, course, sign in changes:
+            overflow = self.overflow[course * self.rooms + slot // self.day_periods]
+            if overflow > 0:
+                course_changes[course] = (
+                    course_changes.get(course, 0) + sign * weight * overflow
+                )
+
+        for course, change in course_changes.items():
+            feature = course * len(PROPERTIES) + S1
+            before = self.feature_costs[feature]
+            after = before + change
+            penalty[0] += self.feature_penalties[feature] * ((after > 0) - (before > 0))
+            if commit:
+                self.feature_costs[feature] = after
+                if after > 0:
+                    self.violated.add(feature)
+                else:
+                    self.violated.discard(feature)
+
+    def _update(self, slot: int, course: int, sign: int) -> None:
+        """Adds (sign = 1) or removes (sign = -1) an assigned cell from the counters."""
+
+        room = slot // self.day_periods
+        day_period = slot % self.day_periods
+        day = day_period // self.periods_per_day
+
+        course_day_period = course * self.day_periods + day_period
+        course_day = course * self.days + day
+        course_room = course * self.rooms + room
+        teacher_day_period = self.course_teacher[course] * self.day_periods + day_period
+
+        if sign > 0:
+            self.course_count[course] += 1
+            if self.course_day_period[course_day_period] == 0:
+                self.course_distinct_day_periods[course] += 1
+                if self.unavailability[course_day_period]:
+                    self.course_unavailable_day_periods[course] += 1
+            self.course_day_period[course_day_period] += 1
+            if self.course_day[course_day] == 0:
+                self.course_distinct_days[course] += 1
+            self.course_day[course_day] += 1
+            if self.course_room[course_room] == 0:
+                self.course_distinct_rooms[course] += 1
+            self.course_room[course_room] += 1
+
+            if self.teacher_day_period[teacher_day_period] > 0:
+                self.teacher_excess[self.course_teacher[course]] += 1
+            self.teacher_day_period[teacher_day_period] += 1
+
+            for curriculum in self.course_curricula[course]:
+                curriculum_day_period = curriculum * self.day_periods + day_period
+                if self.curriculum_day_period[curriculum_day_period] > 0:
+                    self.curriculum_excess[curriculum] += 1
+                self.curriculum_day_period[curriculum_day_period] += 1
+
+            if self.slot_count[slot] > 0:
+                self.day_period_excess[day_period] += 1
+            self.slot_count[slot] += 1
+        else:
+            self.course_count[course] -= 1
+            self.course_day_period[course_day_period] -= 1
+            if self.course_day_period[course_day_period] == 0:
+                self.course_distinct_day_periods[course] -= 1
+                if self.unavailability[course_day_period]:
+                    self.course_unavailable_day_periods[course] -= 1
+            self.course_day[course_day] -= 1
+            if self.course_day[course_day] == 0:
+                self.course_distinct_days[course] -= 1
+            self.course_room[course_room] -= 1
+            if self.course_room[course_room] == 0:
+                self.course_distinct_rooms[course] -= 1
+
+            self.teacher_day_period[teacher_day_period] -= 1
+            if self.teacher_day_period[teacher_day_period] > 0:
+                self.teacher_excess[self.course_teacher[course]] -= 1
+
+            for curriculum in self.course_curricula[course]:
+                curriculum_day_period = curriculum * self.day_periods + day_period
+                self.curriculum_day_period[curriculum_day_period] -= 1
+                if self.curriculum_day_period[curriculum_day_period] > 0:
+                    self.curriculum_excess[curriculum] -= 1
+
+            self.slot_count[slot] -= 1
+            if self.slot_count[slot] > 0:
+                self.day_period_excess[day_period] -= 1
+
+    def _overflow(
+        self,
+        slot: int,
+        course: int,
+        room: int,
+        sign: int,
+        scores: list[int],
+        counts: list[int],
+    ) -> None:
+        """Accounts the S1 cost of a single assigned cell."""
+
+        # S1 - Room capacity: Each student over the capacity of the room is a violation.
+        overflow = self.overflow[course * self.rooms + room]
+        if overflow > 0:
+            scores[S1] += sign * self.s1 * overflow
+            counts[S1] += sign
+
+    def _components(
+        self,
+        courses,
+        teachers,
+        curricula,
+        curriculum_days,
+        day_periods,
+        scores: list[int],
+        counts: list[int],
+        sign: int = 1,
+        penalty: list[int] | None = None,
+        commit: bool = False,
+    ) -> None:
+        """Accumulates the scores and property counts of the given components, multiplied by sign. With a penalty accumulator, also accounts the features they violate."""
+
+        weights = self.feature_weights
+
+        for course in courses:
+            lectures = self.course_count[course]
+            # Courses without any lecture allocated are not evaluated
+            if lectures == 0:
+                continue
+
+            # H1 - Lectures: Each lecture not allocated, or allocated on an already taken period, is a violation.
+            missing = self.course_lectures[course] - lectures
+            repeated = lectures - self.course_distinct_day_periods[course]
+            if missing > 0:
+                scores[H1] += sign * self.h1 * missing
+                counts[H1] += sign
+            if repeated > 0:
+                scores[H1] += sign * self.h1 * repeated
+                counts[H1] += sign
+            if penalty is not None and (missing > 0 or repeated > 0):
+                self._feature(
+                    course * len(PROPERTIES) + H1,
+                    weights[H1] * (max(missing, 0) + max(repeated, 0)),
+                    sign,
+                    penalty,
+                    commit,
+                )
+
+            # H4 - Unavailability: Each lecture on an unavailable period is a violation.
+            unavailable = self.course_unavailable_day_periods[course]
+            if unavailable > 0:
+                scores[H4] += sign * self.h4 * unavailable
+                counts[H4] += sign
+                if penalty is not None:
+                    self._feature(
+                        course * len(PROPERTIES) + H4,
+                        weights[H4] * unavailable,
+                        sign,
+                        penalty,
+                        commit,
+                    )
+
+            # S2 - Minimum working days: Each day below the minimum working days is a violation.
+            missing_days = (
+                self.course_min_working_days[course] - self.course_distinct_days[course]
+            )
+            if missing_days > 0:
+                scores[S2] += sign * self.s2 * missing_days
+                counts[S2] += sign
+                if penalty is not None:
+                    self._feature(
+                        course * len(PROPERTIES) + S2,
+                        weights[S2] * missing_days,
+                        sign,
+                        penalty,
+                        commit,
+                    )
+
+            # S4 - Room stability: Each room other than the first is a violation.
+            extra_rooms = self.course_distinct_rooms[course] - 1
+            if extra_rooms > 0:
+                scores[S4] += sign * self.s4 * extra_rooms
+                counts[S4] += sign
+                if penalty is not None:
+                    self._feature(
+                        course * len(PROPERTIES) + S4,
+                        weights[S4] * extra_rooms,
+                        sign,
+                        penalty,
+                        commit,
+                    )
+
+        # H3 - Conflicts: Each lecture on a period already taken by the same teacher or curriculum is a violation.
+        for teacher in teachers:
+            excess = self.teacher_excess[teacher]
+            if excess > 0:
+                scores[H3] += sign * self.h3 * excess
+                counts[H3] += sign
+                if penalty is not None:
+                    self._feature(
+                        self.teacher_features + teacher,
+                        weights[H3] * excess,
+                        sign,
+                        penalty,
+                        commit,
+                    )
+
+        for curriculum in curricula:
+            excess = self.curriculum_excess[curriculum]
+            if excess > 0:
+                scores[H3] += sign * self.h3 * excess
+                counts[H3] += sign
+                if penalty is not None:
+                    self._feature(
+                        self.curriculum_features + curriculum,
+                        weights[H3] * excess,
+                        sign,
+                        penalty,
+                        commit,
+                    )
+
+        # S3 - Curriculum compactness: Each gap that follows another gap in the same day is a violation.
+        for curriculum, day in curriculum_days:
+            isolated = self._isolated(curriculum, day)
+            if isolated > 0:
+                scores[S3] += sign * self.s3 * isolated
+                counts[S3] += sign * isolated
+                if penalty is not None:
+                    self._feature(
+                        self.curriculum_day_features + curriculum * self.days + day,
+                        weights[S3] * isolated,
+                        sign,
+                        penalty,
+                        commit,
+                    )
+
+        # H2 - Room occupancy: Each extra lecture in the same room-period is a violation.
+        for day_period in day_periods:
+            excess = self.day_period_excess[day_period]
+            if excess > 0:
+                scores[H2] += sign * self.h2 * excess
+                counts[H2] += sign
+                if penalty is not None:
+                    self._feature(
+                        self.day_period_features + day_period,
+                        weights[H2] * excess,
+                        sign,
+                        penalty,
+                        commit,
+                    )
+
+    def _isolated(self, curriculum: int, day: int) -> int:
+        """Counts S3 violations of a curriculum on a day, the same way `UCTP.evaluate` walks the sorted periods."""
+
+        start = curriculum * self.day_periods + day * self.periods_per_day
+        violations = 0
+        last_period = -1
+        in_gap = False
+        for period in range(self.periods_per_day):
+            lectures = self.curriculum_day_period[start + period]
+            if lectures == 0:
+                continue
+            if last_period >= 0:
+                gap = period > last_period + 1
+                if gap and in_gap:
+                    violations += 1
+                in_gap = gap
+            # Repeated periods are adjacent to each other, closing the gap
+            if lectures > 1:
+                in_gap = False
+            last_period = period
+        return violations
@@ -0,0 +1,115 @@
+"""Zobrist hashing of solutions, and a bounded cache of their evaluations keyed by hash.
+
+The hash of a solution is the XOR of a random 64 bits key per assigned cell, the key being SplitMix64 of the flat cell id `slot * courses + course`. A move only swaps two cells, so the hash after it is the XOR of the keys of the cells it changes, in constant time. Distinct solutions share a hash with probability about 2^-64 per pair, which the cache accepts.
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable
+
+from gls_uctp.uctp.timetable import assigned_cells, cell_value
+
+if TYPE_CHECKING:
+    from gls_uctp.uctp.model import Move, Solution
+
+MASK = (1 << 64) - 1
+
+
+def splitmix64(value: int) -> int:
+    """Returns the SplitMix64 mix of a 64 bits integer."""
+
+    value = (value + 0x9E3779B97F4A7C15) & MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK
+    return value ^ (value >> 31)
+
+
+def solution_hash(solution: Solution, courses: int) -> int:
+    """Returns the Zobrist hash of a solution."""
+
+    key = 0
+    for slot, course in assigned_cells(solution):
+        key ^= splitmix64(slot * courses + course)
+    return key
+
+
+def move_hash(key: int, solution: Solution, move: Move, courses: int) -> int:
+    """Returns the hash of the solution after the move, given its hash before it. The move is not applied."""
+
+    (first_row, first_column), (second_row, second_column) = move
+    # Cells are hashed by occupancy, so swapping two assigned or two empty cells keeps the hash, as in `EvaluationState.changes`
+    if (cell_value(solution, first_row, first_column) > 0) == (
+        cell_value(solution, second_row, second_column) > 0
+    ):
+        return key
+    return (
+        key
+        ^ splitmix64(first_row * courses + first_column)
+        ^ splitmix64(second_row * courses + second_column)
+    )
+
+
+class EvaluationCache:
+    """Least recently used evaluations of solutions, keyed by their hash, with hit statistics.
+
+    Evaluations depend on the weights, so the cache empties itself when evaluated under other weights than its entries.
+    """
+
+    def __init__(self, size: int = 16384) -> None:
+        self.size = size
+        self.entries: OrderedDict[int, tuple[int, dict[str, int]]] = OrderedDict()
+        self.weights: Any = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def evaluate(
+        self,
+        key: int,
+        weights: Any,
+        evaluate: Callable[[], tuple[int, dict[str, int]]],
+    ) -> tuple[int, dict[str, int]]:
+        """Returns the cached evaluation of the hash, evaluating and caching it on a miss. The properties are a copy the caller may modify."""
+
+        if weights != self.weights:
+            self.entries.clear()
+            self.weights = weights
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            score, properties = entry
+            return (score, properties.copy())
+
+        self.misses += 1
+        score, properties = evaluate()
+        self.entries[key] = (score, properties.copy())
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return (score, properties)
+
+    def clear(self) -> None:
+        """Empties the cache and resets its statistics."""
+
+        self.entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of the lookups that were hits."""
+
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict[str, Any]:
+        """Returns the hits, misses, evictions, entries and hit rate of the cache."""
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "hit_rate": self.hit_rate,
+        }
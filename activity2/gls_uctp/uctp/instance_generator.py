@@ -0,0 +1,170 @@
+"""Synthetic ITC2007 instance definitions of any size, for scaling benchmarks.
+
+An instance is drawn from a seeded `RandomSource`, so a spec and a seed always give the same file. Every course is placed in at least one curriculum, since the model only knows the courses of its curricula, and keeps at least as many available day-periods as it has lectures. The lectures of each curriculum and of each teacher are capped at the number of day-periods while drawing them, so no curriculum or teacher needs more periods than the week has. These are necessary conditions for valid timetables, not a guarantee: unavailabilities and courses shared between curricula can still leave an instance without any.
+"""
+
+from __future__ import annotations
+from math import ceil
+from typing import Iterator, NamedTuple, TextIO
+
+from gls_uctp.uctp.random_source import RandomSource
+
+# Fraction of the room-day-periods the lectures of `InstanceSpec.for_lectures` fill
+OCCUPANCY = 0.7
+
+
+class InstanceSpec(NamedTuple):
+    """The size and shape of a synthetic instance."""
+
+    courses: int = 30
+    rooms: int = 6
+    days: int = 5
+    periods_per_day: int = 6
+    curricula: int = 14
+    # Mean lectures of a course, drawn from 1 to twice the mean minus one
+    lectures_per_course: int = 4
+    # Mean courses of a curriculum, drawn the same way
+    courses_per_curriculum: int = 4
+    # Mean courses taught by a teacher
+    courses_per_teacher: float = 1.5
+    # Probability of each day-period being unavailable for a course
+    constraint_density: float = 0.1
+
+    @classmethod
+    def for_lectures(cls, lectures: int, **fields) -> InstanceSpec:
+        """Returns a spec of about `lectures` lectures, with the proportions of the competition instances and rooms for `OCCUPANCY` of the room-day-periods."""
+
+        spec = cls(**fields)
+        courses = max(1, round(lectures / spec.lectures_per_course))
+        return spec._replace(
+            courses=courses,
+            rooms=max(
+                1, ceil(lectures / (OCCUPANCY * spec.days * spec.periods_per_day))
+            ),
+            curricula=max(1, round(courses / 2.5)),
+        )
+
+
+def _spread(random: RandomSource, mean: int) -> int:
+    """Returns a random count from 1 to twice the mean minus one."""
+
+    return 1 + random.below(2 * mean - 1) if mean > 1 else 1
+
+
+def instance_lines(spec: InstanceSpec, seed: int = 0) -> Iterator[str]:
+    """Yields the lines of the instance definition of the spec, drawn from the seed. Raises ValueError if its lectures cannot fit its rooms."""
+
+    random = RandomSource(seed)
+    day_periods = spec.days * spec.periods_per_day
+    teachers = max(1, round(spec.courses / spec.courses_per_teacher))
+
+    lectures = [
+        min(_spread(random, spec.lectures_per_course), day_periods)
+        for _ in range(spec.courses)
+    ]
+    if sum(lectures) > spec.rooms * day_periods:
+        raise ValueError(
+            f"{sum(lectures)} lectures do not fit {spec.rooms} rooms of {day_periods} day-periods."
+        )
+    # Every teacher teaches at least one course when there are enough courses
+    course_teachers = [course % teachers for course in range(spec.courses)]
+    for course in range(spec.courses - 1, 0, -1):
+        other = random.below(course + 1)
+        course_teachers[course], course_teachers[other] = (
+            course_teachers[other],
+            course_teachers[course],
+        )
+    # Courses that would give their teacher more lectures than day-periods go to the least busy teacher
+    teacher_lectures = [0] * teachers
+    for course, teacher in enumerate(course_teachers):
+        if teacher_lectures[teacher] + lectures[course] > day_periods:
+            teacher = min(range(teachers), key=teacher_lectures.__getitem__)
+            if teacher_lectures[teacher] + lectures[course] > day_periods:
+                raise ValueError(
+                    f"{sum(lectures)} lectures do not fit {teachers} teachers of {day_periods} day-periods."
+                )
+            course_teachers[course] = teacher
+        teacher_lectures[teacher] += lectures[course]
+    students = [5 + random.below(200) for _ in range(spec.courses)]
+    capacities = [10 + random.below(240) for _ in range(spec.rooms)]
+
+    # Each course joins a curriculum in turn, or the least busy one if it would exceed the day-periods, then curricula draw the rest of their courses
+    members: list[dict[int, None]] = [{} for _ in range(spec.curricula)]
+    curriculum_lectures = [0] * spec.curricula
+    for course in range(spec.courses):
+        curriculum = course % spec.curricula
+        if curriculum_lectures[curriculum] + lectures[course] > day_periods:
+            curriculum = min(range(spec.curricula), key=curriculum_lectures.__getitem__)
+            if curriculum_lectures[curriculum] + lectures[course] > day_periods:
+                raise ValueError(
+                    f"{sum(lectures)} lectures do not fit {spec.curricula} curricula of {day_periods} day-periods."
+                )
+        members[curriculum][course] = None
+        curriculum_lectures[curriculum] += lectures[course]
+    for curriculum, courses in enumerate(members):
+        size = min(_spread(random, spec.courses_per_curriculum), spec.courses)
+        # Draws are bounded, so a curriculum whose lectures fill the day-periods keeps fewer courses
+        for _ in range(4 * size):
+            if len(courses) >= size:
+                break
+            course = random.below(spec.courses)
+            if (
+                course not in courses
+                and curriculum_lectures[curriculum] + lectures[course] <= day_periods
+            ):
+                courses[course] = None
+                curriculum_lectures[curriculum] += lectures[course]
+
+    unavailable = []
+    threshold = int(spec.constraint_density * (1 << 32))
+    for course in range(spec.courses):
+        periods = [
+            day_period
+            for day_period in range(day_periods)
+            if random.below(1 << 32) < threshold
+        ]
+        unavailable.append(periods[: day_periods - lectures[course]])
+
+    yield f"Name: synthetic-{spec.courses}-{seed}"
+    yield f"Courses: {spec.courses}"
+    yield f"Rooms: {spec.rooms}"
+    yield f"Days: {spec.days}"
+    yield f"Periods_per_day: {spec.periods_per_day}"
+    yield f"Curricula: {spec.curricula}"
+    yield f"Constraints: {sum(len(periods) for periods in unavailable)}"
+    yield ""
+    yield "COURSES:"
+    for course in range(spec.courses):
+        min_working_days = 1 + random.below(min(lectures[course], spec.days))
+        yield f"c{course:05} t{course_teachers[course]:05} {lectures[course]} {min_working_days} {students[course]}"
+    yield ""
+    yield "ROOMS:"
+    for room, capacity in enumerate(capacities):
+        yield f"r{room:04} {capacity}"
+    yield ""
+    yield "CURRICULA:"
+    for curriculum, courses in enumerate(members):
+        yield f"q{curriculum:05} {len(courses)} " + " ".join(
+            f"c{course:05}" for course in courses
+        )
+    yield ""
+    yield "UNAVAILABILITY_CONSTRAINTS:"
+    for course, periods in enumerate(unavailable):
+        for day_period in periods:
+            day, period = divmod(day_period, spec.periods_per_day)
+            yield f"c{course:05} {day} {period}"
+    yield ""
+    yield "END."
+
+
+def write_instance(spec: InstanceSpec, file: TextIO, seed: int = 0) -> None:
+    """Writes the instance definition of the spec to a text file."""
+
+    for line in instance_lines(spec, seed):
+        file.write(line + "\n")
+
+
+def format_instance(spec: InstanceSpec, seed: int = 0) -> str:
+    """Returns the instance definition of the spec."""
+
+    return "".join(line + "\n" for line in instance_lines(spec, seed))
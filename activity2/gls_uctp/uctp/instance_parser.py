@@ -1,15 +1,33 @@
 """Atomic element parsing for the UCTP instance definition."""
 
 
-from typing import Sequence
+from typing import Any, BinaryIO, Iterator
 
 
-def skip_white_lines(body: Sequence[str]) -> Sequence[str]:
-    """Removes all white lines from the beginning of the body."""
+def next_line(lines: Iterator[str]) -> str:
+    """Returns the next line of the instance definition."""
+
+    line = next(lines, None)
+    if line is None:
+        raise ValueError("Unexpected end of instance definition.")
+    return line
+
+
+def hashed_lines(file: BinaryIO, digest: Any) -> Iterator[str]:
+    """Yields the decoded lines of a binary file, feeding each one to the digest."""
+
+    for line in file:
+        digest.update(line)
+        yield line.decode("utf8")
 
-    while body[0].isspace() or body[0] == "":
-        body = body[1:]
-    return body
+
+def skip_white_lines(lines: Iterator[str]) -> str:
+    """Skips all white lines from the beginning of the lines. Returns the first line that is not white."""
+
+    line = next_line(lines)
+    while line.isspace() or line == "":
+        line = next_line(lines)
+    return line
 
 
 def keyword(line: str, tag: str) -> str:
@@ -23,11 +41,23 @@ def keyword(line: str, tag: str) -> str:
 def parse_word(line: str) -> tuple[str, str]:
     """Parses a single word from a line, removing it from the line. A word is defined by a sequence of any non-whitespace characters."""
 
-    word = ""
-    while line and not line[0].isspace():
-        word += line[0]
-        line = line[1:]
-    return word, line.lstrip()
+    # A line starting with whitespace starts with an empty word
+    if not line or line[0].isspace():
+        return "", line.lstrip()
+    # Splitting once also strips the whitespace that leads the rest of the line
+    parts = line.split(maxsplit=1)
+    return parts[0], parts[1] if len(parts) > 1 else ""
+
+
+def parse_words(line: str, count: int) -> tuple[list[str], str]:
+    """Parses `count` words from a line in a single pass, removing them from the line."""
+
+    words = line.split(maxsplit=count)
+    if len(words) < count:
+        raise ValueError(f"Expected {count} words but found {len(words)}.")
+    if len(words) > count:
+        return words[:count], words[count]
+    return words, ""
 
 
 def parse_int(line: str) -> tuple[int, str]:
@@ -1,19 +1,37 @@
 """This module contains the model for the University Course Timetabling Problem."""
 
 from __future__ import annotations
+from array import array
 from collections import defaultdict
+from contextlib import contextmanager
 from enum import Enum
-from random import randint
-from typing import Self, Sequence
+from hashlib import sha256
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Self
 
 # from weakref import ref
 
+from gls_uctp.uctp import compiled
+from gls_uctp.uctp.evaluation import EvaluationState
+from gls_uctp.uctp.hashing import EvaluationCache, move_hash, solution_hash
 from gls_uctp.uctp.instance_parser import (
+    hashed_lines,
+    next_line,
     parse_int,
     parse_word,
+    parse_words,
     skip_white_lines,
     keyword,
 )
+from gls_uctp.uctp.moves import Relocate, RoomChange, Swap
+from gls_uctp.uctp.random_source import RandomSource
+from gls_uctp.uctp.sampling import CellSampler
+from gls_uctp.uctp.timetable import (
+    Timetable,
+    assigned_cells,
+    copy_solution,
+    swap_cells,
+)
 
 
 class Room:
@@ -53,6 +71,8 @@ class Course:
         self.students = students
 
         self.constraints: list[Constraint] = []
+        # (day, period) of the constraints, for constant time lookups
+        self.unavailable: set[tuple[int, int]] = set()
 
     def __str__(self) -> str:
         return f"""Course(\
@@ -67,14 +87,12 @@ Constraints = {[v.__str__() for v in self.constraints]}\
     def add_constraint(self, constraint: Constraint):
         """Adds a constraint to the course."""
         self.constraints.append(constraint)
+        self.unavailable.add((constraint.day, constraint.period))
 
     def has_constraint(self, day: int, period: int) -> bool:
         """Checks if the day and period are constrained for the course."""
 
-        return any(
-            constraint.day == day and constraint.period == period
-            for constraint in self.constraints
-        )
+        return (day, period) in self.unavailable
 
     @classmethod
     def parse(cls, line: str) -> tuple[Self, str]:
@@ -92,6 +110,7 @@ class Constraint:
     """A constraint for a course."""
 
     def __init__(self, course: Course, day: int, period: int) -> None:
+        self.course = course
         self.day = day
         self.period = period
         course.add_constraint(self)
@@ -132,17 +151,21 @@ class Curriculum:
 
         name, line = parse_word(line)
         classes, line = parse_int(line)
-        curriculum_courses = []
-        for _ in range(classes):
-            course_name, line = parse_word(line)
-            curriculum_courses.append(courses[course_name])
+        course_names, line = parse_words(line, classes)
+        curriculum_courses = [courses[course_name] for course_name in course_names]
 
         return cls(name, curriculum_courses), line
 
 
 # A Solution for UCTP.
 # Adjacency list of room_day_period -> course
-type Solution = list[list[int]]
+type Matrix = list[list[int]]
+# Either the dense matrix or its compact, per lecture, Timetable form
+type Solution = Matrix | Timetable
+
+# A move for a Solution.
+# Pair of (room_day_period, course) cells to swap
+type Move = tuple[tuple[int, int], tuple[int, int]]
 
 # Weights for the objective function
 # (H1, H2, H3, H4), (S1, S2, S3, S4)
@@ -166,6 +189,7 @@ class UCTP:
         rooms: list[Room],
         curricula: list[Curriculum],
         constraints: list[Constraint],
+        tables: dict[str, memoryview] | None = None,
     ) -> None:
         self.name = name
         self.days = days
@@ -180,9 +204,152 @@ class UCTP:
                 course for curriculum in curricula for course in curriculum.courses
             )
         )
-        self.teachers = list({course.teacher for course in self.courses})
+        # Ordered dedup, so teacher ids are the same on every run
+        self.teachers = list(dict.fromkeys(course.teacher for course in self.courses))
 
         self.weights: Weights = ((0, 0, 0, 0), (1, 5, 2, 1))
+        # Implementation used by `evaluate`, "python" or "numpy"
+        self.evaluator = "python"
+        self._vectorized_evaluator = None
+        # Evaluations of solutions by hash, consulted by `evaluate` once enabled
+        self.evaluation_cache: EvaluationCache | None = None
+
+        # SHA-256 of the definition file, when parsed from one
+        self.source_hash: str | None = None
+        # Compiled file the tables are mapped from, sent instead of the tables when pickled
+        self.compiled_path: str | None = None
+
+        if tables is None:
+            self._build_indexes()
+        else:
+            self._load_indexes(tables)
+
+    def __reduce_ex__(self, protocol):
+        if self.compiled_path is not None:
+            return (
+                type(self).load_compiled,
+                (self.compiled_path,),
+                {
+                    "weights": self.weights,
+                    "evaluator": self.evaluator,
+                    # The kind of source only, workers seed their own
+                    "random": (self.random.block_size, self.random.generator),
+                },
+            )
+        return super().__reduce_ex__(protocol)
+
+    def __setstate__(self, state: dict) -> None:
+        random = state.pop("random", None)
+        self.__dict__.update(state)
+        if random is not None:
+            block_size, generator = random
+            self.random = RandomSource(None, block_size, generator)
+
+    @property
+    def random(self) -> RandomSource:
+        """The source of the random solutions and moves."""
+
+        return self.sampler.random
+
+    @random.setter
+    def random(self, random: RandomSource) -> None:
+        self.sampler.use(random)
+
+    @contextmanager
+    def drawing_from(self, random: RandomSource | None) -> Iterator[None]:
+        """Draws the random solutions and moves from another source within the block, then from the previous one again. Keeps the current source if None."""
+
+        if random is None:
+            yield
+            return
+        previous = self.random
+        self.random = random
+        try:
+            yield
+        finally:
+            self.random = previous
+
+    def _build_indexes(self) -> None:
+        """Builds the integer indexed lookup tables used by the evaluators and move generators."""
+
+        self.course_index = {
+            course.name: index for index, course in enumerate(self.courses)
+        }
+        self.room_index = {name: index for index, name in enumerate(self.room_names)}
+        teacher_index = {teacher: index for index, teacher in enumerate(self.teachers)}
+
+        self.room_capacities = array("i", (room.capacity for room in self.rooms))
+
+        # Availability table, 1 where course * day_periods + day_period is unavailable
+        day_periods = self.days * self.periods_per_day
+        self.unavailability = bytearray(len(self.courses) * day_periods)
+        for course_index, course in enumerate(self.courses):
+            for day, period in course.unavailable:
+                self.unavailability[
+                    course_index * day_periods + day * self.periods_per_day + period
+                ] = 1
+        self.sampler = CellSampler(self)
+
+        self.course_teacher = array(
+            "i", (teacher_index[course.teacher] for course in self.courses)
+        )
+
+        # Curriculum -> course ids, and the reverse course -> curriculum ids
+        self.curriculum_courses = [
+            tuple(
+                dict.fromkeys(
+                    self.course_index[course.name] for course in curriculum.courses
+                )
+            )
+            for curriculum in self.curricula
+        ]
+        course_curricula: list[list[int]] = [[] for _ in self.courses]
+        for curriculum_index, courses in enumerate(self.curriculum_courses):
+            for course_index in courses:
+                course_curricula[course_index].append(curriculum_index)
+        self.course_curricula = [tuple(curricula) for curricula in course_curricula]
+
+        # Course -> courses that can't share a period with it, by curriculum or teacher
+        teacher_courses: list[list[int]] = [[] for _ in self.teachers]
+        for course_index, teacher in enumerate(self.course_teacher):
+            teacher_courses[teacher].append(course_index)
+        self.course_conflicts = [
+            tuple(
+                sorted(
+                    {
+                        other
+                        for curriculum in self.course_curricula[course_index]
+                        for other in self.curriculum_courses[curriculum]
+                    }
+                    .union(teacher_courses[self.course_teacher[course_index]])
+                    .difference((course_index,))
+                )
+            )
+            for course_index in range(len(self.courses))
+        ]
+
+    def _load_indexes(self, tables: dict[str, memoryview]) -> None:
+        """Takes the lookup tables from a compiled instance instead of deriving them."""
+
+        self.course_index = {
+            course.name: index for index, course in enumerate(self.courses)
+        }
+        self.room_index = {name: index for index, name in enumerate(self.room_names)}
+
+        self.room_capacities = tables["room_capacities"]
+        self.unavailability = tables["unavailability"]
+        self.sampler = CellSampler(self, tables=tables)
+        self.course_teacher = tables["course_teacher"]
+        # Rows of the mapped tables, sliced on access instead of copied to tuples
+        self.curriculum_courses = compiled.Rows(
+            tables["curriculum_offsets"], tables["curriculum_ids"]
+        )
+        self.course_curricula = compiled.Rows(
+            tables["course_curricula_offsets"], tables["course_curricula_ids"]
+        )
+        self.course_conflicts = compiled.Rows(
+            tables["conflict_offsets"], tables["conflict_ids"]
+        )
 
     def __str__(self) -> str:
         return f"""UCTP(\
@@ -195,75 +362,63 @@ Constraints = {[v.__str__() for v in self.constraints]}\
 )"""
 
     @classmethod
-    def parse(cls, body: Sequence[str]) -> Self:
-        """Parses a whole instance definition from a list of lines."""
+    def parse(cls, body: Iterable[str]) -> Self:
+        """Parses a whole instance definition from its lines, read once as a stream."""
+
+        lines = iter(body)
 
-        line = keyword(body[0], "Name: ")
+        line = keyword(next_line(lines), "Name: ")
         name, _ = parse_word(line)
 
-        line = keyword(body[1], "Courses: ")
+        line = keyword(next_line(lines), "Courses: ")
         courses_amount, _ = parse_int(line)
 
-        line = keyword(body[2], "Rooms: ")
+        line = keyword(next_line(lines), "Rooms: ")
         rooms_amount, _ = parse_int(line)
 
-        line = keyword(body[3], "Days: ")
+        line = keyword(next_line(lines), "Days: ")
         days, _ = parse_int(line)
 
-        line = keyword(body[4], "Periods_per_day: ")
+        line = keyword(next_line(lines), "Periods_per_day: ")
         periods_per_day, _ = parse_int(line)
 
-        line = keyword(body[5], "Curricula: ")
+        line = keyword(next_line(lines), "Curricula: ")
         curricula_amount, _ = parse_int(line)
 
-        line = keyword(body[6], "Constraints: ")
+        line = keyword(next_line(lines), "Constraints: ")
         constraints_amount, _ = parse_int(line)
 
-        body = body[7:]
-
-        body = skip_white_lines(body)
         courses = {}
-        keyword(body[0], "COURSES:")
-        body = body[1:]
+        keyword(skip_white_lines(lines), "COURSES:")
         for _ in range(courses_amount):
-            course, line = Course.parse(body[0])
+            course, line = Course.parse(next_line(lines))
             if line:
                 raise ValueError(f"Expected end of line. Found {line}.")
             courses[course.name] = course
-            body = body[1:]
 
-        body = skip_white_lines(body)
         rooms: list[Room] = []
-        keyword(body[0], "ROOMS:")
-        body = body[1:]
+        keyword(skip_white_lines(lines), "ROOMS:")
         for _ in range(rooms_amount):
-            room, line = Room.parse(body[0])
+            room, line = Room.parse(next_line(lines))
             if line:
                 raise ValueError(f"Expected end of line. Found {line}.")
             rooms.append(room)
-            body = body[1:]
 
-        body = skip_white_lines(body)
         curricula: list[Curriculum] = []
-        keyword(body[0], "CURRICULA:")
-        body = body[1:]
+        keyword(skip_white_lines(lines), "CURRICULA:")
         for _ in range(curricula_amount):
-            curriculum, line = Curriculum.parse(body[0], courses)
+            curriculum, line = Curriculum.parse(next_line(lines), courses)
             if line:
                 raise ValueError(f"Expected end of line. Found {line}.")
             curricula.append(curriculum)
-            body = body[1:]
 
-        body = skip_white_lines(body)
         constraints = []
-        keyword(body[0], "UNAVAILABILITY_CONSTRAINTS:")
-        body = body[1:]
+        keyword(skip_white_lines(lines), "UNAVAILABILITY_CONSTRAINTS:")
         for _ in range(constraints_amount):
-            constraint, line = Constraint.parse(body[0], courses)
+            constraint, line = Constraint.parse(next_line(lines), courses)
             if line:
                 raise ValueError(f"Expected end of line. Found {line}.")
             constraints.append(constraint)
-            body = body[1:]
 
         return cls(
             name,
@@ -278,104 +433,325 @@ Constraints = {[v.__str__() for v in self.constraints]}\
     def from_file(cls, path: str) -> Self:
         """Parses a whole instance definition that lives in the system file path given."""
 
-        problem_instance = None
-        with open(path, encoding="utf8") as file:
-            lines = file.readlines()
-            problem_instance = cls.parse(lines)
-        file.close()
-        return problem_instance
+        digest = sha256()
+        with open(path, "rb") as file:
+            problem = cls.parse(hashed_lines(file, digest))
+            # The lines after the definition are part of the contents too
+            for line in file:
+                digest.update(line)
+        problem.source_hash = digest.hexdigest()
+        return problem
+
+    def compile(self, path: str | Path) -> None:
+        """Writes the instance and its derived tables to a compact binary file, read back by `load_compiled`."""
+
+        curriculum_offsets, curriculum_ids = compiled.flatten(self.curriculum_courses)
+        course_curricula_offsets, course_curricula_ids = compiled.flatten(
+            self.course_curricula
+        )
+        conflict_offsets, conflict_ids = compiled.flatten(self.course_conflicts)
+        available_offsets, available_day_periods = compiled.flatten(
+            self.sampler.available
+        )
+
+        header = {
+            "name": self.name,
+            "source_hash": self.source_hash,
+            "days": self.days,
+            "periods_per_day": self.periods_per_day,
+            "courses": [course.name for course in self.courses],
+            "teachers": self.teachers,
+            "rooms": self.room_names,
+            "curricula": [curriculum.name for curriculum in self.curricula],
+        }
+        tables = {
+            "course_teacher": array("i", self.course_teacher),
+            "course_lectures": array("i", (c.lectures for c in self.courses)),
+            "course_min_working_days": array(
+                "i", (c.min_working_days for c in self.courses)
+            ),
+            "course_students": array("i", (c.students for c in self.courses)),
+            "room_capacities": array("i", self.room_capacities),
+            "curriculum_offsets": curriculum_offsets,
+            "curriculum_ids": curriculum_ids,
+            "course_curricula_offsets": course_curricula_offsets,
+            "course_curricula_ids": course_curricula_ids,
+            "conflict_offsets": conflict_offsets,
+            "conflict_ids": conflict_ids,
+            "constraints": array(
+                "i",
+                (
+                    value
+                    for constraint in self.constraints
+                    for value in (
+                        self.course_index[constraint.course.name],
+                        constraint.day,
+                        constraint.period,
+                    )
+                ),
+            ),
+            "unavailability": self.unavailability,
+            "available_offsets": available_offsets,
+            "available_day_periods": available_day_periods,
+            "cell_offsets": array("q", self.sampler.offsets),
+        }
+        compiled.write(path, header, tables)
+
+    @classmethod
+    def load_compiled(cls, path: str | Path) -> Self:
+        """Loads an instance written by `compile`. Its tables stay in the memory map of the file, shared by every process loading it."""
+
+        header, tables = compiled.read(path)
+
+        courses = [
+            Course(
+                name, header["teachers"][teacher], lectures, min_working_days, students
+            )
+            for name, teacher, lectures, min_working_days, students in zip(
+                header["courses"],
+                tables["course_teacher"],
+                tables["course_lectures"],
+                tables["course_min_working_days"],
+                tables["course_students"],
+            )
+        ]
+        rooms = [
+            Room(name, capacity)
+            for name, capacity in zip(header["rooms"], tables["room_capacities"])
+        ]
+        curricula = [
+            Curriculum(name, [courses[index] for index in ids])
+            for name, ids in zip(
+                header["curricula"],
+                compiled.Rows(tables["curriculum_offsets"], tables["curriculum_ids"]),
+            )
+        ]
+        constraints = tables["constraints"]
+        constraints = [
+            Constraint(
+                courses[constraints[index]],
+                constraints[index + 1],
+                constraints[index + 2],
+            )
+            for index in range(0, len(constraints), 3)
+        ]
 
-    def to_graph(self) -> Solution:
-        """Returns a graph base representation of the problem, with no solutions drawn."""
+        problem = cls(
+            header["name"],
+            header["days"],
+            header["periods_per_day"],
+            rooms,
+            curricula,
+            constraints,
+            tables,
+        )
+        problem.source_hash = header["source_hash"]
+        problem.compiled_path = str(path)
+        return problem
+
+    @classmethod
+    def from_cache(cls, path: str | Path, cache: str | Path | None = None) -> Self:
+        """Loads the compiled form of an instance definition file, keyed by the hash of its contents. Parses and compiles it first if it is not in the cache."""
+
+        return cls._load_cached(
+            compiled.file_hash(path), cache, lambda: cls.from_file(path)
+        )
+
+    @classmethod
+    def from_cached_content(cls, content: str, cache: str | Path | None = None) -> Self:
+        """Loads the compiled form of an instance definition given as text, from the cache of `from_cache`, so a file and its contents share one compiled file. Parses and compiles it first if it is not in the cache."""
+
+        source_hash = sha256(content.encode("utf8")).hexdigest()
+
+        def parse() -> Self:
+            problem = cls.parse(content.splitlines())
+            problem.source_hash = source_hash
+            return problem
+
+        return cls._load_cached(source_hash, cache, parse)
+
+    @classmethod
+    def _load_cached(
+        cls, source_hash: str, cache: str | Path | None, parse: Callable[[], Self]
+    ) -> Self:
+        """Loads the compiled file of a source hash from the cache, compiling the parsed instance first if it is missing or written by another version."""
+
+        cache = Path(cache) if cache is not None else compiled.cache_directory()
+        compiled_path = cache / f"{source_hash}.uctpc"
+        if compiled_path.exists():
+            try:
+                return cls.load_compiled(compiled_path)
+            except ValueError:
+                # Written in an older format, compiled again below
+                pass
+        cache.mkdir(parents=True, exist_ok=True)
+        parse().compile(compiled_path)
+        return cls.load_compiled(compiled_path)
+
+    def to_graph(self, compact: bool = False) -> Solution:
+        """Returns a graph base representation of the problem, with no solutions drawn. If compact, returns an empty Timetable instead of the dense matrix."""
+
+        if compact:
+            return Timetable(
+                len(self.rooms) * self.days * self.periods_per_day, len(self.courses)
+            )
 
         return [
             [0 for _ in range(len(self.courses))]
             for _ in range(len(self.rooms) * self.days * self.periods_per_day)
         ]
 
-    def random_solution(self) -> Solution:
+    def random_solution(self, compact: bool = False) -> Solution:
         """Returns a random solution for the problem. Tries a reasonably random and as valid solution as it can"""
 
-        solution = self.to_graph()
+        solution = self.to_graph(compact)
 
         total_lectures = sum(course.lectures for course in self.courses)
 
-        for _ in range(total_lectures):
-            i = 0
-            while True:
-                i += 1
-                period_index, course_index = self.random_valid_indexes(solution)
-                if i == 50:
-                    solution[period_index][course_index] += 1
-                    break
-                day = period_index // self.periods_per_day
-                period = period_index % self.periods_per_day
-                if (solution[period_index][course_index] < 1) and (
-                    not self.courses[course_index].has_constraint(day, period)
-                ):
-                    solution[period_index][course_index] += 1
-                    break
+        # Distinct available cells, so no lecture is placed where its course is unavailable
+        for period_index, course_index in self.sampler.cells(total_lectures):
+            self._assign(solution, period_index, course_index)
 
         return solution
 
     def solution_to_graph(
-        self, solution: dict[str, list[tuple[str, int, int]]]
+        self,
+        solution: dict[str, list[tuple[str, int, int]]],
+        compact: bool = False,
     ) -> Solution:
         """Returns a graph base representation of the problem, with the solution drawn."""
 
-        base_solution = self.to_graph()
+        base_solution = self.to_graph(compact)
 
         for course_name, periods in solution.items():
             for room_name, day, period in periods:
-                room_index = self.room_names.index(room_name)
+                room_index = self.room_index[room_name]
                 # Day and Period both starts at zero
                 room_offset = room_index * self.days * self.periods_per_day
                 day_offset = day * self.periods_per_day
 
                 period_offset = room_offset + day_offset + period
 
-                course_index = next(
-                    i
-                    for i, course in enumerate(self.courses)
-                    if course.name == course_name
-                )
+                course_index = self.course_index[course_name]
 
-                base_solution[period_offset][course_index] += 1
+                self._assign(base_solution, period_offset, course_index)
 
         return base_solution
 
+    @staticmethod
+    def _assign(solution: Solution, row: int, column: int) -> None:
+        """Assigns one more lecture to a cell of the solution."""
+
+        if isinstance(solution, Timetable):
+            solution.add(row, column)
+        else:
+            solution[row][column] += 1
+
     def random_valid_indexes(self, solution: Solution) -> tuple[int, int]:
-        """Returns two random indexes for the solution variable."""
+        """Returns two random indexes for the solution variable, of a cell where the course is available."""
 
-        while True:
-            row = randint(0, len(solution) - 1)
-            column = randint(0, len(solution[row]) - 1)
+        return self.sampler.cell()
 
-            # If the cell is contrained and zero, then regenerate
-            if solution[row][column] == 0:
-                day = row // self.periods_per_day
-                period = row % self.periods_per_day
-                if self.courses[column].has_constraint(day, period):
-                    continue
+    def is_unavailable(self, row: int, column: int) -> bool:
+        """Checks if the room_day_period of a cell is unavailable for its course."""
 
-            return (row, column)
+        day_periods = self.days * self.periods_per_day
+        return self.unavailability[column * day_periods + row % day_periods] == 1
 
-    def lecture_move(self, solution: Solution) -> Solution:
-        """Modify the solution variable to swap value from two random cells."""
+    def random_valid_slot(self, course_index: int) -> int:
+        """Returns a random room_day_period where the course is available."""
+
+        return self.sampler.slot(course_index)
+
+    def random_move(self, solution: Solution) -> Swap:
+        """Returns a move swapping two random valid cells of the solution."""
+
+        return Swap(self.sampler.cell(), self.sampler.cell())
+
+    def sample_moves(
+        self, count: int, state: EvaluationState | None = None
+    ) -> list[Swap]:
+        """Returns `count` moves swapping two random valid cells. With an evaluation state, the lectures its solution holds in unavailable cells may be picked too."""
 
-        row1, column1 = self.random_valid_indexes(solution)
-        row2, column2 = self.random_valid_indexes(solution)
+        return self.sampler.sample(count, state.misplaced if state else ())
 
-        solution[row1][column1], solution[row2][column2] = (
-            solution[row2][column2],
-            solution[row1][column1],
+    def random_relocate(self, state: EvaluationState) -> Relocate:
+        """Returns a move of a random lecture of the solution to a random room_day_period where its course is available."""
+
+        slot, course_index = state.assigned[self.sampler.below(len(state.assigned))]
+        return Relocate(
+            (slot, course_index), (self.random_valid_slot(course_index), course_index)
+        )
+
+    def random_room_change(self, state: EvaluationState) -> RoomChange:
+        """Returns a move of a random lecture of the solution to a random room, on the same day-period."""
+
+        slot, course_index = state.assigned[self.sampler.below(len(state.assigned))]
+        day_periods = self.days * self.periods_per_day
+        room = self.sampler.below(len(self.rooms))
+        return RoomChange(
+            (slot, course_index),
+            (room * day_periods + slot % day_periods, course_index),
         )
 
+    def neighborhood(
+        self, state: EvaluationState, neighborhood_size: int
+    ) -> list[Swap]:
+        """Returns random moves from the solution of the evaluation state, mixing swaps, relocations and room changes. The moves are not applied."""
+
+        return self.sampler.neighborhood(state, neighborhood_size)
+
+    def apply_move(self, solution: Solution, move: Move) -> Solution:
+        """Modify the solution variable to swap the values of the two cells of the move."""
+
+        swap_cells(solution, *move)
+
         return solution
 
+    def lecture_move(self, solution: Solution) -> Solution:
+        """Modify the solution variable to swap value from two random cells."""
+
+        return self.apply_move(solution, self.random_move(solution))
+
+    def hashed_lecture_move(self, solution: Solution, key: int) -> tuple[Solution, int]:
+        """Swaps the values of two random cells of the solution, as `lecture_move`. Returns the solution and its hash after the move, given its hash before it."""
+
+        move = self.random_move(solution)
+        key = move_hash(key, solution, move, len(self.courses))
+        return (self.apply_move(solution, move), key)
+
     def neighbors(self, solution: Solution, neighborhood_size: int) -> list[Solution]:
-        """Generates graphs neighboring the passed solution."""
-        return [self.lecture_move(solution) for _ in range(neighborhood_size)]
+        """Generates graphs neighboring the passed solution, each a copy with one random move applied. Prefer evaluating the moves of `neighborhood` against an evaluation state, which does not copy the solution."""
+        return [
+            self.lecture_move(copy_solution(solution)) for _ in range(neighborhood_size)
+        ]
+
+    def evaluation_state(self, solution: Solution) -> EvaluationState:
+        """Returns the evaluation state of a solution, used to evaluate moves incrementally."""
+
+        return EvaluationState(self, solution)
+
+    def evaluate_delta(
+        self, state: EvaluationState, move: Move
+    ) -> tuple[int, dict[str, int]]:
+        """Evaluates a move against the evaluation state of a solution. Returns the change of score and of each property, without applying the move."""
+
+        return state.delta(move)
+
+    def vectorized_evaluator(self):
+        """Returns the NumPy evaluator of the problem, built on first use."""
+
+        if self._vectorized_evaluator is None:
+            # Imported here so NumPy is only required when it is used
+            from gls_uctp.uctp.vectorized import VectorizedEvaluator
+
+            self._vectorized_evaluator = VectorizedEvaluator(self)
+        return self._vectorized_evaluator
+
+    def evaluate_moves(self, state: EvaluationState, moves: list[Move]):
+        """Evaluates a batch of moves against the evaluation state of a solution, without applying them. Returns the NumPy arrays of the score of each move and of its count of each property."""
+
+        return self.vectorized_evaluator().evaluate_moves(state, moves)
 
     def evaluate_dict(
         self,
@@ -385,55 +761,66 @@ Constraints = {[v.__str__() for v in self.constraints]}\
         graph = self.solution_to_graph(solution_dict)
         return self.evaluate(graph)
 
+    def solution_hash(self, solution: Solution) -> int:
+        """Returns the Zobrist hash of a solution, which `hashed_lecture_move` and evaluation states keep up to date."""
+
+        return solution_hash(solution, len(self.courses))
+
+    def cache_evaluations(self, size: int = 16384) -> EvaluationCache:
+        """Caches the evaluations of the last `size` solutions evaluated, by hash. Returns the cache, to read its statistics."""
+
+        self.evaluation_cache = EvaluationCache(size)
+        return self.evaluation_cache
+
     def evaluate(
         self,
         solution: Solution,
+        key: int | None = None,
     ) -> tuple[int, dict[str, int]]:
-        """Evaluates a graph solution for UCTP and returns a score for the weighted number of rule violations. Returns the score."""
+        """Evaluates a graph solution for UCTP and returns a score for the weighted number of rule violations. Returns the score.
+
+        With the evaluation cache enabled, a solution evaluated before is looked up by its hash, computed unless passed as `key`.
+        """
+
+        if self.evaluation_cache is not None:
+            if key is None:
+                key = self.solution_hash(solution)
+            return self.evaluation_cache.evaluate(
+                key, self.weights, lambda: self._evaluate(solution)
+            )
+        return self._evaluate(solution)
+
+    def _evaluate(self, solution: Solution) -> tuple[int, dict[str, int]]:
+        """Evaluates a solution with the selected evaluator."""
+
+        if self.evaluator == "numpy":
+            return self.vectorized_evaluator().evaluate(solution)
 
         # List of Rooms and timeslots assigned to each course
-        course_timeslots: dict[int, list[tuple[Room, int, int]]] = defaultdict(list)
+        course_timeslots: dict[int, list[tuple[int, int, int]]] = defaultdict(list)
         # List of timeslots assigned to each teacher
-        teacher_timeslots: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        teacher_timeslots: dict[int, list[tuple[int, int]]] = defaultdict(list)
         # List of courses assigned to each timeslot
-        timeslot_courses: dict[
-            tuple[int, int], list[tuple[Room, Course]]
-        ] = defaultdict(list)
+        timeslot_courses: dict[tuple[int, int], list[tuple[int, int]]] = defaultdict(
+            list
+        )
         # List of timeslots assigned to each curriculum
-        curriculum_timeslots: dict[str, list[tuple[int, int]]] = defaultdict(list)
-
-        for course_index, course in enumerate(self.courses):
-            assigned_timeslots = [
-                index
-                for index in range(len(solution))
-                if solution[index][course_index] > 0
-            ]
-
-            timeslots = [
-                # (room, day, period)
-                (
-                    slot // (self.days * self.periods_per_day),
-                    (slot % (self.days * self.periods_per_day)) // self.periods_per_day,
-                    (slot % (self.days * self.periods_per_day)) % self.periods_per_day,
-                )
-                for slot in assigned_timeslots
-            ]
-
-            for room, day, period in timeslots:
-                room = self.rooms[room]
-
-                course_timeslots[course_index].append((room, day, period))
-                teacher_timeslots[course.teacher].append((day, period))
-                timeslot_courses[(day, period)].append((room, course))
+        curriculum_timeslots: dict[int, list[tuple[int, int]]] = defaultdict(list)
+
+        for slot, course_index in assigned_cells(solution):
+            # (room, day, period)
+            room, day, period = (
+                slot // (self.days * self.periods_per_day),
+                (slot % (self.days * self.periods_per_day)) // self.periods_per_day,
+                (slot % (self.days * self.periods_per_day)) % self.periods_per_day,
+            )
 
-                curricula = [
-                    curriculum
-                    for curriculum in self.curricula
-                    if course in curriculum.courses
-                ]
+            course_timeslots[course_index].append((room, day, period))
+            teacher_timeslots[self.course_teacher[course_index]].append((day, period))
+            timeslot_courses[(day, period)].append((room, course_index))
 
-                for curriculum in curricula:
-                    curriculum_timeslots[curriculum.name].append((day, period))
+            for curriculum in self.course_curricula[course_index]:
+                curriculum_timeslots[curriculum].append((day, period))
 
         properties: dict[str, int] = defaultdict(int)
 
@@ -457,12 +844,16 @@ Constraints = {[v.__str__() for v in self.constraints]}\
                 properties["H1"] += 1
 
             # H4 - Unavailability: If a course is assigned to slot that it is unavailable, It is a violation.
-            constraints = {
-                (constraint.day, constraint.period) for constraint in course.constraints
-            }
-            intersection = constraints.intersection(set(periods_stripped_room))
-            score += self.weights[0][3] * len(intersection)
-            if len(intersection) > 0:
+            unavailable = sum(
+                self.unavailability[
+                    course_index * self.days * self.periods_per_day
+                    + day * self.periods_per_day
+                    + period
+                ]
+                for day, period in set(periods_stripped_room)
+            )
+            score += self.weights[0][3] * unavailable
+            if unavailable > 0:
                 properties["H4"] += 1
 
             # S2 - Minimum working days: The number of days where at least one lecture is scheduled must be greater or equal than the minimum working days of the course. Each day below the minimum is a violation.
@@ -517,9 +908,12 @@ Constraints = {[v.__str__() for v in self.constraints]}\
                 properties["H2"] += 1
 
             # S1 - Room capacity: The number of students in a room-period can't exceed the capacity of the room. Each student over the capacity is a violation.
-            for room, course in room_courses:
-                if course.students > room.capacity:
-                    score += self.weights[1][0] * (course.students - room.capacity)
+            for room, course_index in room_courses:
+                students = self.courses[course_index].students
+                if students > self.room_capacities[room]:
+                    score += self.weights[1][0] * (
+                        students - self.room_capacities[room]
+                    )
                     properties["S1"] += 1
 
         return (score, properties)
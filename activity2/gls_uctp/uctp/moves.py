@@ -0,0 +1,46 @@
+"""Moves of the neighborhood of a UCTP solution."""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING, NamedTuple
+
+from gls_uctp.uctp.timetable import swap_cells
+
+if TYPE_CHECKING:
+    from gls_uctp.uctp.evaluation import EvaluationState
+    from gls_uctp.uctp.model import Solution
+
+
+class Swap(NamedTuple):
+    """Swaps the values of two (room_day_period, course) cells of a solution.
+
+    Every move is a swap of two cells, the kinds of move only differ in which cells they pick. Being a pair of cells, a move can be passed wherever the cell pair of `UCTP.apply_move` is expected.
+    """
+
+    first: tuple[int, int]
+    second: tuple[int, int]
+
+    def apply(self, solution: Solution) -> Solution:
+        """Applies the move to the solution, in place."""
+
+        swap_cells(solution, self.first, self.second)
+        return solution
+
+    def undo(self, solution: Solution) -> Solution:
+        """Reverts the move on the solution, in place."""
+
+        # Swapping is its own inverse
+        swap_cells(solution, self.first, self.second)
+        return solution
+
+    def delta(self, state: EvaluationState) -> tuple[int, dict[str, int]]:
+        """Returns the change of score and of each property the move causes to the solution of the state."""
+
+        return state.delta(self)
+
+
+class Relocate(Swap):
+    """Moves the lectures of a course from one room-day-period to another."""
+
+
+class RoomChange(Relocate):
+    """Moves the lectures of a course to another room, on the same day-period."""
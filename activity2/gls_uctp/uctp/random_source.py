@@ -0,0 +1,123 @@
+"""Seeded sources of random integers, drawn in blocks, for every stochastic part of the searches.
+
+A source draws blocks of 64 bits words from a Mersenne Twister `random.Random`, or from a NumPy PCG64 `Generator`, and scales a word to a range by a multiplication and a shift. Runs are repeated by their seed: an unseeded source draws one from the system and keeps it in `entropy`, so any run can be replayed. Parallel runs take the independent streams of `spawn`, whose seeds only depend on the parent seed and the index of the stream, not on the numbers drawn.
+"""
+
+from __future__ import annotations
+from array import array
+from random import Random, SystemRandom
+from typing import Any, Sequence
+
+from gls_uctp.uctp.hashing import MASK, splitmix64
+
+GENERATORS = ("random", "numpy")
+# Largest seed drawn or spawned, so seeds fit a signed 64 bits integer
+SEED_MASK = (1 << 63) - 1
+
+
+class RandomSource:
+    """Random integers from a seeded generator, drawn `block_size` words at a time."""
+
+    def __init__(
+        self,
+        seed: int | None = None,
+        block_size: int = 4096,
+        # "random" for the standard library Mersenne Twister, "numpy" for NumPy's PCG64. NumPy is only imported for "numpy".
+        generator: str = "random",
+    ) -> None:
+        if generator not in GENERATORS:
+            raise ValueError(
+                f"Unknown generator {generator!r}, expected one of {', '.join(GENERATORS)}."
+            )
+        self.generator = generator
+        self.block_size = block_size
+        self.seed(seed)
+
+    def seed(self, seed: int | None = None) -> None:
+        """Restarts the generator from a seed, drawing one from the system if None, and discards the drawn block."""
+
+        self.entropy = SystemRandom().getrandbits(63) if seed is None else seed
+        # Streams spawned so far, so later calls to `spawn` return new ones
+        self.spawned = 0
+        if self.generator == "numpy":
+            # Imported here so NumPy is only required when it is used
+            from numpy.random import PCG64, Generator
+
+            self._numpy = Generator(PCG64(self.entropy))
+        else:
+            self._random = Random(self.entropy)
+        self._block = array("Q")
+        self._next = 0
+
+    def spawn(self, count: int) -> list[RandomSource]:
+        """Returns `count` new independent sources of the same generator, seeded from this seed and their index."""
+
+        children = [
+            RandomSource(
+                splitmix64((splitmix64(self.entropy & MASK) + index + 1) & MASK)
+                & SEED_MASK,
+                self.block_size,
+                self.generator,
+            )
+            for index in range(self.spawned, self.spawned + count)
+        ]
+        self.spawned += count
+        return children
+
+    def getstate(self) -> tuple[tuple | dict[str, Any], array]:
+        """Returns the state of the generator, a tuple for "random" and a dict for "numpy", and the drawn numbers not used yet."""
+
+        if self.generator == "numpy":
+            state = self._numpy.bit_generator.state
+        else:
+            state = self._random.getstate()
+        return (state, self._block[self._next :])
+
+    def setstate(self, state: tuple[tuple | dict[str, Any], Sequence[int]]) -> None:
+        """Restores a state returned by `getstate`, switching to the generator it was taken from."""
+
+        generator_state, block = state
+        if isinstance(generator_state, dict):
+            if self.generator != "numpy":
+                self.generator = "numpy"
+                self.seed(self.entropy)
+            self._numpy.bit_generator.state = generator_state
+        else:
+            if self.generator != "random":
+                self.generator = "random"
+                self.seed(self.entropy)
+            self._random.setstate(generator_state)
+        self._block = array("Q", block)
+        self._next = 0
+
+    def _draw_block(self) -> None:
+        """Draws the next block of words."""
+
+        if self.generator == "numpy":
+            self._block = array(
+                "Q", self._numpy.bit_generator.random_raw(self.block_size).tobytes()
+            )
+        else:
+            self._block = array(
+                "Q",
+                self._random.getrandbits(64 * self.block_size).to_bytes(
+                    8 * self.block_size, "little"
+                ),
+            )
+        self._next = 0
+
+    def below(self, bound: int) -> int:
+        """Returns a random integer in [0, bound)."""
+
+        if self._next == len(self._block):
+            self._draw_block()
+        value = self._block[self._next]
+        self._next += 1
+        return (value * bound) >> 64
+
+    def sample(self, population: int, count: int) -> list[int]:
+        """Returns `count` distinct random integers in [0, population)."""
+
+        if self.generator == "numpy":
+            return self._numpy.choice(population, count, replace=False).tolist()
+        return self._random.sample(range(population), count)
@@ -0,0 +1,162 @@
+"""Rejection free sampling of the valid cells of a UCTP solution."""
+
+from __future__ import annotations
+from array import array
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Callable, Sequence
+
+from gls_uctp.uctp.compiled import Rows
+from gls_uctp.uctp.moves import Relocate, RoomChange, Swap
+from gls_uctp.uctp.random_source import RandomSource
+
+if TYPE_CHECKING:
+    from gls_uctp.uctp.evaluation import EvaluationState
+    from gls_uctp.uctp.model import UCTP
+
+
+class CellSampler:
+    """Draws (room_day_period, course) cells where the course is available, without retrying.
+
+    The available cells of a course are every room of each of its available day-periods, so course `c` owns a range of `rooms * len(available[c])` indexes of a single flat space. One integer drawn over that space is decoded to a course by bisecting the cumulative range ends, then to a room and an available day-period, so every available cell is equally likely however constrained the instance is.
+
+    Random integers come from a `RandomSource`, drawn in blocks of 64 bits words and scaled to a range by a multiplication and a shift.
+    """
+
+    below: Callable[[int], int]
+
+    def __init__(
+        self,
+        problem: UCTP,
+        seed: int | None = None,
+        block_size: int = 4096,
+        random: RandomSource | None = None,
+        # Tables of a compiled instance, adopted instead of derived from the problem
+        tables: dict[str, memoryview] | None = None,
+    ) -> None:
+        self.rooms = len(problem.rooms)
+        self.day_periods = problem.days * problem.periods_per_day
+
+        self.available: Sequence[Sequence[int]]
+        if tables is not None:
+            self.available = Rows(
+                tables["available_offsets"], tables["available_day_periods"]
+            )
+            self.offsets = tables["cell_offsets"]
+        else:
+            # Available day-periods of each course
+            self.available = [
+                array(
+                    "i",
+                    (
+                        day_period
+                        for day_period in range(self.day_periods)
+                        if not problem.unavailability[
+                            course_index * self.day_periods + day_period
+                        ]
+                    ),
+                )
+                for course_index in range(len(problem.courses))
+            ]
+            # Start of the range of each course in the flat space, and the total size as last element
+            self.offsets = array("q", [0])
+            for day_periods in self.available:
+                self.offsets.append(self.offsets[-1] + self.rooms * len(day_periods))
+
+        self.use(random if random is not None else RandomSource(seed, block_size))
+
+    def use(self, random: RandomSource) -> None:
+        """Draws from another random source."""
+
+        self.random = random
+        # Bound once, the sampler draws through it in its innermost loops
+        self.below = random.below
+
+    def seed(self, seed: int | None = None) -> None:
+        """Restarts the random source from a seed, discarding the drawn block."""
+
+        self.random.seed(seed)
+
+    def getstate(self) -> tuple[tuple | dict, array]:
+        """Returns the state of the random source and the drawn numbers not used yet."""
+
+        return self.random.getstate()
+
+    def setstate(self, state: tuple[tuple | dict, Sequence[int]]) -> None:
+        """Restores a state returned by `getstate`."""
+
+        self.random.setstate(state)
+
+    @property
+    def total(self) -> int:
+        """The number of available cells."""
+
+        return self.offsets[-1]
+
+    def decode(self, index: int) -> tuple[int, int]:
+        """Returns the cell of an index of the flat space of available cells."""
+
+        course = bisect_right(self.offsets, index) - 1
+        day_periods = self.available[course]
+        room, offset = divmod(index - self.offsets[course], len(day_periods))
+        return (room * self.day_periods + day_periods[offset], course)
+
+    def cell(self, extra: Sequence[tuple[int, int]] = ()) -> tuple[int, int]:
+        """Returns a random available cell, or one of the extra cells with the same probability as any available one."""
+
+        index = self.below(self.total + len(extra))
+        if index >= self.total:
+            return extra[index - self.total]
+        return self.decode(index)
+
+    def slot(self, course: int) -> int:
+        """Returns a random room_day_period where the course is available."""
+
+        day_periods = self.available[course]
+        if not day_periods:
+            raise ValueError(f"Course {course} has no available day-period")
+        room, offset = divmod(
+            self.below(self.rooms * len(day_periods)), len(day_periods)
+        )
+        return room * self.day_periods + day_periods[offset]
+
+    def cells(self, count: int) -> list[tuple[int, int]]:
+        """Returns `count` distinct random available cells."""
+
+        return [
+            self.decode(index)
+            for index in self.random.sample(self.total, min(count, self.total))
+        ]
+
+    def sample(self, count: int, extra: Sequence[tuple[int, int]] = ()) -> list[Swap]:
+        """Returns `count` moves swapping two random valid cells.
+
+        A valid cell is an available one or one of the extra cells, usually the lectures a solution already holds in unavailable cells, which may be moved away.
+        """
+
+        return [Swap(self.cell(extra), self.cell(extra)) for _ in range(count)]
+
+    def neighborhood(self, state: EvaluationState, count: int) -> list[Swap]:
+        """Returns `count` random moves from the solution of the state, mixing swaps, relocations and room changes."""
+
+        moves: list[Swap] = []
+        assigned = state.assigned
+        misplaced = state.misplaced
+        for _ in range(count):
+            kind = self.below(3) if assigned else 0
+            if kind == 0:
+                moves.append(Swap(self.cell(misplaced), self.cell(misplaced)))
+                continue
+
+            slot, course = assigned[self.below(len(assigned))]
+            if kind == 1 and self.available[course]:
+                moves.append(Relocate((slot, course), (self.slot(course), course)))
+            else:
+                day_period = slot % self.day_periods
+                room = self.below(self.rooms)
+                moves.append(
+                    RoomChange(
+                        (slot, course),
+                        (room * self.day_periods + day_period, course),
+                    )
+                )
+        return moves
@@ -0,0 +1,99 @@
+"""Reading and writing solutions in the ITC2007 solution format, one `course room day period` line per lecture, a line at a time."""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, TextIO
+
+from gls_uctp.uctp.timetable import Timetable, assigned_cells
+
+if TYPE_CHECKING:
+    from gls_uctp.uctp.model import UCTP, Solution
+
+
+def solution_entries(
+    problem: UCTP, solution: Solution
+) -> Iterator[tuple[str, str, int, int]]:
+    """Yields the course, room, day and period of each lecture of the solution."""
+
+    day_periods = problem.days * problem.periods_per_day
+    for slot, course in assigned_cells(solution):
+        yield (
+            problem.courses[course].name,
+            problem.room_names[slot // day_periods],
+            (slot % day_periods) // problem.periods_per_day,
+            slot % problem.periods_per_day,
+        )
+
+
+def write_solution(problem: UCTP, solution: Solution, file: TextIO) -> None:
+    """Writes the solution to a text file, in the ITC2007 solution format."""
+
+    for course, room, day, period in solution_entries(problem, solution):
+        file.write(f"{course} {room} {day} {period}\n")
+
+
+def format_solution(problem: UCTP, solution: Solution) -> str:
+    """Returns the solution in the ITC2007 solution format."""
+
+    return "".join(
+        f"{course} {room} {day} {period}\n"
+        for course, room, day, period in solution_entries(problem, solution)
+    )
+
+
+def read_solution(
+    problem: UCTP, lines: Iterable[str], compact: bool = False
+) -> Solution:
+    """Reads a solution from the lines of the ITC2007 solution format. Raises ValueError on malformed lines, unknown courses or rooms and days or periods out of range."""
+
+    solution = problem.to_graph(compact)
+    day_periods = problem.days * problem.periods_per_day
+
+    for number, line in enumerate(lines, 1):
+        words = line.split()
+        if not words:
+            continue
+        if len(words) != 4:
+            raise ValueError(
+                f"Line {number}: expected `course room day period`, got {line.strip()!r}."
+            )
+        course_name, room_name, day_word, period_word = words
+
+        course = problem.course_index.get(course_name)
+        if course is None:
+            raise ValueError(f"Line {number}: unknown course {course_name!r}.")
+        room = problem.room_index.get(room_name)
+        if room is None:
+            raise ValueError(f"Line {number}: unknown room {room_name!r}.")
+        try:
+            day, period = int(day_word), int(period_word)
+        except ValueError as error:
+            raise ValueError(f"Line {number}: {error}.") from error
+        if not (0 <= day < problem.days and 0 <= period < problem.periods_per_day):
+            raise ValueError(
+                f"Line {number}: day {day} period {period} out of the {problem.days} days of {problem.periods_per_day} periods."
+            )
+
+        slot = room * day_periods + day * problem.periods_per_day + period
+        if isinstance(solution, Timetable):
+            solution.add(slot, course)
+        else:
+            solution[slot][course] += 1
+
+    return solution
+
+
+def read_solution_file(
+    problem: UCTP, path: str | Path, compact: bool = False
+) -> Solution:
+    """Reads a solution from a file in the ITC2007 solution format."""
+
+    with open(path, encoding="utf8") as file:
+        return read_solution(problem, file, compact)
+
+
+def write_solution_file(problem: UCTP, solution: Solution, path: str | Path) -> None:
+    """Writes the solution to a file in the ITC2007 solution format."""
+
+    with open(path, "w", encoding="utf8") as file:
+        write_solution(problem, solution, file)
@@ -0,0 +1,83 @@
+"""Tests for the compiled binary form of UCTP instances"""
+
+import pickle
+
+import pytest
+
+from gls_uctp.uctp.compiled import Rows, file_hash
+from gls_uctp.uctp.model import UCTP
+
+paths = [f"instances/test/comp{instance:02}.ctt" for instance in range(1, 22)]
+
+
+def test_compiled_round_trip(tmp_path):
+    """A compiled instance loads back with the same tables and evaluates the same"""
+
+    for path in paths:
+        problem = UCTP.from_file(path)
+        problem.compile(tmp_path / "instance.uctpc")
+        loaded = UCTP.load_compiled(tmp_path / "instance.uctpc")
+
+        assert loaded.name == problem.name
+        assert loaded.source_hash == problem.source_hash == file_hash(path)
+        assert [course.name for course in loaded.courses] == [
+            course.name for course in problem.courses
+        ]
+        assert loaded.teachers == problem.teachers
+        assert loaded.room_names == problem.room_names
+        assert list(loaded.room_capacities) == list(problem.room_capacities)
+        assert list(loaded.course_teacher) == list(problem.course_teacher)
+        for name in ("curriculum_courses", "course_curricula", "course_conflicts"):
+            rows = getattr(loaded, name)
+            assert isinstance(rows, Rows)
+            assert [tuple(row) for row in rows] == getattr(problem, name)
+        # The sampler adopts the mapped tables
+        assert isinstance(loaded.sampler.offsets, memoryview)
+        assert list(loaded.sampler.offsets) == list(problem.sampler.offsets)
+        assert [list(row) for row in loaded.sampler.available] == [
+            list(row) for row in problem.sampler.available
+        ]
+        assert loaded.sampler.decode(
+            loaded.sampler.total - 1
+        ) == problem.sampler.decode(problem.sampler.total - 1)
+        assert loaded.unavailability == problem.unavailability
+        assert len(loaded.constraints) == len(problem.constraints)
+
+        solution = problem.random_solution()
+        assert loaded.evaluate(solution) == problem.evaluate(solution)
+
+
+def test_compiled_pickles_as_path(tmp_path):
+    """A loaded instance is sent to other processes as the path of its file"""
+
+    problem = UCTP.from_file(paths[0])
+    problem.compile(tmp_path / "instance.uctpc")
+    loaded = UCTP.load_compiled(tmp_path / "instance.uctpc")
+
+    pickled = pickle.dumps(loaded)
+    assert len(pickled) < len(pickle.dumps(problem)) // 10
+
+    unpickled = pickle.loads(pickled)
+    solution = problem.random_solution()
+    assert unpickled.evaluate(solution) == problem.evaluate(solution)
+
+
+def test_cache_by_content(tmp_path):
+    """The cache is keyed by the contents of the definition file"""
+
+    cached = UCTP.from_cache(paths[0], tmp_path)
+    assert cached.compiled_path == str(tmp_path / f"{file_hash(paths[0])}.uctpc")
+    assert UCTP.from_cache(paths[0], tmp_path).compiled_path == cached.compiled_path
+    assert len(list(tmp_path.iterdir())) == 1
+    with open(paths[0], encoding="utf8") as file:
+        content = UCTP.from_cached_content(file.read(), tmp_path)
+    assert content.compiled_path == cached.compiled_path
+    assert content.source_hash == cached.source_hash
+
+    with pytest.raises(ValueError):
+        UCTP.load_compiled(paths[0])
+
+    # Files of another format are compiled again
+    with open(cached.compiled_path, "r+b") as file:
+        file.write(b"UCTPBIN0")
+    assert UCTP.from_cache(paths[0], tmp_path).name == cached.name
@@ -0,0 +1,106 @@
+"""Tests for the incremental evaluation of the UCTP model"""
+
+from array import array
+
+from gls_uctp.uctp.model import UCTP
+from gls_uctp.uctp.test_model import TOY_INSTANCE
+
+paths = [f"instances/test/comp{instance:02}.ctt" for instance in range(1, 22)]
+
+
+def test_state_matches_evaluation():
+    """The evaluation state of a solution scores it the same as a full evaluation"""
+
+    for path in paths:
+        problem = UCTP.from_file(path)
+        solution = problem.random_solution()
+
+        state = problem.evaluation_state(solution)
+
+        assert state.evaluation() == problem.evaluate(solution)
+
+
+def test_delta_matches_evaluation():
+    """The delta of a move is the difference between the full evaluations before and after it"""
+
+    for path in paths[:6]:
+        problem = UCTP.from_file(path)
+        problem.weights = ((10, 11, 12, 13), (4, 3, 2, 1))
+        solution = problem.random_solution()
+        state = problem.evaluation_state(solution)
+
+        for _ in range(50):
+            move = problem.random_move(solution)
+            score, properties = problem.evaluate(solution)
+
+            delta_score, delta_properties = problem.evaluate_delta(state, move)
+            # Evaluating a move does not change the state
+            assert state.evaluation() == (score, properties)
+
+            state.apply(move)
+            new_score, new_properties = problem.evaluate(solution)
+
+            assert delta_score == new_score - score
+            for prop in set(properties) | set(new_properties):
+                assert delta_properties.get(prop, 0) == (
+                    new_properties.get(prop, 0) - properties.get(prop, 0)
+                )
+            assert state.evaluation() == (new_score, new_properties)
+
+
+def test_delta_toy_instance():
+    """A move relocating a lecture into an unavailable period is a H4 violation"""
+
+    problem = UCTP.parse(TOY_INSTANCE.splitlines())
+    problem.weights = ((10, 11, 12, 13), (0, 0, 0, 0))
+    solution = problem.solution_to_graph(
+        {
+            "SceCosC": [("rA", 0, 0), ("rA", 1, 0), ("rA", 2, 0)],
+            "ArcTec": [("rB", 0, 1), ("rB", 1, 1), ("rB", 2, 1), ("rB", 3, 1)],
+            "TecCos": [("rC", 0, 2), ("rC", 1, 2), ("rC", 2, 2)],
+            "GeoTec": [("rA", 0, 3), ("rC", 1, 3), ("rC", 2, 3)],
+        }
+    )
+    state = problem.evaluation_state(solution)
+    assert state.evaluation() == problem.evaluate(solution)
+    assert state.score == 0
+
+    # ArcTec from rB day 3 period 1 to rB day 4 period 0
+    arctec = [course.name for course in problem.courses].index("ArcTec")
+    move = ((1 * 20 + 3 * 4 + 1, arctec), (1 * 20 + 4 * 4 + 0, arctec))
+
+    assert state.delta(move) == (13, {"H4": 1})
+    assert state.apply(move) == (13, {"H4": 1})
+    assert state.evaluation() == problem.evaluate(solution)
+
+
+def test_feature_tracking_matches_rebuild():
+    """Feature costs and the penalty of the violated features stay those of a state built from scratch"""
+
+    for path in paths[:4]:
+        problem = UCTP.from_file(path)
+        solution = problem.random_solution()
+        state = problem.evaluation_state(solution)
+        penalties = array("i", range(state.features))
+        state.track_features(penalties)
+
+        for _ in range(50):
+            move = problem.random_move(solution)
+            _, _, penalty_delta = state.augmented_delta(move)
+            penalty = state.penalty
+            state.apply(move)
+            assert state.penalty == penalty + penalty_delta
+
+            rebuilt = problem.evaluation_state(solution)
+            rebuilt.track_features(penalties)
+            assert state.feature_costs == rebuilt.feature_costs
+            assert state.violated == rebuilt.violated
+            assert state.penalty == rebuilt.penalty
+
+        assert state.violated == {
+            feature for feature, cost in enumerate(state.feature_costs) if cost > 0
+        }
+        state.penalize(sorted(state.violated)[:3])
+        penalty = state.penalty
+        state.refresh_penalty()
+        assert state.penalty == penalty
@@ -0,0 +1,88 @@
+"""Tests for the hashing of solutions and the evaluation cache"""
+
+from gls_uctp.uctp.hashing import EvaluationCache, move_hash
+from gls_uctp.uctp.model import UCTP
+from gls_uctp.uctp.timetable import copy_solution
+
+paths = [f"instances/test/comp{instance:02}.ctt" for instance in range(1, 22)]
+
+
+def test_hash_follows_moves():
+    """Hashes updated move by move are the hashes of the solutions from scratch"""
+
+    for path in paths[:4]:
+        problem = UCTP.from_file(path)
+        for compact in (False, True):
+            solution = problem.random_solution(compact)
+            key = problem.solution_hash(solution)
+            state = problem.evaluation_state(copy_solution(solution))
+            assert state.hash == key
+
+            for _ in range(100):
+                solution, key = problem.hashed_lecture_move(solution, key)
+                assert key == problem.solution_hash(solution)
+
+                move = problem.random_move(state.solution)
+                expected = state.move_hash(move)
+                state.apply(move)
+                assert state.hash == expected
+                assert state.hash == problem.solution_hash(state.solution)
+
+    # Cells are hashed by occupancy, two assigned cells of different counts swap without changing it
+    solution = problem.to_graph()
+    solution[0][0], solution[1][1] = 2, 1
+    key = problem.solution_hash(solution)
+    assert move_hash(key, solution, ((0, 0), (1, 1)), len(problem.courses)) == key
+    solution[0][0], solution[1][1] = 1, 2
+    assert problem.solution_hash(solution) == key
+
+    # Different solutions, different hashes
+    problem = UCTP.from_file(paths[0])
+    keys = {problem.solution_hash(problem.random_solution()) for _ in range(50)}
+    assert len(keys) == 50
+
+
+def test_cached_evaluation():
+    """Cached evaluations are the evaluations, revisited solutions are hits"""
+
+    problem = UCTP.from_file(paths[0])
+    solutions = [problem.random_solution() for _ in range(3)]
+    expected = [problem.evaluate(solution) for solution in solutions]
+
+    cache = problem.cache_evaluations(size=2)
+    assert [problem.evaluate(solution) for solution in solutions] == expected
+    assert problem.evaluate(solutions[2]) == expected[2]
+    assert problem.evaluate(solutions[1], problem.solution_hash(solutions[1])) == (
+        expected[1]
+    )
+    assert cache.stats() == {
+        "hits": 2,
+        "misses": 3,
+        "evictions": 1,
+        "entries": 2,
+        "hit_rate": 0.4,
+    }
+
+    # Callers may modify the properties they are returned
+    problem.evaluate(solutions[2])[1]["H1"] = -1
+    assert problem.evaluate(solutions[2]) == expected[2]
+
+    # Other weights evaluate again
+    problem.weights = ((1, 1, 1, 1), (1, 1, 1, 1))
+    problem.evaluation_cache = None
+    reweighted = problem.evaluate(solutions[2])
+    problem.evaluation_cache = cache
+    assert problem.evaluate(solutions[2]) == reweighted
+    assert len(cache.entries) == 1
+
+
+def test_cache_is_least_recently_used():
+    """The least recently used entry is evicted first"""
+
+    cache = EvaluationCache(size=2)
+    for key in (1, 2, 1, 3):
+        cache.evaluate(key, None, lambda key=key: (key, {}))
+
+    assert list(cache.entries) == [1, 3]
+    cache.clear()
+    assert cache.stats()["hit_rate"] == 0.0
@@ -0,0 +1,83 @@
+"""Tests for the synthetic instance generator"""
+
+import pytest
+
+from gls_uctp.uctp.instance_generator import InstanceSpec, format_instance
+from gls_uctp.uctp.model import UCTP
+
+
+def test_instances_follow_spec():
+    """Generated instances parse with the sizes of their spec, every course in a curriculum and available for its lectures"""
+
+    for spec in (
+        InstanceSpec(),
+        InstanceSpec(courses=3, rooms=2, curricula=5, courses_per_teacher=1),
+        InstanceSpec(
+            courses=200,
+            rooms=30,
+            days=6,
+            periods_per_day=9,
+            curricula=40,
+            constraint_density=0.6,
+        ),
+    ):
+        problem = UCTP.parse(format_instance(spec, seed=1).splitlines())
+
+        assert len(problem.courses) == spec.courses
+        assert len(problem.rooms) == spec.rooms
+        assert len(problem.curricula) == spec.curricula
+        assert (problem.days, problem.periods_per_day) == (
+            spec.days,
+            spec.periods_per_day,
+        )
+        for course, day_periods in zip(problem.courses, problem.sampler.available):
+            assert len(day_periods) >= course.lectures
+            assert 1 <= course.min_working_days <= min(course.lectures, spec.days)
+
+
+def test_curricula_and_teachers_fit_the_week():
+    """No curriculum or teacher has more lectures than there are day-periods"""
+
+    for spec, seed in [(InstanceSpec.for_lectures(2000), seed) for seed in range(5)] + [
+        (InstanceSpec(courses=40, curricula=10, courses_per_curriculum=30), 0),
+        (InstanceSpec(courses=12, courses_per_teacher=6), 0),
+    ]:
+        problem = UCTP.parse(format_instance(spec, seed).splitlines())
+        day_periods = problem.days * problem.periods_per_day
+
+        for curriculum in problem.curricula:
+            assert sum(course.lectures for course in curriculum.courses) <= day_periods
+        teacher_lectures = dict.fromkeys(problem.teachers, 0)
+        for course in problem.courses:
+            teacher_lectures[course.teacher] += course.lectures
+        assert max(teacher_lectures.values()) <= day_periods
+
+    with pytest.raises(ValueError, match="teachers"):
+        format_instance(InstanceSpec(courses=40, courses_per_teacher=20))
+    with pytest.raises(ValueError, match="curricula"):
+        format_instance(InstanceSpec(courses=40, curricula=2))
+
+
+def test_seed_repeats_instances():
+    """The same spec and seed give the same instance, another seed another one"""
+
+    spec = InstanceSpec.for_lectures(2000)
+    assert format_instance(spec, seed=3) == format_instance(spec, seed=3)
+    assert format_instance(spec, seed=3) != format_instance(spec, seed=4)
+
+
+def test_large_instances():
+    """Instances of tens of thousands of lectures are generated and searched on timetables"""
+
+    problem = UCTP.parse(
+        format_instance(InstanceSpec.for_lectures(20000), seed=5).splitlines()
+    )
+    lectures = sum(course.lectures for course in problem.courses)
+    assert 19000 <= lectures <= 21000
+
+    solution = problem.random_solution(compact=True)
+    assert len(solution) == lectures
+    assert problem.evaluate(solution)[1].get("H4", 0) == 0
+
+    with pytest.raises(ValueError, match="do not fit"):
+        format_instance(InstanceSpec(courses=100, rooms=1))
@@ -0,0 +1,62 @@
+"""Tests for the parsing of the UCTP instance definition"""
+
+import pytest
+
+from gls_uctp.uctp.instance_parser import parse_int, parse_word, parse_words
+from gls_uctp.uctp.model import UCTP
+from gls_uctp.uctp.test_model import TOY_INSTANCE
+
+paths = [f"instances/test/comp{instance:02}.ctt" for instance in range(1, 22)]
+
+
+def test_parse_word():
+    """Words end at the first whitespace, and the rest of the line is left stripped"""
+
+    assert parse_word("c0001 t000 6 4 130\n") == ("c0001", "t000 6 4 130\n")
+    assert parse_word("rA\t 32") == ("rA", "32")
+    assert parse_word("END.") == ("END.", "")
+    assert parse_word("word \n") == ("word", "")
+    assert parse_word("  leading") == ("", "leading")
+    assert parse_word("") == ("", "")
+    assert parse_int("42 rest") == (42, "rest")
+
+
+def test_parse_long_line():
+    """Long lines are parsed in a single pass"""
+
+    words = [f"c{index:06}" for index in range(200_000)]
+
+    assert parse_words(" ".join(words) + " rest\n", len(words)) == (words, "rest\n")
+    assert parse_words("a b", 2) == (["a", "b"], "")
+    with pytest.raises(ValueError):
+        parse_words("a b", 3)
+
+
+def test_parse_stream():
+    """An instance parses the same from a stream of lines as from a list of lines"""
+
+    for path in paths:
+        with open(path, encoding="utf8") as file:
+            from_list = UCTP.parse(file.readlines())
+        from_stream = UCTP.from_file(path)
+
+        assert from_stream.name == from_list.name
+        assert [course.name for course in from_stream.courses] == [
+            course.name for course in from_list.courses
+        ]
+        assert from_stream.room_names == from_list.room_names
+        assert from_stream.unavailability == from_list.unavailability
+        assert from_stream.course_conflicts == from_list.course_conflicts
+
+    toy = UCTP.parse(line for line in TOY_INSTANCE.splitlines())
+    assert len(toy.courses) == 4
+
+
+def test_parse_errors():
+    """Missing section headers and truncated definitions are reported"""
+
+    with pytest.raises(ValueError, match="ROOMS:"):
+        UCTP.parse(TOY_INSTANCE.replace("ROOMS:", "ROOM:").splitlines())
+
+    with pytest.raises(ValueError, match="Unexpected end"):
+        UCTP.parse(TOY_INSTANCE.splitlines()[:20])
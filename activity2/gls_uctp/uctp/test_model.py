@@ -301,3 +301,48 @@ class TestEvaluation:
             # Optimal solution
             ["S2", "S2"],
         )
+
+
+def test_uctp_indexes():
+    """Asserts the integer lookup tables built for the toy instance"""
+
+    problem = UCTP.parse(TOY_INSTANCE.splitlines())
+
+    # Courses are ordered by their first curriculum appearance
+    assert problem.course_index == {"SceCosC": 0, "ArcTec": 1, "TecCos": 2, "GeoTec": 3}
+    assert problem.room_index == {"rA": 0, "rB": 1, "rC": 2}
+    assert list(problem.room_capacities) == [32, 50, 40]
+    assert [problem.teachers[teacher] for teacher in problem.course_teacher] == [
+        "Ocra",
+        "Indaco",
+        "Rosa",
+        "Scarlatti",
+    ]
+    assert problem.curriculum_courses == [(0, 1, 2), (2, 3)]
+    assert problem.course_curricula == [(0,), (0,), (0, 1), (1,)]
+    assert problem.course_conflicts == [(1, 2), (0, 2), (0, 1, 3), (2,)]
+
+
+def test_uctp_unavailability():
+    """Asserts the availability table agrees with the constraints of each course"""
+
+    problem = UCTP.parse(TOY_INSTANCE.splitlines())
+    day_periods = problem.days * problem.periods_per_day
+
+    assert len(problem.unavailability) == len(problem.courses) * day_periods
+    assert sum(problem.unavailability) == 8
+    for course_index, course in enumerate(problem.courses):
+        for day in range(problem.days):
+            for period in range(problem.periods_per_day):
+                assert problem.unavailability[
+                    course_index * day_periods + day * problem.periods_per_day + period
+                ] == course.has_constraint(day, period)
+
+    # TecCos is unavailable on day 2 period 0, in every room
+    tec_cos = problem.course_index["TecCos"]
+    for room in range(len(problem.rooms)):
+        row = room * day_periods + 2 * problem.periods_per_day
+        assert problem.is_unavailable(row, tec_cos)
+        assert not problem.is_unavailable(row + 2, tec_cos)
+    for _ in range(100):
+        assert not problem.is_unavailable(problem.random_valid_slot(tec_cos), tec_cos)
@@ -0,0 +1,62 @@
+"""Tests for the neighborhood moves of the UCTP model"""
+
+from gls_uctp.uctp.model import UCTP
+from gls_uctp.uctp.moves import Relocate, RoomChange, Swap
+from gls_uctp.uctp.timetable import copy_solution
+
+paths = [f"instances/test/comp{instance:02}.ctt" for instance in range(1, 22)]
+
+
+def test_apply_undo():
+    """Undoing a move restores the solution it was applied to"""
+
+    problem = UCTP.from_file(paths[0])
+    for compact in (False, True):
+        solution = problem.random_solution(compact=compact)
+        state = problem.evaluation_state(solution)
+        original = copy_solution(solution)
+
+        for move in problem.neighborhood(state, 100):
+            move.apply(solution)
+            move.undo(solution)
+
+        assert solution == original
+
+
+def test_neighborhood_moves():
+    """The neighborhood yields every kind of move, and their deltas match full evaluations"""
+
+    for path in paths[:5]:
+        problem = UCTP.from_file(path)
+        solution = problem.random_solution()
+        state = problem.evaluation_state(solution)
+
+        kinds = set()
+        for move in problem.neighborhood(state, 200):
+            kinds.add(type(move))
+            score, _ = problem.evaluate(solution)
+            delta, _ = move.delta(state)
+
+            move.apply(solution)
+            assert problem.evaluate(solution)[0] == score + delta
+            move.undo(solution)
+
+        assert kinds == {Swap, Relocate, RoomChange}
+
+
+def test_room_change_keeps_day_period():
+    """Room changes move a lecture of a course to the same day-period of another room"""
+
+    problem = UCTP.from_file(paths[0])
+    state = problem.evaluation_state(problem.random_solution())
+    day_periods = problem.days * problem.periods_per_day
+
+    for _ in range(50):
+        (slot1, course1), (slot2, course2) = problem.random_room_change(state)
+        assert course1 == course2
+        assert slot1 % day_periods == slot2 % day_periods
+
+        (slot1, course1), (slot2, course2) = problem.random_relocate(state)
+        day, period = divmod(slot2 % day_periods, problem.periods_per_day)
+        assert course1 == course2
+        assert not problem.courses[course2].has_constraint(day, period)
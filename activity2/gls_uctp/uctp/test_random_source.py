@@ -0,0 +1,93 @@
+"""Tests for the seeded, block buffered random sources"""
+
+import pickle
+
+import pytest
+
+from gls_uctp.local_search.local_search import GuidedLocalSearch, LocalSearch
+from gls_uctp.uctp.model import UCTP
+from gls_uctp.uctp.random_source import RandomSource
+
+paths = [f"instances/test/comp{instance:02}.ctt" for instance in range(1, 22)]
+
+
+def draws(source: RandomSource, count: int = 100) -> list[int]:
+    """Returns the next draws of the source, over a range of 40 bits."""
+
+    return [source.below(1 << 40) for _ in range(count)]
+
+
+def test_seed_repeats_draws():
+    """Sources with the same seed draw the same numbers whatever their block size, and unseeded sources keep the seed they drew"""
+
+    assert draws(RandomSource(3, block_size=16)) == draws(RandomSource(3))
+    assert draws(RandomSource(3)) != draws(RandomSource(4))
+
+    source = RandomSource()
+    assert draws(RandomSource(source.entropy)) == draws(source)
+
+    with pytest.raises(ValueError):
+        RandomSource(3, generator="xorshift")
+
+
+def test_spawned_streams():
+    """Spawned streams only depend on the parent seed and their index"""
+
+    parent = RandomSource(5)
+    first = parent.spawn(3)
+    draws(parent, 10000)
+    second = parent.spawn(2)
+
+    seeds = [child.entropy for child in first + second]
+    assert seeds[:3] == [child.entropy for child in RandomSource(5).spawn(3)]
+    assert len(set(seeds)) == 5
+    assert draws(first[0]) != draws(first[1])
+
+
+def test_numpy_generator():
+    """NumPy sources repeat their draws, restore their state and survive pickling"""
+
+    pytest.importorskip("numpy")
+
+    source = RandomSource(3, block_size=16, generator="numpy")
+    assert draws(source) == draws(RandomSource(3, generator="numpy"))
+    assert draws(source) != draws(RandomSource(3))
+    assert all(child.generator == "numpy" for child in source.spawn(2))
+
+    state = source.getstate()
+    expected = draws(source)
+    restored = RandomSource(1)
+    restored.setstate(state)
+    assert draws(restored) == expected
+    assert draws(pickle.loads(pickle.dumps(restored))) == draws(restored)
+
+
+def test_searches_draw_from_their_source(tmp_path):
+    """Searches given a source repeat their moves, and compiled problems keep the kind of their source when pickled"""
+
+    problem = UCTP.from_file(paths[0])
+    own = problem.random
+    solution = problem.random_solution()
+    results = []
+    for _ in range(2):
+        search = LocalSearch(time_limit_secs=60, random=RandomSource(11))
+        results.append(search.search(solution, 50, problem)[1])
+        # The search drew from its source, and the problem from its own one again after it
+        assert search.random.getstate() != RandomSource(11).getstate()
+        assert problem.random is own
+    assert results[0] == results[1]
+
+    # Abandoned searches give the problem its source back too
+    search = GuidedLocalSearch(time_limit_secs=60, random=RandomSource(11))
+    events = search.iterate(solution, 50, problem)
+    next(events)
+    assert problem.random is search.random
+    events.close()
+    assert problem.random is own
+
+    problem.compile(tmp_path / "comp01.uctpc")
+    compiled = UCTP.load_compiled(tmp_path / "comp01.uctpc")
+    compiled.random = RandomSource(13, block_size=64)
+    copy = pickle.loads(pickle.dumps(compiled))
+    assert copy.random.block_size == 64
+    assert copy.random.generator == "random"
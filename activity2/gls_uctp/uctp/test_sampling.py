@@ -0,0 +1,81 @@
+"""Tests for the rejection free sampling of valid cells"""
+
+from collections import Counter
+
+from gls_uctp.uctp.model import UCTP
+from gls_uctp.uctp.sampling import CellSampler
+from gls_uctp.uctp.test_model import TOY_INSTANCE
+from gls_uctp.uctp.timetable import assigned_cells
+
+paths = [f"instances/test/comp{instance:02}.ctt" for instance in range(1, 22)]
+
+
+def test_cells_are_available():
+    """Every drawn cell and slot is available for its course"""
+
+    for path in paths[:5]:
+        problem = UCTP.from_file(path)
+        sampler = CellSampler(problem, seed=1)
+
+        for _ in range(1000):
+            row, column = sampler.cell()
+            assert not problem.is_unavailable(row, column)
+            assert not problem.is_unavailable(sampler.slot(column), column)
+
+
+def test_cells_are_uniform():
+    """Every available cell of the toy instance can be drawn, none more than others"""
+
+    problem = UCTP.parse(TOY_INSTANCE.splitlines())
+    sampler = CellSampler(problem, seed=2)
+
+    draws = Counter(sampler.cell() for _ in range(100 * sampler.total))
+
+    assert sampler.total == 3 * (4 * 20 - 8)
+    assert len(draws) == sampler.total
+    assert max(draws.values()) < 2 * min(draws.values())
+
+
+def test_seed_repeats_draws():
+    """Samplers with the same seed draw the same moves"""
+
+    problem = UCTP.parse(TOY_INSTANCE.splitlines())
+    first = CellSampler(problem, seed=3, block_size=16)
+    second = CellSampler(problem, seed=3)
+
+    assert first.sample(100) == second.sample(100)
+
+
+def test_random_solution_is_available():
+    """Random solutions place every lecture in a distinct available cell"""
+
+    for path in paths:
+        problem = UCTP.from_file(path)
+        solution = problem.random_solution(compact=True)
+
+        assert len(solution) == sum(course.lectures for course in problem.courses)
+        assert len(set(solution.lectures)) == len(solution)
+        assert problem.evaluate(solution)[1].get("H4", 0) == 0
+
+
+def test_misplaced_lectures_are_sampled():
+    """Lectures in unavailable cells are tracked by the state and may be moved away"""
+
+    problem = UCTP.parse(TOY_INSTANCE.splitlines())
+    # TecCos in rA on day 2 period 0 is unavailable
+    solution = problem.solution_to_graph({"TecCos": [("rA", 2, 0)]})
+    state = problem.evaluation_state(solution)
+    misplaced = (2 * problem.periods_per_day, problem.course_index["TecCos"])
+
+    assert state.misplaced == [misplaced]
+    assert misplaced in {
+        cell for move in problem.sample_moves(2000, state) for cell in move
+    }
+
+    for move in problem.neighborhood(state, 200):
+        state.apply(move)
+        assert sorted(state.misplaced) == sorted(
+            (slot, course)
+            for slot, course in assigned_cells(state.solution)
+            if problem.is_unavailable(slot, course)
+        )
@@ -0,0 +1,69 @@
+"""Tests for the reading and writing of ITC2007 solutions"""
+
+import io
+
+import pytest
+
+from gls_uctp.uctp.model import UCTP
+from gls_uctp.uctp.solution_io import (
+    format_solution,
+    read_solution,
+    read_solution_file,
+    write_solution_file,
+)
+from gls_uctp.uctp.timetable import Timetable
+
+paths = [f"instances/test/comp{instance:02}.ctt" for instance in range(1, 22)]
+
+
+def test_round_trip(tmp_path):
+    """A written solution reads back to the same timetable, in either representation"""
+
+    for path in paths[:5]:
+        problem = UCTP.from_file(path)
+        solution = problem.random_solution()
+        write_solution_file(problem, solution, tmp_path / "solution.sol")
+
+        assert read_solution_file(problem, tmp_path / "solution.sol") == solution
+        compact = read_solution(
+            problem, io.StringIO(format_solution(problem, solution)), compact=True
+        )
+        assert isinstance(compact, Timetable)
+        assert compact.to_matrix() == solution
+        assert problem.evaluate(compact) == problem.evaluate(solution)
+
+
+def test_matches_solution_dict():
+    """Reading a solution scores it as `evaluate_dict` does"""
+
+    problem = UCTP.from_file(paths[0])
+    text = format_solution(problem, problem.random_solution())
+    solution_dict: dict[str, list[tuple[str, int, int]]] = {}
+    for line in text.splitlines():
+        course, room, day, period = line.split()
+        solution_dict.setdefault(course, []).append((room, int(day), int(period)))
+
+    assert problem.evaluate(read_solution(problem, text.splitlines())) == (
+        problem.evaluate_dict(solution_dict)
+    )
+
+
+def test_read_errors():
+    """Malformed lines, unknown names and out of range periods are reported with their line"""
+
+    problem = UCTP.from_file(paths[0])
+    course = problem.courses[0].name
+    room = problem.room_names[0]
+
+    assert read_solution(problem, ["", f"{course} {room} 0 0", "  \n"]) == (
+        read_solution(problem, [f"{course} {room} 0 0"])
+    )
+    for lines, message in (
+        ([f"{course} {room} 0"], "Line 1: expected"),
+        ([f"{course} {room} 0 0", f"nope {room} 0 0"], "Line 2: unknown course"),
+        ([f"{course} nope 0 0"], "unknown room"),
+        ([f"{course} {room} {problem.days} 0"], "out of the"),
+        ([f"{course} {room} 0 x"], "Line 1: invalid literal"),
+    ):
+        with pytest.raises(ValueError, match=message):
+            read_solution(problem, lines)
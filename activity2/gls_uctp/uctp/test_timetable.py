@@ -0,0 +1,75 @@
+"""Tests for the compact Timetable representation of a UCTP solution"""
+
+from gls_uctp.uctp.model import UCTP
+from gls_uctp.uctp.test_model import TOY_INSTANCE
+from gls_uctp.uctp.timetable import Timetable
+
+paths = [f"instances/test/comp{instance:02}.ctt" for instance in range(1, 22)]
+
+TOY_SOLUTION = {
+    "SceCosC": [("rA", 0, 0), ("rA", 1, 0), ("rA", 2, 0)],
+    "ArcTec": [("rB", 0, 1), ("rB", 1, 1), ("rB", 2, 1), ("rB", 3, 1)],
+    "TecCos": [("rC", 0, 2), ("rC", 1, 2), ("rC", 2, 2)],
+    "GeoTec": [("rA", 0, 3), ("rC", 1, 3), ("rC", 2, 3)],
+}
+
+
+def test_matrix_round_trip():
+    """A timetable converts to and from the dense matrix without losing lectures"""
+
+    problem = UCTP.parse(TOY_INSTANCE.splitlines())
+    matrix = problem.solution_to_graph(TOY_SOLUTION)
+    timetable = problem.solution_to_graph(TOY_SOLUTION, compact=True)
+
+    assert isinstance(timetable, Timetable)
+    assert len(timetable) == 13
+    assert timetable.to_matrix() == matrix
+    assert Timetable.from_matrix(matrix) == timetable
+
+
+def test_copy_is_independent():
+    """Moves on a copy of a timetable do not change the original"""
+
+    problem = UCTP.parse(TOY_INSTANCE.splitlines())
+    timetable = problem.solution_to_graph(TOY_SOLUTION, compact=True)
+    copied = timetable.copy()
+
+    # SceCosC from rA day 0 period 0 to rA day 4 period 0
+    copied.swap((0, 0), (16, 0))
+
+    assert timetable.value(0, 0) == 1
+    assert timetable.value(16, 0) == 0
+    assert copied.value(0, 0) == 0
+    assert copied.value(16, 0) == 1
+
+
+def test_compact_evaluation_matches_matrix():
+    """Both representations of a solution evaluate the same, before and after moves"""
+
+    for path in paths:
+        problem = UCTP.from_file(path)
+        timetable = problem.random_solution(compact=True)
+        matrix = timetable.to_matrix()
+
+        assert problem.evaluate(timetable) == problem.evaluate(matrix)
+
+        for _ in range(20):
+            move = problem.random_move(timetable)
+            problem.apply_move(timetable, move)
+            problem.apply_move(matrix, move)
+
+        assert timetable.to_matrix() == matrix
+        assert problem.evaluate(timetable) == problem.evaluate(matrix)
+
+
+def test_compact_evaluation_state():
+    """The evaluation state works on timetables too"""
+
+    problem = UCTP.from_file(paths[0])
+    timetable = problem.random_solution(compact=True)
+    state = problem.evaluation_state(timetable)
+
+    for _ in range(50):
+        state.apply(problem.random_move(timetable))
+
+    assert state.evaluation() == problem.evaluate(timetable)
@@ -0,0 +1,84 @@
+"""Tests for the NumPy evaluator of the UCTP model"""
+
+import pytest
+
+from gls_uctp.uctp.evaluation import PROPERTIES
+from gls_uctp.uctp.model import UCTP
+from gls_uctp.uctp.test_model import TOY_INSTANCE
+
+np = pytest.importorskip("numpy")
+
+paths = [f"instances/test/comp{instance:02}.ctt" for instance in range(1, 22)]
+
+
+def test_vectorized_matches_python():
+    """The NumPy evaluator returns exactly the same evaluation as the pure Python one"""
+
+    for path in paths:
+        problem = UCTP.from_file(path)
+        problem.weights = ((10, 11, 12, 13), (4, 3, 2, 1))
+        evaluator = problem.vectorized_evaluator()
+
+        for _ in range(3):
+            solution = problem.random_solution()
+            for _ in range(30):
+                problem.lecture_move(solution)
+            timetable = problem.random_solution(compact=True)
+
+            assert evaluator.evaluate(solution) == problem.evaluate(solution)
+            assert evaluator.evaluate(np.array(solution)) == problem.evaluate(solution)
+            assert evaluator.evaluate(timetable) == problem.evaluate(timetable)
+
+
+def test_vectorized_is_selectable():
+    """Setting the evaluator of an instance switches the implementation of evaluate"""
+
+    problem = UCTP.parse(TOY_INSTANCE.splitlines())
+    solution = problem.solution_to_graph(
+        {
+            "SceCosC": [("rA", 0, 0), ("rA", 1, 0), ("rA", 2, 0)],
+            "ArcTec": [("rB", 0, 1), ("rB", 1, 1), ("rB", 2, 1), ("rB", 4, 0)],
+            "TecCos": [("rC", 0, 2), ("rC", 1, 2), ("rC", 2, 2)],
+            "GeoTec": [("rA", 0, 3), ("rC", 1, 3), ("rC", 2, 3)],
+        }
+    )
+    expected = problem.evaluate(solution)
+
+    problem.evaluator = "numpy"
+
+    assert problem.evaluate(solution) == expected
+    assert expected[1]["H4"] == 1
+
+
+def test_batch_matches_delta():
+    """A batch of moves scores the same as evaluating each move's delta"""
+
+    for path in paths:
+        problem = UCTP.from_file(path)
+        problem.weights = ((10, 11, 12, 13), (4, 3, 2, 1))
+        solution = problem.random_solution(compact=path.endswith("1.ctt"))
+        state = problem.evaluation_state(solution)
+
+        for _ in range(3):
+            moves = [problem.random_move(solution) for _ in range(200)]
+            # Same course and same slot moves, to cover the merged components
+            moves += [
+                ((move[0][0], move[0][1]), (move[1][0], move[0][1]))
+                for move in moves[:50]
+            ]
+            moves += [
+                ((move[0][0], move[0][1]), (move[0][0], move[1][1]))
+                for move in moves[:50]
+            ]
+
+            scores, properties = problem.evaluate_moves(state, moves)
+
+            for move, score, counts in zip(moves, scores, properties):
+                delta_score, delta_properties = state.delta(move)
+                assert score == state.score + delta_score
+                assert dict(zip(PROPERTIES, counts)) == {
+                    prop: state.counts[index] + delta_properties.get(prop, 0)
+                    for index, prop in enumerate(PROPERTIES)
+                }
+
+            state.apply(moves[int(scores.argmin())])
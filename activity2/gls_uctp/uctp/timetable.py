@@ -0,0 +1,185 @@
+"""Compact, assignment based representation of a UCTP solution."""
+
+from __future__ import annotations
+from array import array
+from typing import Iterable, Iterator, Self
+
+
+class Timetable:
+    """A solution for UCTP stored as the assigned cell of each lecture.
+
+    A cell is the flat index `room_day_period * courses + course` of the dense solution matrix, so the timetable holds one integer per lecture instead of one per room-day-period and course. Lectures assigned twice to the same cell are repeated, the same way the matrix would hold a value greater than one.
+    """
+
+    def __init__(self, slots: int, courses: int, lectures: Iterable[int] = ()) -> None:
+        self.slots = slots
+        self.courses = courses
+        self.lectures = array("q", lectures)
+
+        # Reverse occupancy index, cell -> positions in lectures. Built when first needed.
+        self._occupancy: dict[int, list[int]] | None = None
+
+    def __str__(self) -> str:
+        return f"""Timetable(\
+Slots = {self.slots},\
+Courses = {self.courses},\
+Lectures = {len(self.lectures)}\
+)"""
+
+    def __len__(self) -> int:
+        return len(self.lectures)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Timetable):
+            return NotImplemented
+        return (
+            self.slots == other.slots
+            and self.courses == other.courses
+            and sorted(self.lectures) == sorted(other.lectures)
+        )
+
+    def __getstate__(self) -> tuple[int, int, array]:
+        # The occupancy index is derived, there is no need to ship it
+        return (self.slots, self.courses, self.lectures)
+
+    def __setstate__(self, state: tuple[int, int, array]) -> None:
+        self.slots, self.courses, self.lectures = state
+        self._occupancy = None
+
+    @classmethod
+    def from_matrix(cls, matrix: list[list[int]]) -> Self:
+        """Builds a timetable from a dense solution matrix."""
+
+        courses = len(matrix[0]) if matrix else 0
+        return cls(
+            len(matrix),
+            courses,
+            (
+                row * courses + column
+                for row, values in enumerate(matrix)
+                for column, value in enumerate(values)
+                for _ in range(value)
+            ),
+        )
+
+    def to_matrix(self) -> list[list[int]]:
+        """Returns the dense solution matrix of the timetable."""
+
+        matrix = [[0] * self.courses for _ in range(self.slots)]
+        for cell in self.lectures:
+            matrix[cell // self.courses][cell % self.courses] += 1
+        return matrix
+
+    def copy(self) -> Timetable:
+        """Returns a copy of the timetable."""
+
+        copied = Timetable.__new__(Timetable)
+        copied.slots = self.slots
+        copied.courses = self.courses
+        copied.lectures = self.lectures[:]
+        copied._occupancy = None
+        return copied
+
+    @property
+    def occupancy(self) -> dict[int, list[int]]:
+        """Index of the lectures assigned to each occupied cell."""
+
+        if self._occupancy is None:
+            self._occupancy = {}
+            for position, cell in enumerate(self.lectures):
+                self._occupancy.setdefault(cell, []).append(position)
+        return self._occupancy
+
+    def cell(self, row: int, column: int) -> int:
+        """Returns the flat index of a cell."""
+
+        return row * self.courses + column
+
+    def value(self, row: int, column: int) -> int:
+        """Returns how many lectures are assigned to a cell, as the matrix would."""
+
+        positions = self.occupancy.get(row * self.courses + column)
+        return len(positions) if positions else 0
+
+    def add(self, row: int, column: int) -> None:
+        """Assigns one more lecture to a cell."""
+
+        cell = row * self.courses + column
+        if self._occupancy is not None:
+            self._occupancy.setdefault(cell, []).append(len(self.lectures))
+        self.lectures.append(cell)
+
+    def swap(self, first: tuple[int, int], second: tuple[int, int]) -> None:
+        """Swaps the lectures assigned to two cells."""
+
+        cell1 = self.cell(*first)
+        cell2 = self.cell(*second)
+        if cell1 == cell2:
+            return
+
+        occupancy = self.occupancy
+        positions1 = occupancy.pop(cell1, None)
+        positions2 = occupancy.pop(cell2, None)
+        if positions1:
+            for position in positions1:
+                self.lectures[position] = cell2
+            occupancy[cell2] = positions1
+        if positions2:
+            for position in positions2:
+                self.lectures[position] = cell1
+            occupancy[cell1] = positions2
+
+    def assigned_cells(self) -> Iterator[tuple[int, int]]:
+        """Yields each (room_day_period, course) cell with at least one lecture assigned."""
+
+        for cell in self.occupancy:
+            yield divmod(cell, self.courses)
+
+
+def cell_value(solution: list[list[int]] | Timetable, row: int, column: int) -> int:
+    """Returns the value of a cell of either solution representation."""
+
+    if isinstance(solution, Timetable):
+        return solution.value(row, column)
+    return solution[row][column]
+
+
+def assigned_cells(
+    solution: list[list[int]] | Timetable,
+) -> Iterator[tuple[int, int]]:
+    """Yields each (room_day_period, course) cell with at least one lecture assigned, of either solution representation."""
+
+    if isinstance(solution, Timetable):
+        yield from solution.assigned_cells()
+        return
+
+    for row, values in enumerate(solution):
+        for column, value in enumerate(values):
+            if value > 0:
+                yield (row, column)
+
+
+def swap_cells(
+    solution: list[list[int]] | Timetable,
+    first: tuple[int, int],
+    second: tuple[int, int],
+) -> None:
+    """Swaps the values of two cells of either solution representation."""
+
+    if isinstance(solution, Timetable):
+        solution.swap(first, second)
+        return
+
+    (row1, column1), (row2, column2) = first, second
+    solution[row1][column1], solution[row2][column2] = (
+        solution[row2][column2],
+        solution[row1][column1],
+    )
+
+
+def copy_solution(solution: list[list[int]] | Timetable) -> list[list[int]] | Timetable:
+    """Returns a copy of either solution representation."""
+
+    if isinstance(solution, Timetable):
+        return solution.copy()
+    return [values[:] for values in solution]
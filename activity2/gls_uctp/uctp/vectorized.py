@@ -0,0 +1,515 @@
+"""NumPy implementation of the UCTP evaluation. Requires the optional `numpy` dependency."""
+
+from __future__ import annotations
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from gls_uctp.uctp.evaluation import (
+    PROPERTIES,
+    H1,
+    H2,
+    H3,
+    H4,
+    S1,
+    S2,
+    S3,
+    S4,
+    EvaluationState,
+)
+from gls_uctp.uctp.timetable import Timetable
+
+if TYPE_CHECKING:
+    from gls_uctp.uctp.model import UCTP, Move, Solution
+
+
+def components(
+    removed: np.ndarray, added: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Returns the components touched by each move: the one of the removed cell, and the one of the added cell when it is a different one.
+
+    Returns the move entry, the key, and whether the removal and the addition apply to each component.
+    """
+
+    same = removed == added
+    other = np.flatnonzero(~same)
+    entries = np.concatenate((np.arange(len(removed)), other))
+    keys = np.concatenate((removed, added[other]))
+    removes = np.concatenate(
+        (np.ones(len(removed), dtype=bool), np.zeros(len(other), dtype=bool))
+    )
+    adds = np.concatenate((same, np.ones(len(other), dtype=bool)))
+    return (entries, keys, removes, adds)
+
+
+def counter_delta(
+    counter: np.ndarray,
+    removes: np.ndarray,
+    removed: np.ndarray,
+    adds: np.ndarray,
+    added: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns how the keys of a counter change when one key is removed and one added.
+
+    Each entry is a component. The removal only applies where removes is set, and the addition where adds is set. Removing and adding the same key cancel out. Returns whether a distinct key is gained, whether one is lost, and the change of repeated keys.
+    """
+
+    same = removes & adds & (removed == added)
+    removes = removes & ~same
+    adds = adds & ~same
+    removed_count = counter[np.where(removes, removed, 0)]
+    added_count = counter[np.where(adds, added, 0)]
+
+    gained = adds & (added_count == 0)
+    lost = removes & (removed_count == 1)
+    repeated = (adds & (added_count >= 1)).astype(np.int64) - (
+        removes & (removed_count >= 2)
+    )
+    return (gained, lost, repeated)
+
+
+def isolated_lectures(rows: np.ndarray) -> np.ndarray:
+    """Counts the S3 violations of each row of lectures per period, the same way `EvaluationState` does for a single curriculum-day."""
+
+    violations = np.zeros(len(rows), dtype=np.int64)
+    last_period = np.full(len(rows), -1)
+    in_gap = np.zeros(len(rows), dtype=bool)
+    for period in range(rows.shape[1]):
+        lectures = rows[:, period]
+        has_lectures = lectures > 0
+        gap = has_lectures & (last_period >= 0) & (period > last_period + 1)
+        violations += gap & in_gap
+        # Repeated periods are adjacent to each other, closing the gap
+        in_gap = np.where(has_lectures, gap & (lectures == 1), in_gap)
+        last_period = np.where(has_lectures, period, last_period)
+    return violations
+
+
+class VectorizedEvaluator:
+    """Evaluates solutions for a problem with array operations over the assigned cells.
+
+    Returns exactly the same `(score, properties)` as `UCTP.evaluate`, including the courses without any lecture allocated being skipped.
+    """
+
+    def __init__(self, problem: UCTP) -> None:
+        self.problem = problem
+
+        self.days = problem.days
+        self.periods_per_day = problem.periods_per_day
+        self.day_periods = problem.days * problem.periods_per_day
+        self.rooms = len(problem.rooms)
+        self.courses = len(problem.courses)
+        self.teachers = len(problem.teachers)
+        self.curricula = len(problem.curricula)
+
+        self.course_lectures = np.array(
+            [course.lectures for course in problem.courses], dtype=np.int64
+        )
+        self.course_min_working_days = np.array(
+            [course.min_working_days for course in problem.courses], dtype=np.int64
+        )
+        self.course_students = np.array(
+            [course.students for course in problem.courses], dtype=np.int64
+        )
+        self.course_teacher = np.array(problem.course_teacher, dtype=np.int64)
+        self.room_capacities = np.array(problem.room_capacities, dtype=np.int64)
+
+        # Course -> curricula, in compressed sparse rows
+        self.curricula_count = np.array(
+            [len(curricula) for curricula in problem.course_curricula], dtype=np.int64
+        )
+        self.curricula_offsets = np.concatenate(
+            ([0], np.cumsum(self.curricula_count))
+        ).astype(np.int64)
+        self.curricula_ids = np.array(
+            [index for curricula in problem.course_curricula for index in curricula],
+            dtype=np.int64,
+        )
+
+        # Availability tensor, flattened as course * day_periods + day_period
+        self.unavailable = np.frombuffer(problem.unavailability, dtype=np.uint8).astype(
+            bool
+        )
+
+    def cells(self, solution: Solution | np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the room_day_period and course of each distinct assigned cell.
+
+        Accepts the dense matrix (as lists or a 2D array), a Timetable or a 1D array of lecture cells.
+        """
+
+        if isinstance(solution, Timetable):
+            solution = np.frombuffer(solution.lectures, dtype=np.int64)
+
+        solution = np.asarray(solution)
+        if solution.ndim == 1:
+            cells = np.unique(solution)
+            return (cells // self.courses, cells % self.courses)
+
+        if solution.size == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return (empty, empty)
+        slots, courses = np.nonzero(solution > 0)
+        return (slots.astype(np.int64), courses.astype(np.int64))
+
+    def evaluate(self, solution: Solution | np.ndarray) -> tuple[int, dict[str, int]]:
+        """Evaluates a solution for UCTP. Returns the score and the count of each violated property."""
+
+        (h1, h2, h3, h4), (s1, s2, s3, s4) = self.problem.weights
+        slots, courses = self.cells(solution)
+
+        day_periods = slots % self.day_periods
+        rooms = slots // self.day_periods
+        days = day_periods // self.periods_per_day
+
+        properties: dict[str, int] = defaultdict(int)
+        score = 0
+
+        def account(prop: str, cost: int, count: int) -> None:
+            nonlocal score
+            score += int(cost)
+            if count:
+                properties[prop] += int(count)
+
+        lectures = np.bincount(courses, minlength=self.courses)
+        present = lectures > 0
+
+        # H1 - Lectures: Missing lectures, and lectures on an already taken period
+        course_day_periods = np.unique(courses * self.day_periods + day_periods)
+        distinct_day_periods = np.bincount(
+            course_day_periods // self.day_periods, minlength=self.courses
+        )
+        missing = np.where(present, self.course_lectures - lectures, 0)
+        missing = np.maximum(missing, 0)
+        repeated = lectures - distinct_day_periods
+        account(
+            "H1",
+            h1 * (missing.sum() + repeated.sum()),
+            (missing > 0).sum() + (repeated > 0).sum(),
+        )
+
+        # H4 - Unavailability: Lectures on an unavailable period
+        unavailable = np.bincount(
+            course_day_periods // self.day_periods,
+            weights=self.unavailable[course_day_periods],
+            minlength=self.courses,
+        ).astype(np.int64)
+        account("H4", h4 * unavailable.sum(), (unavailable > 0).sum())
+
+        # S2 - Minimum working days: Days below the minimum working days
+        course_days = np.unique(courses * self.days + days)
+        distinct_days = np.bincount(course_days // self.days, minlength=self.courses)
+        missing_days = np.where(
+            present, self.course_min_working_days - distinct_days, 0
+        )
+        missing_days = np.maximum(missing_days, 0)
+        account("S2", s2 * missing_days.sum(), (missing_days > 0).sum())
+
+        # S4 - Room stability: Rooms other than the first
+        course_rooms = np.unique(courses * self.rooms + rooms)
+        distinct_rooms = np.bincount(course_rooms // self.rooms, minlength=self.courses)
+        extra_rooms = np.maximum(distinct_rooms - 1, 0)
+        account("S4", s4 * extra_rooms.sum(), (extra_rooms > 0).sum())
+
+        # H3 - Conflicts: Lectures on a period already taken by the same teacher
+        teachers = self.course_teacher[courses]
+        teacher_excess = np.bincount(teachers, minlength=self.teachers) - np.bincount(
+            np.unique(teachers * self.day_periods + day_periods) // self.day_periods,
+            minlength=self.teachers,
+        )
+        account("H3", h3 * teacher_excess.sum(), (teacher_excess > 0).sum())
+
+        # Expand each assigned cell into one entry per curriculum of its course
+        counts = self.curricula_count[courses]
+        curricula = self._expand(courses, counts)
+        curriculum_day_periods = curricula * self.day_periods + np.repeat(
+            day_periods, counts
+        )
+
+        # H3 - Conflicts: Lectures on a period already taken by the same curriculum
+        curriculum_excess = np.bincount(
+            curricula, minlength=self.curricula
+        ) - np.bincount(
+            np.unique(curriculum_day_periods) // self.day_periods,
+            minlength=self.curricula,
+        )
+        account("H3", h3 * curriculum_excess.sum(), (curriculum_excess > 0).sum())
+
+        # S3 - Curriculum compactness: Gaps following another gap in the same curriculum-day
+        ordered = np.sort(curriculum_day_periods)
+        groups = ordered // self.periods_per_day
+        periods = ordered % self.periods_per_day
+        gaps = (groups[1:] == groups[:-1]) & (periods[1:] - periods[:-1] > 1)
+        isolated = (gaps[1:] & gaps[:-1]).sum()
+        account("S3", s3 * isolated, isolated)
+
+        # H2 - Room occupancy: Extra lectures in the same room-period
+        occupancy = np.bincount(slots, minlength=self.rooms * self.day_periods)
+        excess = (
+            np.maximum(occupancy - 1, 0)
+            .reshape(self.rooms, self.day_periods)
+            .sum(axis=0)
+        )
+        account("H2", h2 * excess.sum(), (excess > 0).sum())
+
+        # S1 - Room capacity: Students over the capacity of the room
+        overflow = self.course_students[courses] - self.room_capacities[rooms]
+        overflow = overflow[overflow > 0]
+        account("S1", s1 * overflow.sum(), overflow.size)
+
+        return (score, properties)
+
+    def evaluate_moves(
+        self, state: EvaluationState, moves: list[Move]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Evaluates a batch of moves against the evaluation state of a solution, without applying them.
+
+        Returns the score of each move and its count of each property, in the order of `PROPERTIES`.
+        """
+
+        scores = np.zeros(len(moves), dtype=np.int64)
+        counts = np.zeros((len(moves), len(PROPERTIES)), dtype=np.int64)
+
+        changed = []
+        for index, move in enumerate(moves):
+            changes = state.changes(move)
+            if changes:
+                (removed_slot, removed_course, _), (
+                    added_slot,
+                    added_course,
+                    _,
+                ) = changes
+                changed.append(
+                    (index, removed_slot, removed_course, added_slot, added_course)
+                )
+
+        if changed:
+            self._move_deltas(state, np.array(changed, dtype=np.int64), scores, counts)
+
+        scores += state.score
+        counts += np.array(state.counts, dtype=np.int64)
+        return (scores, counts)
+
+    def _move_deltas(
+        self,
+        state: EvaluationState,
+        changed: np.ndarray,
+        scores: np.ndarray,
+        counts: np.ndarray,
+    ) -> None:
+        """Accumulates the score and property count changes of moves that remove one assigned cell and add another.
+
+        Works like `EvaluationState.delta`, evaluating the touched components before and after the move, but for all the moves at once over views of the state counters.
+        """
+
+        def view(buffer) -> np.ndarray:
+            return np.frombuffer(buffer, dtype=np.int32)
+
+        def accumulate(entries, prop, weight, before, after, counted=False) -> None:
+            # Unless counted, a property counts each violating component once
+            np.add.at(scores, moves[entries], weight * (after - before))
+            np.add.at(
+                counts[:, prop],
+                moves[entries],
+                (after - before)
+                if counted
+                else (after > 0).astype(np.int64) - (before > 0),
+            )
+
+        moves, removed_slot, removed_course, added_slot, added_course = changed.T
+        removed_day_period = removed_slot % self.day_periods
+        added_day_period = added_slot % self.day_periods
+        removed_day = removed_day_period // self.periods_per_day
+        added_day = added_day_period // self.periods_per_day
+        removed_room = removed_slot // self.day_periods
+        added_room = added_slot // self.day_periods
+
+        # Course components
+        entries, course, removes, adds = components(removed_course, added_course)
+        removed_key = course * self.day_periods + removed_day_period[entries]
+        added_key = course * self.day_periods + added_day_period[entries]
+        gained, lost, _ = counter_delta(
+            view(state.course_day_period), removes, removed_key, adds, added_key
+        )
+        day_periods = view(state.course_distinct_day_periods)[course]
+        new_day_periods = day_periods + gained - lost
+        unavailable = view(state.course_unavailable_day_periods)[course]
+        new_unavailable = (
+            unavailable
+            + (gained & self.unavailable[added_key])
+            - (lost & self.unavailable[removed_key])
+        )
+        gained, lost, _ = counter_delta(
+            view(state.course_day),
+            removes,
+            course * self.days + removed_day[entries],
+            adds,
+            course * self.days + added_day[entries],
+        )
+        days = view(state.course_distinct_days)[course]
+        new_days = days + gained - lost
+        gained, lost, _ = counter_delta(
+            view(state.course_room),
+            removes,
+            course * self.rooms + removed_room[entries],
+            adds,
+            course * self.rooms + added_room[entries],
+        )
+        rooms = view(state.course_distinct_rooms)[course]
+        new_rooms = rooms + gained - lost
+        lectures = view(state.course_count)[course]
+        new_lectures = lectures + adds - removes
+
+        before = self._course_costs(
+            course, lectures, day_periods, days, rooms, unavailable
+        )
+        after = self._course_costs(
+            course, new_lectures, new_day_periods, new_days, new_rooms, new_unavailable
+        )
+        # H1 counts the missing and the repeated lectures of a course separately
+        for prop, weight, cost_before, cost_after in zip(
+            (H1, H1, H4, S2, S4),
+            (state.h1, state.h1, state.h4, state.s2, state.s4),
+            before,
+            after,
+        ):
+            accumulate(entries, prop, weight, cost_before, cost_after)
+
+        # Teacher components
+        entries, teacher, removes, adds = components(
+            self.course_teacher[removed_course], self.course_teacher[added_course]
+        )
+        _, _, repeated = counter_delta(
+            view(state.teacher_day_period),
+            removes,
+            teacher * self.day_periods + removed_day_period[entries],
+            adds,
+            teacher * self.day_periods + added_day_period[entries],
+        )
+        excess = view(state.teacher_excess)[teacher]
+        accumulate(entries, H3, state.h3, excess, excess + repeated)
+
+        # Curriculum components, the curricula of both courses merged per move
+        removed_counts = self.curricula_count[removed_course]
+        added_counts = self.curricula_count[added_course]
+        keys, inverse = np.unique(
+            np.concatenate(
+                (
+                    np.repeat(np.arange(len(moves)), removed_counts) * self.curricula
+                    + self._expand(removed_course, removed_counts),
+                    np.repeat(np.arange(len(moves)), added_counts) * self.curricula
+                    + self._expand(added_course, added_counts),
+                )
+            ),
+            return_inverse=True,
+        )
+        # Bit 1 when the removal applies, bit 2 when the addition applies
+        flags = np.bincount(
+            inverse,
+            weights=np.concatenate(
+                (np.full(removed_counts.sum(), 1), np.full(added_counts.sum(), 2))
+            ),
+        ).astype(np.int64)
+        entries = keys // self.curricula
+        curricula = keys % self.curricula
+        removes = (flags & 1).astype(bool)
+        adds = (flags & 2).astype(bool)
+
+        curriculum_day_period = view(state.curriculum_day_period)
+        _, _, repeated = counter_delta(
+            curriculum_day_period,
+            removes,
+            curricula * self.day_periods + removed_day_period[entries],
+            adds,
+            curricula * self.day_periods + added_day_period[entries],
+        )
+        excess = view(state.curriculum_excess)[curricula]
+        accumulate(entries, H3, state.h3, excess, excess + repeated)
+
+        # Curriculum-day components, split in two when the lecture changes day
+        split = removes & adds & (removed_day[entries] != added_day[entries])
+        day_entries = np.concatenate((entries, entries[split]))
+        day = np.concatenate(
+            (
+                np.where(removes, removed_day[entries], added_day[entries]),
+                added_day[entries][split],
+            )
+        )
+        day_removes = np.concatenate((removes, np.zeros(split.sum(), dtype=bool)))
+        day_adds = np.concatenate((adds & ~split, np.ones(split.sum(), dtype=bool)))
+        starts = (
+            np.concatenate((curricula, curricula[split])) * self.day_periods
+            + day * self.periods_per_day
+        )
+        rows = curriculum_day_period[starts[:, None] + np.arange(self.periods_per_day)]
+        before = isolated_lectures(rows)
+        rows[
+            np.flatnonzero(day_removes),
+            removed_day_period[day_entries][day_removes] % self.periods_per_day,
+        ] -= 1
+        rows[
+            np.flatnonzero(day_adds),
+            added_day_period[day_entries][day_adds] % self.periods_per_day,
+        ] += 1
+        after = isolated_lectures(rows)
+        accumulate(day_entries, S3, state.s3, before, after, counted=True)
+
+        # Day-period components, for room occupancy
+        entries, day_period, removes, adds = components(
+            removed_day_period, added_day_period
+        )
+        _, _, repeated = counter_delta(
+            view(state.slot_count),
+            removes,
+            removed_slot[entries],
+            adds,
+            added_slot[entries],
+        )
+        excess = view(state.day_period_excess)[day_period]
+        accumulate(entries, H2, state.h2, excess, excess + repeated)
+
+        # S1 - Room capacity, per assigned cell
+        removed_overflow = np.maximum(
+            self.course_students[removed_course] - self.room_capacities[removed_room],
+            0,
+        )
+        added_overflow = np.maximum(
+            self.course_students[added_course] - self.room_capacities[added_room], 0
+        )
+        np.add.at(scores, moves, state.s1 * (added_overflow - removed_overflow))
+        np.add.at(
+            counts[:, S1],
+            moves,
+            (added_overflow > 0).astype(np.int64) - (removed_overflow > 0),
+        )
+
+    def _course_costs(
+        self,
+        course: np.ndarray,
+        lectures: np.ndarray,
+        day_periods: np.ndarray,
+        days: np.ndarray,
+        rooms: np.ndarray,
+        unavailable: np.ndarray,
+    ) -> tuple[np.ndarray, ...]:
+        """Returns the unweighted H1 missing, H1 repeated, H4, S2 and S4 costs of course components. Courses without lectures cost nothing."""
+
+        present = lectures > 0
+        missing = np.where(
+            present, np.maximum(self.course_lectures[course] - lectures, 0), 0
+        )
+        repeated = lectures - day_periods
+        missing_days = np.where(
+            present, np.maximum(self.course_min_working_days[course] - days, 0), 0
+        )
+        extra_rooms = np.maximum(rooms - 1, 0)
+        return (missing, repeated, unavailable, missing_days, extra_rooms)
+
+    def _expand(self, courses: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """Returns the curricula of each course, concatenated."""
+
+        starts = np.repeat(self.curricula_offsets[courses], counts)
+        offsets = np.arange(counts.sum()) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        return self.curricula_ids[starts + offsets]
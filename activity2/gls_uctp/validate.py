@@ -0,0 +1,172 @@
+"""Batch validator of ITC2007 solution files, scoring each against its instance on a process pool.
+
+Run with `python -m gls_uctp.validate solutions/*.sol --instances instances/test --output scores.csv`. Each solution is scored against the instance whose file name is the longest prefix of its own, `comp01_run3.sol` against `comp01.ctt`, or against `--instance`. One row is written per solution file as it is scored, in CSV or JSON lines, with the score, the validity and the count of each constraint, or the error that kept it from being scored.
+"""
+
+from __future__ import annotations
+import csv
+import json
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+from os import cpu_count
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Sequence
+
+from gls_uctp.uctp.evaluation import PROPERTIES
+from gls_uctp.uctp.model import UCTP, Weights
+from gls_uctp.uctp.solution_io import read_solution_file
+
+FIELDS = ["file", "instance", "score", "is_valid", *PROPERTIES, "error"]
+HARD = [prop for prop in PROPERTIES if prop.startswith("H")]
+
+# Instances and weights of a worker process, set by the pool initializer
+_problems: dict[str, UCTP] = {}
+_weights: Weights | None = None
+
+
+def _initialize(weights: Weights | None) -> None:
+    """Stores the weights in the worker process."""
+
+    global _weights
+    _weights = weights
+
+
+def problem(path: str) -> UCTP:
+    """Returns the instance of a path, parsed once per process."""
+
+    if path not in _problems:
+        _problems[path] = UCTP.from_file(path)
+        if _weights is not None:
+            _problems[path].weights = _weights
+    return _problems[path]
+
+
+def score_file(task: tuple[str, str | None]) -> dict[str, Any]:
+    """Scores a solution file against its instance. Returns its row."""
+
+    solution_path, instance_path = task
+    row: dict[str, Any] = dict.fromkeys(FIELDS, None)
+    row["file"] = solution_path
+    if instance_path is None:
+        row["error"] = "No instance matches the file name."
+        return row
+
+    row["instance"] = Path(instance_path).stem
+    try:
+        instance = problem(instance_path)
+        score, properties = instance.evaluate(
+            read_solution_file(instance, solution_path, compact=True)
+        )
+    except (OSError, ValueError, KeyError, IndexError) as error:
+        # Malformed instances and solutions fail their own row, not the batch
+        row["error"] = f"{type(error).__name__}: {error}"
+        return row
+
+    row["score"] = score
+    row["is_valid"] = not any(properties.get(prop, 0) for prop in HARD)
+    for prop in PROPERTIES:
+        row[prop] = properties.get(prop, 0)
+    return row
+
+
+def match_instances(
+    solutions: Iterable[str], instances: Sequence[str]
+) -> Iterator[tuple[str, str | None]]:
+    """Pairs each solution file with the instance whose name is the longest prefix of its name, None if there is none."""
+
+    stems = sorted(
+        ((Path(path).stem, path) for path in instances),
+        key=lambda item: len(item[0]),
+        reverse=True,
+    )
+    for solution in solutions:
+        name = Path(solution).stem
+        yield (
+            solution,
+            next((path for stem, path in stems if name.startswith(stem)), None),
+        )
+
+
+def validate(
+    tasks: Iterable[tuple[str, str | None]],
+    workers: int | None = None,
+    weights: Weights | None = None,
+    chunksize: int = 16,
+) -> Iterator[dict[str, Any]]:
+    """Scores the solution files on a process pool. Yields their rows in order, as they are scored."""
+
+    with ProcessPoolExecutor(
+        max_workers=workers or cpu_count() or 1,
+        initializer=_initialize,
+        initargs=(weights,),
+    ) as executor:
+        yield from executor.map(score_file, tasks, chunksize=chunksize)
+
+
+def parse_weights(text: str) -> Weights:
+    """Returns the weights of eight comma separated integers, the hard constraints first."""
+
+    values = [int(value) for value in text.split(",")]
+    if len(values) != 8:
+        raise ValueError(f"Expected 8 weights, got {len(values)}.")
+    return (tuple(values[:4]), tuple(values[4:]))
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Validates solution files from the command line."""
+
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("solutions", nargs="+", help="Solution files or glob patterns")
+    parser.add_argument(
+        "--instances",
+        default="instances/test",
+        help="Directory of the .ctt instances the solutions are matched against",
+    )
+    parser.add_argument("--instance", help="Instance of every solution")
+    parser.add_argument("--output", "-o", help="CSV or JSON lines file, by extension")
+    parser.add_argument("--workers", type=int, help="One per CPU by default")
+    parser.add_argument(
+        "--weights",
+        type=parse_weights,
+        help="H1,H2,H3,H4,S1,S2,S3,S4 weights, the instance defaults otherwise",
+    )
+    arguments = parser.parse_args(argv)
+
+    solutions = [
+        path
+        for pattern in arguments.solutions
+        for path in (sorted(glob(pattern)) or [pattern])
+    ]
+    if arguments.instance:
+        tasks = [(solution, arguments.instance) for solution in solutions]
+    else:
+        tasks = list(
+            match_instances(
+                solutions, sorted(glob(str(Path(arguments.instances) / "*.ctt")))
+            )
+        )
+    rows = validate(tasks, arguments.workers, arguments.weights)
+
+    output = (
+        open(arguments.output, "w", encoding="utf8", newline="")
+        if arguments.output
+        else sys.stdout
+    )
+    try:
+        if arguments.output and arguments.output.endswith(".csv"):
+            writer = csv.DictWriter(output, FIELDS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+        else:
+            for row in rows:
+                output.write(json.dumps(row) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()